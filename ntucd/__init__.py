@@ -0,0 +1,2 @@
+# NTUCD Telegram bot. Kept import-free so `python -m ntucd` starts fast;
+# the handlers are wired up in ntucd.app and heavy Sheets dependencies load on first use.
@@ -0,0 +1,22 @@
+import sys
+
+# python -m ntucd            single process (same as NTUCDConfig.py)
+# python -m ntucd ingress    queue updates for worker processes
+# python -m ntucd worker     handle queued updates (run as many as there are cores)
+# Each mode imports only what it runs: ingress never loads the handler modules.
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "bot"
+    try:
+        if mode == "ingress":
+            from .worker import run_ingress
+            run_ingress()
+        elif mode == "worker":
+            from .worker import run_worker
+            run_worker()
+        else:
+            from .app import main
+            main()
+    except Exception as e:
+        print(f"[ERROR] Bot failed to start: {e}")
+        raise
@@ -0,0 +1,44 @@
+from functools import wraps
+from time import monotonic
+
+from telegram import Update, ChatMember
+from telegram.ext import ContextTypes
+
+from .config import ADMIN_CACHE_TTL
+from .resilience import degraded_notice
+
+admin_cache = {}  # chat_id -> (loaded_at, {user_id, ...})
+
+# === Admin check ===
+async def load_admins(bot, chat_id):
+    admins = await bot.get_chat_administrators(chat_id)
+    admin_cache[chat_id] = (monotonic(), {member.user.id for member in admins})
+    return admin_cache[chat_id][1]
+
+async def is_admin(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+    chat_id = update.effective_chat.id
+    cached = admin_cache.get(chat_id)
+    if cached and monotonic() - cached[0] < ADMIN_CACHE_TTL:
+        return update.effective_user.id in cached[1]
+    member = await context.bot.get_chat_member(chat_id, update.effective_user.id)
+    return member.status in [ChatMember.ADMINISTRATOR, ChatMember.OWNER]
+
+def admin_only(func):
+    @wraps(func)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+        if not await is_admin(update, context):
+            try:
+                await context.bot.delete_message(
+                    chat_id=update.effective_chat.id,
+                    message_id=update.message.message_id
+                )
+            except Exception as e:
+                print(f"[DELETE ERROR] {e}")
+            return
+        result = await func(update, context, *args, **kwargs)
+        # Tell admins (once per outage) that Sheets is down instead of failing silently
+        notice = degraded_notice(update.effective_chat.id)
+        if notice and update.effective_message:
+            await update.effective_message.reply_text(notice)
+        return result
+    return wrapper
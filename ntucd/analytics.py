@@ -0,0 +1,192 @@
+import asyncio
+import threading
+from array import array
+from dataclasses import dataclass
+
+from telegram import Update
+from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
+
+from .admin import admin_only
+from .chats import chat_config
+from .config import ANALYTICS_WINDOW, ANALYTICS_LAPSE, ANALYTICS_TOP
+from .sheets import chat_sheets
+
+# === ATTENDANCE ANALYTICS ===
+# ATTENDANCE List is a members x training-dates matrix (row 1 poll IDs, row 2 dates, rows 3+ one
+# member per row). It is parsed once into a uint8 matrix and every statistic is computed over it in
+# one vectorized pass; the result is cached per chat until the tab changes.
+
+BLANK, PRESENT, ABSENT = 0, 1, 2
+PRESENT_MARKS = {"1", "y", "yes", "true", "p", "present", "✓", "✔", "✅"}
+ABSENT_MARKS = {"0", "n", "no", "false", "a", "absent", "x", "✗", "✘", "❌"}
+
+def _code(value):
+    value = value.strip().lower()
+    if value in PRESENT_MARKS:
+        return PRESENT
+    if value in ABSENT_MARKS:
+        return ABSENT
+    return BLANK
+
+def parse_attendance(rows):
+    """Returns (members, dates, marks) with marks a row-major array('B') of BLANK/PRESENT/ABSENT."""
+    date_row = rows[1] if len(rows) > 1 else []
+    date_cols = [c for c in range(1, len(date_row)) if date_row[c].strip()]
+    members, marks = [], array("B")
+    for row in rows[2:]:
+        label = row[0].strip() if row else ""
+        if not label:
+            continue
+        members.append(label)
+        marks.extend(_code(row[c]) if c < len(row) else BLANK for c in date_cols)
+    return members, [date_row[c].strip() for c in date_cols], marks
+
+@dataclass
+class AttendanceStats:
+    members: list
+    dates: list
+    attended: object  # per member: trainings attended
+    sessions: object  # per member: trainings since their first mark
+    rate: object  # attended / sessions
+    recent_rate: object  # same over the last ANALYTICS_WINDOW trainings
+    current_streak: object  # consecutive trainings attended, ending at the latest one
+    longest_streak: object
+    no_shows: object  # per member: trainings explicitly marked absent
+    lapsed: list  # member indexes: attended before, none of the last ANALYTICS_LAPSE trainings
+    turnout: object  # per date: members present
+    rolling_turnout: object  # per date: mean turnout over the ANALYTICS_WINDOW trainings ending there
+
+    def member_index(self, name):
+        name = name.strip().lower()
+        for i, member in enumerate(self.members):
+            if member.lower() == name:
+                return i
+        matches = [i for i, member in enumerate(self.members) if name in member.lower()]
+        return matches[0] if len(matches) == 1 else None
+
+def compute_stats(members, dates, marks):
+    import numpy as np  # deferred: only needed once an admin asks for stats
+
+    n_members, n_dates = len(members), len(dates)
+    if not n_dates:
+        zeros = np.zeros(n_members, dtype=np.int64)
+        return AttendanceStats(members, dates, zeros, zeros, zeros.astype(float), zeros.astype(float),
+                               zeros, zeros, zeros, [], np.zeros(0, dtype=np.int64), np.zeros(0))
+    m = np.frombuffer(marks, dtype=np.uint8).reshape(n_members, n_dates)
+    present = m == PRESENT
+    known = m != BLANK
+
+    # A member's sessions start at their first mark, so later joiners aren't penalised
+    first = np.where(known.any(axis=1), known.argmax(axis=1), n_dates)
+    eligible = np.arange(n_dates)[None, :] >= first[:, None]
+    attended = present.sum(axis=1)
+    sessions = eligible.sum(axis=1)
+
+    # Run lengths of consecutive presents: running count minus the count at the last miss
+    count = present.cumsum(axis=1, dtype=np.int32)
+    reset = np.maximum.accumulate(np.where(present, 0, count), axis=1)
+    runs = count - reset
+    window = min(ANALYTICS_WINDOW, n_dates)
+    recent_sessions = eligible[:, n_dates - window:].sum(axis=1)
+    lapse = min(ANALYTICS_LAPSE, n_dates)
+    lapsed = np.flatnonzero(
+        (attended > 0) & (present[:, n_dates - lapse:].sum(axis=1) == 0) & eligible[:, n_dates - lapse:].all(axis=1)
+    )
+
+    turnout = present.sum(axis=0)
+    cumulative = np.concatenate(([0], turnout.cumsum()))
+    starts = np.maximum(np.arange(n_dates) + 1 - ANALYTICS_WINDOW, 0)
+    rolling = (cumulative[1:] - cumulative[starts]) / (np.arange(n_dates) + 1 - starts)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(sessions > 0, attended / sessions, 0.0)
+        recent_rate = np.where(
+            recent_sessions > 0, present[:, n_dates - window:].sum(axis=1) / np.maximum(recent_sessions, 1), 0.0
+        )
+    return AttendanceStats(
+        members=members,
+        dates=dates,
+        attended=attended,
+        sessions=sessions,
+        rate=rate,
+        recent_rate=recent_rate,
+        current_streak=runs[:, -1],
+        longest_streak=runs.max(axis=1),
+        no_shows=(m == ABSENT).sum(axis=1),
+        lapsed=lapsed.tolist(),
+        turnout=turnout,
+        rolling_turnout=rolling,
+    )
+
+_stats_cache = {}  # chat_id -> (store revision, AttendanceStats)
+_stats_lock = threading.Lock()
+
+def attendance_stats(chat_id):
+    """Cached until ATTENDANCE List is written locally or changes on pull / in another process."""
+    sheets = chat_sheets(chat_id)
+    tab = sheets.config.attendance_tab
+    revision = sheets.store.revision(tab)
+    with _stats_lock:
+        cached = _stats_cache.get(chat_id)
+        if cached and cached[0] == revision:
+            return cached[1]
+        stats = compute_stats(*parse_attendance(sheets.attendance().get_all_values()))
+        _stats_cache[chat_id] = (revision, stats)
+        return stats
+
+# === /attendance [member] ===
+def _md(text):
+    return escape_markdown(text, version=1)
+
+def _overview(stats):
+    if not stats.members or not stats.dates:
+        return "📋 No attendance recorded yet."
+    order = sorted(range(len(stats.members)), key=lambda i: (-stats.rate[i], -stats.attended[i], stats.members[i]))
+    lines = [f"📊 *Attendance* — {len(stats.members)} members, {len(stats.dates)} trainings", "", "*🏆 Top attendance*"]
+    for i in order[:ANALYTICS_TOP]:
+        lines.append(
+            f"• {_md(stats.members[i])}: {stats.attended[i]}/{stats.sessions[i]} ({stats.rate[i]:.0%}), streak {stats.current_streak[i]}"
+        )
+    lines += ["", f"*📅 Recent turnout* (avg over {ANALYTICS_WINDOW})"]
+    for d in range(max(len(stats.dates) - ANALYTICS_TOP, 0), len(stats.dates)):
+        lines.append(f"• {_md(stats.dates[d])}: {stats.turnout[d]} present (avg {stats.rolling_turnout[d]:.1f})")
+    if stats.lapsed:
+        lines += ["", f"*⚠️ Missed the last {ANALYTICS_LAPSE} trainings*"]
+        lines += [f"• {_md(stats.members[i])} (best streak {stats.longest_streak[i]})" for i in stats.lapsed[:ANALYTICS_TOP]]
+        if len(stats.lapsed) > ANALYTICS_TOP:
+            lines.append(f"…and {len(stats.lapsed) - ANALYTICS_TOP} more")
+    return "\n".join(lines)
+
+def _member_detail(stats, i):
+    return (
+        f"👤 *{_md(stats.members[i])}*\n"
+        f"• Attended: {stats.attended[i]}/{stats.sessions[i]} ({stats.rate[i]:.0%})\n"
+        f"• Last {ANALYTICS_WINDOW}: {stats.recent_rate[i]:.0%}\n"
+        f"• Current streak: {stats.current_streak[i]}\n"
+        f"• Longest streak: {stats.longest_streak[i]}\n"
+        f"• Marked absent: {stats.no_shows[i]}"
+    )
+
+@admin_only
+async def attendance_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    msg = update.effective_message
+    chat_id = update.effective_chat.id
+    if chat_config(chat_id) is None:
+        return
+    try:
+        stats = await asyncio.to_thread(attendance_stats, chat_id)
+    except Exception as e:
+        print(f"[ERROR] Failed to compute attendance stats: {e}")
+        await msg.reply_text("❌ Could not read the attendance sheet. Please try again later.")
+        return
+
+    if context.args:
+        i = stats.member_index(" ".join(context.args))
+        if i is None:
+            await msg.reply_text("❌ No single member matches that name.")
+            return
+        text = _member_detail(stats, i)
+    else:
+        text = _overview(stats)
+    await msg.reply_text(text, parse_mode="Markdown")
@@ -0,0 +1,126 @@
+from datetime import time as dt_time
+from zoneinfo import ZoneInfo
+
+from telegram import Update
+from telegram.ext import (
+    ApplicationBuilder, CommandHandler, MessageHandler, CallbackQueryHandler,
+    ConversationHandler, filters, PollAnswerHandler, ChatJoinRequestHandler, ChatMemberHandler, TypeHandler
+)
+
+from .analytics import attendance_command
+from .archive import archive_media_job
+from .callbacks import noop_callback
+from .chats import ignore_unconfigured_chats
+from .coalesce import log_sheets_stats
+from .commands import start, thread_id_command, remind_command, remind_all_job
+from .config import (
+    BOT_TOKEN, ASK_MATRIC, DATE, MODIFY_FIELD, MODIFY_VALUE, UI_STATE_SWEEP_INTERVAL, STORE_SYNC_INTERVAL,
+    SHEETS_STATS_INTERVAL, REMINDER_CHECK_INTERVAL, AUTO_POLL_PLAN_INTERVAL, ARCHIVE_INTERVAL, REMIND_ALL_TIME
+)
+from .conversation import ThreadConversationHandler
+from .membership import (
+    join_request_handler, start_verification, handle_matric, handle_new_member, handle_member_status
+)
+from .moderation import handle_message
+from .modify import (
+    cancel, start_modify, get_modify_field_callback, apply_modify_value,
+    handle_modify_date_selection, handle_modify_status_selection
+)
+from .performance import (
+    topic_type_selection, confirmation_callback, final_date_selection, parse_perf_input, confirmation
+)
+from .perf_calendar import fire_performance_reminders
+from .poll_schedule import plan_training_polls
+from .polls import send_poll_handler, handle_poll_answer
+from .queries import upcoming_command, history_command, query_page_callback
+from .reminders import fire_due_reminders
+from .report import report_command, report_cancel_callback
+from .startup import on_startup, on_shutdown
+from .sync import sync_store_job
+from .ui_state import sweep_ui_state
+
+# === Setup Bot ===
+def build_application():
+    """The bot with all handlers and jobs; shared by the single-process bot and worker processes."""
+    # Pending local writes are pushed to Google Sheets once more on shutdown
+    app = ApplicationBuilder().token(BOT_TOKEN).post_init(on_startup).post_shutdown(on_shutdown).build()
+    
+    # PERF intake and /modify are keyed by (chat, user, thread) so topics can be set up in parallel
+    conv_handler = ThreadConversationHandler(
+        entry_points=[CallbackQueryHandler(topic_type_selection, pattern="^topic_type\\|")],
+        states={
+            DATE: [MessageHandler(filters.TEXT & ~filters.COMMAND, parse_perf_input)],
+        },
+        fallbacks=[],  # 🔧 This is required
+    )
+    
+    # Add the new ConversationHandler
+    modify_conv_handler = ThreadConversationHandler(
+        entry_points=[CommandHandler("modify", start_modify)],
+        states={
+            MODIFY_FIELD: [CallbackQueryHandler(get_modify_field_callback, pattern="^MODIFY\\|")],
+            MODIFY_VALUE: [MessageHandler(filters.TEXT & ~filters.COMMAND, apply_modify_value)],
+        },
+        fallbacks=[CommandHandler("cancel", cancel)],
+        allow_reentry=True,
+    )
+    
+    # New verify handler
+    verify_conv_handler = ConversationHandler(
+        entry_points=[CommandHandler("verify", start_verification)],
+        states={
+            ASK_MATRIC: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_matric)],
+        },
+        fallbacks=[],
+        allow_reentry=True,
+    )
+
+    # Every handler below resolves its group's configuration by chat ID
+    app.add_handler(TypeHandler(Update, ignore_unconfigured_chats), group=-1)
+    app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("threadid", thread_id_command))
+    app.add_handler(CommandHandler("remind", remind_command))
+    app.add_handler(CommandHandler("confirmation", confirmation))  
+    app.add_handler(CommandHandler("attendance", attendance_command))
+    app.add_handler(CommandHandler("report", report_command))
+    app.add_handler(CommandHandler("upcoming", upcoming_command))
+    app.add_handler(CommandHandler("history", history_command))
+    app.add_handler(CallbackQueryHandler(query_page_callback, pattern="^QUERY\\|"))
+    app.add_handler(CallbackQueryHandler(report_cancel_callback, pattern="^REPORT_CANCEL\\|"))
+    app.add_handler(conv_handler)
+    app.add_handler(CallbackQueryHandler(topic_type_selection, pattern="^topic_type\\|"))
+    app.add_handler(CallbackQueryHandler(confirmation_callback, pattern="^CONFIRM\\|"))
+    app.add_handler(CallbackQueryHandler(final_date_selection, pattern="^FINALDATE\\|"))
+    app.add_handler(CallbackQueryHandler(noop_callback, pattern="^NOOP$"))
+    app.add_handler(CallbackQueryHandler(handle_modify_status_selection, pattern="^modify_status_selected\\|"))
+    app.add_handler(modify_conv_handler)
+    app.add_handler(CallbackQueryHandler(handle_modify_date_selection, pattern='^modify_date_selected\\|'))
+    app.add_handler(CommandHandler("poll", send_poll_handler))
+    app.add_handler(PollAnswerHandler(handle_poll_answer))
+    app.add_handler(verify_conv_handler)
+    app.add_handler(ChatMemberHandler(handle_member_status, ChatMemberHandler.CHAT_MEMBER))
+    app.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, handle_new_member))
+    app.add_handler(ChatJoinRequestHandler(join_request_handler))
+    app.add_handler(MessageHandler(filters.ALL, handle_message))
+
+    app.job_queue.run_repeating(sweep_ui_state, interval=UI_STATE_SWEEP_INTERVAL, first=UI_STATE_SWEEP_INTERVAL)
+    # Handlers read/write the local mirror; this job pushes their changes and pulls human edits
+    app.job_queue.run_repeating(sync_store_job, interval=STORE_SYNC_INTERVAL, first=STORE_SYNC_INTERVAL)
+    app.job_queue.run_repeating(log_sheets_stats, interval=SHEETS_STATS_INTERVAL, first=SHEETS_STATS_INTERVAL)
+    app.job_queue.run_repeating(fire_due_reminders, interval=REMINDER_CHECK_INTERVAL, first=REMINDER_CHECK_INTERVAL)
+    # Weekly training poll: planned ahead, then posted by fire_due_reminders at the configured time
+    app.job_queue.run_repeating(plan_training_polls, interval=AUTO_POLL_PLAN_INTERVAL, first=REMINDER_CHECK_INTERVAL)
+    # Background download of media-topic uploads (resumes anything left over from the last run)
+    app.job_queue.run_repeating(archive_media_job, interval=ARCHIVE_INTERVAL, first=ARCHIVE_INTERVAL)
+    # Daily /remind all (zoneinfo, not pytz: a pytz zone on a bare time gets the wrong offset)
+    app.job_queue.run_daily(remind_all_job, time=dt_time.fromisoformat(REMIND_ALL_TIME).replace(tzinfo=ZoneInfo("Asia/Singapore")))
+    # T-minus performance reminders from each chat's calendar heap
+    app.job_queue.run_repeating(fire_performance_reminders, interval=REMINDER_CHECK_INTERVAL, first=REMINDER_CHECK_INTERVAL)
+    return app
+
+def main():
+    print("Bot starting...")
+    app = build_application()
+    print("Bot is running...")
+    # OTHERS List, sheet indexes and admin cache are loaded by warm_up() before polling starts
+    app.run_polling(allowed_updates=Update.ALL_TYPES)
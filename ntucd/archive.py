@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from time import time
+
+import httpx
+
+from .config import (
+    ARCHIVE_DIR, ARCHIVE_CONCURRENCY, ARCHIVE_CHUNK_SIZE, ARCHIVE_BATCH, ARCHIVE_MAX_ATTEMPTS, COORD_PATH, sg_tz
+)
+from .leases import leader_only
+from .update_queue import connect
+
+# === MEDIA ARCHIVE ===
+# Accepted photos and videos in the media topics are queued here (a row insert, nothing else on
+# the moderation path). A leader-only job downloads them in the background:
+#   - streamed to ARCHIVE_DIR/partial/<file_unique_id>.part in chunks, resumed with a Range
+#     request after a restart;
+#   - stored once per content under ARCHIVE_DIR/objects/<sha256[:2]>/<sha256><ext>;
+#   - listed in ARCHIVE_DIR/manifest.jsonl with the group, topic, message and date.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_archive (
+    chat_id INTEGER NOT NULL,
+    file_unique_id TEXT NOT NULL,
+    file_id TEXT NOT NULL,
+    thread_id INTEGER,
+    message_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    caption TEXT,
+    posted_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    sha256 TEXT,  -- set once archived
+    PRIMARY KEY (chat_id, file_unique_id)
+);
+CREATE INDEX IF NOT EXISTS media_archive_pending ON media_archive (posted_at) WHERE sha256 IS NULL;
+"""
+
+_db = None
+_db_lock = threading.Lock()
+_manifest_lock = threading.Lock()
+_running = False
+
+def _get_db():
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = connect(COORD_PATH)
+            _db.executescript(SCHEMA)
+        return _db
+
+def enqueue_media(chat_id, thread_id, msg):
+    """Queues an accepted photo / video / image-or-video document for archiving."""
+    if msg.photo:
+        kind, media = "photo", msg.photo[-1]
+    elif msg.video:
+        kind, media = "video", msg.video
+    elif msg.document:
+        kind, media = "document", msg.document
+    else:
+        return
+    db = _get_db()
+    with _db_lock:
+        db.execute(
+            """
+            INSERT OR IGNORE INTO media_archive (chat_id, file_unique_id, file_id, thread_id, message_id, kind, caption, posted_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (chat_id, media.file_unique_id, media.file_id, thread_id, msg.message_id, kind, msg.caption,
+             msg.date.timestamp() if msg.date else time()),
+        )
+
+def _pending(limit):
+    db = _get_db()
+    with _db_lock:
+        return db.execute(
+            """
+            SELECT chat_id, file_unique_id, file_id, thread_id, message_id, kind, caption, posted_at
+            FROM media_archive WHERE sha256 IS NULL AND attempts < ? ORDER BY posted_at LIMIT ?
+            """,
+            (ARCHIVE_MAX_ATTEMPTS, limit),
+        ).fetchall()
+
+def _set_result(chat_id, file_unique_id, sha256):
+    db = _get_db()
+    with _db_lock:
+        if sha256:
+            db.execute("UPDATE media_archive SET sha256 = ? WHERE chat_id = ? AND file_unique_id = ?",
+                       (sha256, chat_id, file_unique_id))
+        else:
+            db.execute("UPDATE media_archive SET attempts = attempts + 1 WHERE chat_id = ? AND file_unique_id = ?",
+                       (chat_id, file_unique_id))
+
+# --- files (run in threads) ---
+def _hash_existing(sha, path):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(ARCHIVE_CHUNK_SIZE), b""):
+            sha.update(chunk)
+
+def _write_chunk(f, sha, chunk):
+    f.write(chunk)
+    sha.update(chunk)
+
+def _store_object(part, sha256, ext):
+    """Moves a finished download into content-addressed storage; returns its path relative to ARCHIVE_DIR."""
+    rel = os.path.join("objects", sha256[:2], sha256 + ext)
+    dest = os.path.join(ARCHIVE_DIR, rel)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    if os.path.exists(dest):
+        os.remove(part)  # same content was archived before (e.g. a re-encoded forward)
+    else:
+        os.replace(part, dest)
+    return rel
+
+def _append_manifest(entry):
+    with _manifest_lock, open(os.path.join(ARCHIVE_DIR, "manifest.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+# --- download ---
+async def _download(client, url, part):
+    """Streams url into part (resuming what is already there); returns (sha256, size)."""
+    sha = hashlib.sha256()
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    async with client.stream("GET", url, headers=headers) as response:
+        if response.status_code == 416:
+            # The previous run finished the file but stopped before storing it
+            await asyncio.to_thread(_hash_existing, sha, part)
+            return sha.hexdigest(), offset
+        response.raise_for_status()
+        resumed = offset > 0 and response.status_code == 206
+        if resumed:
+            await asyncio.to_thread(_hash_existing, sha, part)
+        size = offset if resumed else 0
+        f = open(part, "ab" if resumed else "wb")
+        try:
+            async for chunk in response.aiter_bytes(ARCHIVE_CHUNK_SIZE):
+                await asyncio.to_thread(_write_chunk, f, sha, chunk)
+                size += len(chunk)
+        finally:
+            f.close()
+    return sha.hexdigest(), size
+
+async def _archive_one(bot, client, slots, row):
+    chat_id, file_unique_id, file_id, thread_id, message_id, kind, caption, posted_at = row
+    async with slots:
+        try:
+            tg_file = await bot.get_file(file_id)  # file_path is a full download URL (contains the token: don't log it)
+            part = os.path.join(ARCHIVE_DIR, "partial", f"{file_unique_id}.part")
+            sha256, size = await _download(client, tg_file.file_path, part)
+            ext = os.path.splitext(tg_file.file_path)[1].lower()
+            rel = await asyncio.to_thread(_store_object, part, sha256, ext)
+            await asyncio.to_thread(_append_manifest, {
+                "sha256": sha256,
+                "path": rel,
+                "size": size,
+                "kind": kind,
+                "chat_id": chat_id,
+                "thread_id": thread_id,
+                "message_id": message_id,
+                "posted_at": datetime.fromtimestamp(posted_at, sg_tz).isoformat(),
+                "caption": caption,
+                "file_unique_id": file_unique_id,
+            })
+            await asyncio.to_thread(_set_result, chat_id, file_unique_id, sha256)
+            print(f"[ARCHIVE] Archived {kind} {file_unique_id} ({size} bytes) from thread {thread_id}.")
+        except Exception as e:
+            await asyncio.to_thread(_set_result, chat_id, file_unique_id, None)
+            # httpx errors carry the download URL, which contains the bot token
+            if isinstance(e, httpx.HTTPStatusError):
+                e = f"HTTP {e.response.status_code}"
+            elif isinstance(e, httpx.HTTPError):
+                e = type(e).__name__
+            print(f"[ARCHIVE] Failed to archive {kind} {file_unique_id}: {e}")
+
+@leader_only
+async def archive_media_job(context):
+    """Job: downloads queued media, ARCHIVE_CONCURRENCY at a time."""
+    global _running
+    if _running:
+        return  # previous run is still downloading
+    _running = True
+    try:
+        rows = await asyncio.to_thread(_pending, ARCHIVE_BATCH)
+        if not rows:
+            return
+        os.makedirs(os.path.join(ARCHIVE_DIR, "partial"), exist_ok=True)
+        slots = asyncio.Semaphore(ARCHIVE_CONCURRENCY)
+        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, read=120.0)) as client:
+            await asyncio.gather(*(_archive_one(context.bot, client, slots, row) for row in rows))
+    finally:
+        _running = False
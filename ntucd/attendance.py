@@ -0,0 +1,182 @@
+from datetime import datetime
+
+from .config import sg_tz
+from .dates import get_next_tuesday
+from .sheets import chat_sheets
+
+def get_attendance_ws(chat_id):
+    return chat_sheets(chat_id).attendance()
+
+def _find_or_create_header_rows(ws):
+    """Ensure row 1 = 'Tele Poll ID', row 2 = 'Training Date'."""
+    values = ws.get_all_values()
+    # Make sure we have at least 2 rows
+    if len(values) < 2:
+        # Ensure at least 2 rows exist (append blanks if needed)
+        need = 2 - len(values)
+        for _ in range(need):
+            ws.append_row([""])
+        values = ws.get_all_values()
+
+    # Set labels if missing
+    if not values or not values[0] or (values[0][0] or "").strip() != "Tele Poll ID":
+        ws.update_acell("A1", "Tele Poll ID")
+    values = ws.get_all_values()  # refresh
+    if len(values) < 2 or not values[1] or (values[1][0] or "").strip() != "Training Date":
+        ws.update_acell("A2", "Training Date")
+
+def _date_label_from_display(date_str: str) -> str:
+    """
+    Your send_poll stores date like 'September 16, 2025'.
+    Attendance headers use short 'd/m' like '16/9'.
+    Convert to 'd/m' (no leading zeros).
+    """
+    date_str = (date_str or "").strip()
+    # Already looks like d/m? just return
+    if "/" in date_str and date_str.count("/") == 1 and all(p.isdigit() for p in date_str.split("/")):
+        return date_str
+
+    # Try common formats
+    for fmt in ("%B %d, %Y", "%d %b %Y", "%d %B %Y"):
+        try:
+            dt = datetime.strptime(date_str, fmt)
+            d, m = dt.day, dt.month
+            return f"{d}/{m}"
+        except Exception:
+            continue
+
+    # Fallback: keep original (won't match headers unless identical)
+    return date_str
+
+def _get_existing_header_row(ws, row_idx: int) -> list[str]:
+    """Returns the full row values (1-based row index)."""
+    return ws.row_values(row_idx)
+
+def _find_or_create_date_column(ws, short_label: str) -> int:
+    """
+    Finds the column index where row 2 ('Training Date') equals short_label.
+    If not found, appends at the next empty column.
+    """
+    header_row = _get_existing_header_row(ws, 2)  # row 2 = Training Date row
+    # Ensure at least col A exists
+    if not header_row:
+        header_row = ["Training Date"]
+        ws.update_acell("A2", "Training Date")
+
+    # Find existing column
+    for idx, val in enumerate(header_row, start=1):
+        if (val or "").strip().lower() == short_label.strip().lower():
+            return idx
+
+    # Not found -> create at next column
+    next_col = len(header_row) + 1
+    ws.update_cell(2, next_col, short_label)  # put header text
+    return next_col
+
+def append_poll(record: dict):
+    """
+    Writes poll_id horizontally under the date column in 'Attendance List'.
+    Layout:
+      Row 1: 'Tele Poll ID' | [poll id under matching date col]
+      Row 2: 'Training Date' | [date labels across]
+    """
+    ws = get_attendance_ws(record["chat_id"])
+    _find_or_create_header_rows(ws)
+
+    # Ensure A1 / A2 labels correct (idempotent)
+    ws.update_acell("A1", "Tele Poll ID")
+    ws.update_acell("A2", "Training Date")
+
+    poll_id = str(record["poll_id"])
+    date_display = record.get("date", "")  # e.g. 'September 16, 2025' or '16/9'
+    date_short = _date_label_from_display(date_display)
+
+    # Find/create the date column under 'Training Date'
+    col = _find_or_create_date_column(ws, date_short)
+
+    # Put the poll id in row 1 at that column
+    ws.update_cell(1, col, poll_id)
+
+def ensure_date_column(chat_id, date_display):
+    """Creates the ATTENDANCE List column for a training ahead of its poll; returns its index."""
+    ws = get_attendance_ws(chat_id)
+    _find_or_create_header_rows(ws)
+    return _find_or_create_date_column(ws, _date_label_from_display(date_display))
+
+def poll_recorded(chat_id, date_display) -> bool:
+    """True if a poll ID is already written under this training's date column."""
+    ws = get_attendance_ws(chat_id)
+    label = _date_label_from_display(date_display).lower()
+    poll_row, date_row = ws.row_values(1), ws.row_values(2)
+    for idx, val in enumerate(date_row[1:], start=1):
+        if (val or "").strip().lower() == label:
+            return idx < len(poll_row) and bool((poll_row[idx] or "").strip())
+    return False
+
+# # === REMINDER ===
+# async def send_reminder(bot, chat_id, thread_id):
+#     next_tuesday = get_next_tuesday()
+#     try:
+#         await bot.send_message(
+#             chat_id=chat_id,
+#             message_thread_id=thread_id,
+#             text=f"Reminder: There's training tomorrow {next_tuesday.strftime('%B %d, %Y')}."
+#         )
+#     except Exception as e:
+#         print(f"[ERROR] Failed to send reminder: {e}")
+
+# === REMINDER (sheet-driven) ===
+async def send_reminder(bot, chat_id, thread_id):
+    try:
+        ws = get_attendance_ws(chat_id)
+        _find_or_create_header_rows(ws)
+
+        # Row 1: poll IDs; Row 2: date labels
+        poll_row = ws.row_values(1)
+        date_row = ws.row_values(2)
+
+        # Normalize lengths
+        max_len = max(len(poll_row), len(date_row))
+        if len(poll_row) < max_len:
+            poll_row += [""] * (max_len - len(poll_row))
+        if len(date_row) < max_len:
+            date_row += [""] * (max_len - len(date_row))
+
+        # Find last column (from right) where a poll id exists
+        last_col = None
+        for idx in range(max_len, 0, -1):
+            if idx == 1:
+                # skip column A (labels) unless you also store IDs there
+                if (poll_row[0] or "").strip().isdigit():
+                    last_col = 1
+                break
+            if (poll_row[idx - 1] or "").strip():
+                last_col = idx
+                break
+
+        # Compute the date to announce
+        if last_col and last_col > 1:
+            date_label_short = (date_row[last_col - 1] or "").strip()  # e.g. '16/9'
+            # Format nicely for chat: '16 Sep 2025' if possible; if only dd/mm, keep it
+            pretty_date = date_label_short
+            # Try to map dd/mm to a full date this/next year (optional):
+            try:
+                d, m = [int(x) for x in date_label_short.split("/")]
+                # Heuristic: if today's month > m, assume next year; else this year
+                today = datetime.now(sg_tz)
+                year = today.year + (1 if today.month > m else 0)
+                dt = datetime(year, m, d, tzinfo=sg_tz)
+                pretty_date = dt.strftime("%d %b %Y")
+            except Exception:
+                pass
+        else:
+            # Fallback to computed next Tuesday
+            pretty_date = get_next_tuesday().strftime("%d %b %Y")
+
+        await bot.send_message(
+            chat_id=chat_id,
+            message_thread_id=thread_id,
+            text=f"Reminder: There's training tomorrow {pretty_date}."
+        )
+    except Exception as e:
+        print(f"[ERROR] Failed to send reminder: {e}")
@@ -0,0 +1,73 @@
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes
+
+# === DEFERRED CALLBACK WORK ===
+# Button handlers that go on to do several Sheets / Telegram calls answer the callback straight
+# away (a toast), swap the keyboard for a "working" button and do the rest in a background task.
+# A second tap on the same message while its task runs only gets a toast. Unless the task deleted
+# or re-rendered the message, the original keyboard is put back afterwards, so a task that stops
+# early (or fails, which is also reported in the topic) never leaves a dead "working" button.
+
+WORKING_MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("⏳ Working…", callback_data="NOOP")]])
+
+_running = {}  # (chat_id, message_id) -> asyncio.Task
+
+def _message_key(query):
+    return (query.message.chat.id, query.message.message_id)
+
+async def callback_busy(query) -> bool:
+    """
+    True (after a toast) if a deferred task for this message is still running. Handlers that act on
+    other buttons of the same message inline (e.g. toggles) check this first, so they don't edit a
+    keyboard the task is working on.
+    """
+    if _message_key(query) not in _running:
+        return False
+    await query.answer("⏳ Still working on it…")
+    return True
+
+async def run_deferred(update: Update, context: ContextTypes.DEFAULT_TYPE, work, toast="⏳ Working…", description="action"):
+    """
+    Answers the callback with `toast` and runs `work()` (a coroutine function) as a tracked task.
+    work() returns True if it deleted or re-rendered the message; otherwise its keyboard is restored.
+    Returns without doing anything (but a toast) if this message's previous task is still running.
+    """
+    query = update.callback_query
+    if await callback_busy(query):
+        return
+    key = _message_key(query)
+    original_markup = query.message.reply_markup
+    _running[key] = None  # claimed before the first await, so a quick second tap is debounced too
+    try:
+        await query.answer(toast)
+        await query.edit_message_reply_markup(reply_markup=WORKING_MARKUP)
+    except Exception as e:
+        print(f"[DEBUG] Could not show working state: {e}")
+
+    async def run():
+        replaced = False
+        try:
+            replaced = await work()
+        except Exception as e:
+            print(f"[ERROR] Background {description} failed: {e}")
+            try:
+                await context.bot.send_message(
+                    query.message.chat.id, f"❌ The {description} failed. Please try again.",
+                    message_thread_id=query.message.message_thread_id if query.message.is_topic_message else None,
+                )
+            except Exception as e2:
+                print(f"[ERROR] Could not report the failed {description}: {e2}")
+        finally:
+            if not replaced:
+                try:
+                    await query.edit_message_reply_markup(reply_markup=original_markup)
+                except Exception:
+                    pass  # message already gone
+            _running.pop(key, None)
+
+    # Application.create_task: awaited on shutdown, so a confirmation isn't cut off halfway
+    _running[key] = context.application.create_task(run(), update=update)
+
+async def noop_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """The "working" button: only acknowledges the tap."""
+    await update.callback_query.answer("⏳ Still working on it…")
@@ -0,0 +1,103 @@
+import json
+import os
+from datetime import date
+from dataclasses import dataclass, field
+from typing import Optional
+
+from telegram.ext import ApplicationHandlerStop
+
+from .config import (
+    CHATS_FILE, CHAT_ID, SHEET_NAME, SHEET_TAB_NAME, ATTENDANCE_TAB, WELCOME_TEA_SHEET_NAME,
+    GENERAL_TOPIC_ID, TOPIC_VOTING_ID, TOPIC_MEDIA_IDS, TOPIC_BLOCKED_ID, EXEMPTED_THREAD_IDS, STORE_PATH,
+    AUTO_POLL_ENABLED, AUTO_POLL_WEEKDAY, AUTO_POLL_TIME, SKIP_TRAINING_DATES
+)
+
+# === PER-CHAT CONFIGURATION ===
+# One process can serve several groups. Each group's topic policy, spreadsheet and tabs come
+# from CHATS_FILE (see chats.example.json); without the file the constants in config.py are
+# used for a single group.
+
+@dataclass
+class ChatConfig:
+    chat_id: int
+    name: str = ""
+    sheet_name: str = SHEET_NAME
+    performance_tab: str = SHEET_TAB_NAME
+    attendance_tab: str = ATTENDANCE_TAB
+    performer_tab: str = "PERFORMER Info"
+    others_tab: str = "OTHERS List"
+    poll_results_tab: str = "POLL Results"  # final tallies of closed polls (created on first use)
+    welcome_tea_sheet: str = WELCOME_TEA_SHEET_NAME
+    welcome_tea_tab: str = "Form Responses 1"
+    general_topic_id: Optional[int] = GENERAL_TOPIC_ID
+    voting_topic_id: Optional[int] = None
+    media_topic_ids: list = field(default_factory=list)
+    blocked_topic_id: Optional[int] = None
+    exempted_thread_ids: list = field(default_factory=list)  # extra topics left alone (e.g. chat)
+    store_path: Optional[str] = None
+    auto_poll: bool = AUTO_POLL_ENABLED  # post the training poll in the voting topic automatically
+    poll_weekday: int = AUTO_POLL_WEEKDAY
+    poll_time: str = AUTO_POLL_TIME
+    skip_training_dates: list = field(default_factory=lambda: list(SKIP_TRAINING_DATES))
+
+    def __post_init__(self):
+        self.media_topic_ids = frozenset(self.media_topic_ids)
+        # Every policy topic is exempt from the PERF/OTHERS set-up prompt
+        self.exempted_thread_ids = frozenset(
+            [self.general_topic_id, self.voting_topic_id, self.blocked_topic_id, *self.exempted_thread_ids]
+        ) | self.media_topic_ids
+        if self.store_path is None:
+            root, ext = os.path.splitext(STORE_PATH)
+            self.store_path = f"{root}_{abs(self.chat_id)}{ext}"
+        # "YYYY-MM-DD" or "YYYY-MM-DD..YYYY-MM-DD" -> (first, last) inclusive
+        self.skip_training_dates = tuple(
+            (date.fromisoformat(start), date.fromisoformat(end or start))
+            for start, _, end in (entry.partition("..") for entry in self.skip_training_dates)
+        )
+
+    def skips_training(self, training_date):
+        return any(first <= training_date <= last for first, last in self.skip_training_dates)
+
+    @property
+    def mirrored_tabs(self):
+        return [self.performance_tab, self.attendance_tab, self.performer_tab, self.others_tab]
+
+    @property
+    def interactive_tabs(self):
+        # Pushed first and ahead of other Sheets work; the rest is membership/topic bookkeeping
+        return {self.performance_tab, self.attendance_tab}
+
+
+def _default_chats():
+    config = ChatConfig(
+        chat_id=CHAT_ID,
+        voting_topic_id=TOPIC_VOTING_ID,
+        media_topic_ids=TOPIC_MEDIA_IDS,
+        blocked_topic_id=TOPIC_BLOCKED_ID,
+        exempted_thread_ids=EXEMPTED_THREAD_IDS,
+    )
+    return {config.chat_id: config}
+
+def load_chats(path=CHATS_FILE):
+    if not os.path.exists(path):
+        return _default_chats()
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)["chats"]
+    chats = {}
+    for entry in entries:
+        config = ChatConfig(**entry)
+        chats[config.chat_id] = config
+    print(f"[INFO] Loaded {len(chats)} chat configuration(s) from {path}.")
+    return chats
+
+CHATS = load_chats()  # chat_id -> ChatConfig
+
+def chat_config(chat_id) -> Optional[ChatConfig]:
+    return CHATS.get(chat_id)
+
+async def ignore_unconfigured_chats(update, context):
+    """Runs before every handler: drops updates from groups that have no configuration."""
+    chat = update.effective_chat
+    if chat and chat.type in ("group", "supergroup") and chat.id not in CHATS:
+        print(f"[DEBUG] Ignoring update from unconfigured chat {chat.id}.")
+        raise ApplicationHandlerStop
@@ -0,0 +1,87 @@
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+from .config import SHEETS_READ_FRESHNESS
+from .quota import sheets_scheduler
+
+# === READ COALESCING ===
+# Concurrent identical Sheets reads share one request, and a result stays reusable for
+# SHEETS_READ_FRESHNESS seconds unless the spreadsheet is written to meanwhile.
+
+_SPREADSHEET_URL = re.compile(r"/spreadsheets/([^/:?]+)(.*)$")
+
+def read_key(endpoint, params=None):
+    """(spreadsheet id, tab/range part of the path, query params) for a Sheets GET."""
+    match = _SPREADSHEET_URL.search(endpoint)
+    spreadsheet_id, path = match.groups() if match else ("", endpoint)
+    return spreadsheet_id, path, repr(sorted((params or {}).items()))
+
+
+class ReadCoalescer:
+    def __init__(self, freshness=SHEETS_READ_FRESHNESS):
+        self.freshness = freshness
+        self._lock = threading.Lock()
+        self._inflight = {}  # (generation, key) -> Future
+        self._fresh = {}  # key -> (fetched_at, generation, result)
+        self._generation = Counter()  # spreadsheet id -> writes seen
+        self.stats = Counter()
+
+    @property
+    def saved_requests(self):
+        return self.stats["coalesced"] + self.stats["fresh_hits"]
+
+    def read(self, key, fetch):
+        spreadsheet_id = key[0]
+        with self._lock:
+            generation = self._generation[spreadsheet_id]
+            cached = self._fresh.get(key)
+            if cached and cached[1] == generation and time.monotonic() - cached[0] < self.freshness:
+                self.stats["fresh_hits"] += 1
+                return cached[2]
+            # Reads started after a write never join a fetch that began before it
+            flight = self._inflight.get((generation, key))
+            leader = flight is None
+            if leader:
+                flight = Future()
+                self._inflight[(generation, key)] = flight
+        if not leader:
+            self.stats["coalesced"] += 1
+            return flight.result()
+
+        try:
+            result = fetch()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop((generation, key), None)
+                self.stats["fetched"] += 1
+                if flight.exception() is None and self._generation[spreadsheet_id] == generation:
+                    now = time.monotonic()
+                    for stale in [k for k, v in self._fresh.items() if now - v[0] >= self.freshness]:
+                        del self._fresh[stale]
+                    self._fresh[key] = (now, generation, flight.result())
+
+    def invalidate(self, spreadsheet_id):
+        with self._lock:
+            self._generation[spreadsheet_id] += 1
+            for key in [k for k in self._fresh if k[0] == spreadsheet_id]:
+                del self._fresh[key]
+
+
+read_coalescer = ReadCoalescer()
+
+async def log_sheets_stats(context):
+    """Job: how many Sheets reads were saved and how often requests queued for quota."""
+    print(
+        f"[STATS] Sheets reads: {read_coalescer.stats['fetched']} fetched, "
+        f"{read_coalescer.saved_requests} saved ({read_coalescer.stats['coalesced']} coalesced, "
+        f"{read_coalescer.stats['fresh_hits']} fresh); quota: {dict(sheets_scheduler.stats)}"
+    )
@@ -0,0 +1,217 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from .admin import admin_only
+from .chats import CHATS, chat_config
+from .config import REMIND_ALL_DAYS, sg_tz
+from .dates import parse_formatted_date
+from .leases import leader_only
+from .outbound import send_limited
+from .reminders import claim_send, release_send
+from .sheets import get_gspread_sheet
+
+# === START ===
+@admin_only
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):    
+    chat = update.effective_chat
+    thread_id = getattr(update.effective_message, "message_thread_id", "N/A")
+    await update.message.reply_text("👋 Hi!")
+    print(f"[DEBUG] Chat ID: {chat.id}, Thread ID: {thread_id}")
+
+# === /threadid ===
+@admin_only
+async def thread_id_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    
+    msg = update.effective_message
+    if msg.is_topic_message:
+        await msg.reply_text(f"\U0001F9F5 This topic's thread ID is: {msg.message_thread_id}", parse_mode="Markdown")
+    else:
+        await msg.reply_text("\u2757 This command must be used *inside a topic*.", parse_mode="Markdown")
+    try:
+        await update.message.delete()  # delete the command sent by user
+    except Exception as e:
+        print(f"[DEBUG] Failed to delete /threadid command: {e}")
+
+# === /remind command ===
+def performance_reminder_text(row):
+    date_str = row.get("CONFIRMED DATE | TIME", "").strip()
+    date_lines = "\n".join([f"• {d.strip()}" for d in date_str.splitlines() if d.strip()])
+    return (
+        f"📢 *Performance Reminder*\n\n"
+        f"📍 *Event*\n• {row['EVENT']}\n\n"
+        f"📅 *Date | Time*\n{date_lines}\n\n"
+        f"📌 *Location*\n• {row['LOCATION']}\n\n"
+        f"*📝 Final Preparation Notes*\n\n"
+        f"*👀 Glasses & Contact Lens*\n"
+        f"If you wear glasses, try your best to perform without them (e.g. wear contact lens). Default is *no glasses* on stage. Make sure you're comfortable before show day.\n\n"
+        f"*⬇️💪 Shave Your Armpits*\n"
+        f"We want the audience to focus on our performance, not our underarms 🪒😌 So please make sure to shave before the show!\n\n"
+        f"*🎽 Costume Tips*\n"
+        f"Our costumes are sleeveless and v-neck. Avoid wearing bright-colored bras (neon pink/yellow/rainbow 🌈). A black sports bra is best.\n\n"
+        f"*🦶 Barefoot Reminder*\n"
+        f"Everyone will be performing *barefoot*. Don't forget!\n\n"
+        f"*💇 Hair Tying*\n"
+        f"If you have long hair, please tie it up neatly. You can also ask someone to help if needed.\n\n"
+        f"*📺 Recap the Drum Score*\n"
+        f"Make sure to go through the performance videos again and recap the score before the show. Stay sharp!"
+    )
+
+def due_performances(records, days, now=None):
+    """ACCEPTED rows with a confirmed date in the next `days` days, each with its earliest such date."""
+    today = (now or datetime.now(sg_tz)).date()
+    last = today + timedelta(days=days)
+    due = []
+    for row in records:
+        if str(row.get("STATUS", "")).strip().upper() != "ACCEPTED" or not str(row.get("THREAD ID", "")).strip():
+            continue
+        dates = [d.date() for d in map(parse_formatted_date, str(row.get("CONFIRMED DATE | TIME", "")).splitlines()) if d]
+        upcoming = [d for d in dates if today <= d <= last]
+        if upcoming:
+            due.append((row, min(upcoming)))
+    return due
+
+async def send_performance_reminders(bot, chat_id, days):
+    """
+    Reminds every due performance topic of the chat, concurrently under the outbound rate limit.
+    Each (topic, performance date) is only ever reminded once. Returns a Counter of sent/already/failed.
+    """
+    records = await asyncio.to_thread(get_gspread_sheet(chat_id).get_all_records)  # one snapshot for all topics
+    counts = Counter()
+
+    async def remind(row, thread_id, event_date):
+        key = f"perf:{chat_id}:{thread_id}:{event_date.isoformat()}"
+        # The key is only claimable while the date is ahead: purge it once the day is over
+        day_after = sg_tz.localize(datetime.combine(event_date + timedelta(days=1), datetime.min.time()))
+        if not await asyncio.to_thread(claim_send, key, day_after.timestamp()):
+            counts["already"] += 1
+            return
+        try:
+            await send_limited(chat_id, lambda: bot.send_message(
+                chat_id=chat_id,
+                text=performance_reminder_text(row),
+                parse_mode="Markdown",
+                message_thread_id=thread_id
+            ))
+            counts["sent"] += 1
+        except Exception as e:
+            await asyncio.to_thread(release_send, key)
+            counts["failed"] += 1
+            print(f"[ERROR] Failed to send performance reminder to thread {thread_id}: {e}")
+
+    tasks = []
+    for row, event_date in due_performances(records, days):
+        thread_id = str(row["THREAD ID"]).strip()
+        if not thread_id.isdigit():
+            # Checked up front: one bad row must not abort the gather after others were claimed
+            print(f"[WARN] Skipping performance reminder for invalid THREAD ID {thread_id!r}.")
+            counts["invalid"] += 1
+            continue
+        tasks.append(remind(row, int(thread_id), event_date))
+    await asyncio.gather(*tasks)
+    return counts
+
+@leader_only
+async def remind_all_job(context):
+    """Job: daily /remind all for every group."""
+    for chat_id in CHATS:
+        try:
+            counts = await send_performance_reminders(context.bot, chat_id, REMIND_ALL_DAYS)
+            print(f"[INFO] Scheduled performance reminders for chat {chat_id}: {dict(counts)}")
+        except Exception as e:
+            print(f"[ERROR] Scheduled performance reminders failed for chat {chat_id}: {e}")
+
+async def _remind_all(context, chat_id, thread_id):
+    args = context.args[1:]
+    days = int(args[0]) if args and args[0].isdigit() else REMIND_ALL_DAYS
+    try:
+        counts = await send_performance_reminders(context.bot, chat_id, days)
+    except Exception as e:
+        print(f"[ERROR] Failed to execute /remind all: {e}")
+        await context.bot.send_message(chat_id, "❌ Failed to send reminders. Please try again later.", message_thread_id=thread_id)
+        return
+    if not sum(counts.values()):
+        text = f"ℹ️ No ACCEPTED performances in the next {days} day(s)."
+    else:
+        text = f"📢 Sent {counts['sent']} performance reminder(s) for the next {days} day(s)."
+        if counts["already"]:
+            text += f" {counts['already']} had already been reminded."
+        if counts["failed"]:
+            text += f" ❌ {counts['failed']} failed (will be retried next time)."
+        if counts["invalid"]:
+            text += f" ⚠️ {counts['invalid']} skipped: no valid THREAD ID in the sheet."
+    await context.bot.send_message(chat_id, text, message_thread_id=thread_id)
+
+@admin_only
+async def remind_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    msg = update.effective_message
+    chat_id = msg.chat_id
+    thread_id = msg.message_thread_id
+
+    print("[DEBUG] /remind triggered.")
+    print(f"[DEBUG] Thread ID: {thread_id}")
+
+    # Delete the command message
+    try:
+        await msg.delete()
+        print("[DEBUG] Deleted /remind command message.")
+    except Exception as e:
+        print(f"[WARNING] Failed to delete /remind command message: {e}")
+
+    # /remind all [days]: every ACCEPTED performance coming up, from any topic
+    if context.args and context.args[0].lower() == "all":
+        await _remind_all(context, chat_id, thread_id if msg.is_topic_message else None)
+        return
+
+    # Guard clause: must be inside a topic
+    if not msg.is_topic_message:
+        print("[DEBUG] Not a topic message. Ignoring.")
+        return
+
+    # Guard clause: exempted thread
+    if thread_id in chat_config(chat_id).exempted_thread_ids:
+        print("[DEBUG] Thread is exempted. Skipping.")
+        return
+
+    try:
+        sheet = get_gspread_sheet(chat_id)
+        records = sheet.get_all_records()
+
+        for row in records:
+            if str(row["THREAD ID"]) == str(thread_id):
+                status = row.get("STATUS", "").strip().upper()
+                if status != "ACCEPTED":
+                    await context.bot.send_message(
+                        chat_id=chat_id,
+                        text="⚠️ Reminder can only be used *after confirmation*.",
+                        parse_mode="Markdown",
+                        message_thread_id=thread_id
+                    )
+                    print("[DEBUG] Status not ACCEPTED. Reminder skipped.")
+                    return
+
+                # === Compose reminder message ===
+                template = performance_reminder_text(row)
+                await context.bot.send_message(
+                    chat_id=chat_id,
+                    text=template,
+                    parse_mode="Markdown",
+                    message_thread_id=thread_id
+                )
+                print("[DEBUG] Reminder message sent.")
+                return
+
+        # ❌ Not found
+        await context.bot.send_message(
+            chat_id=chat_id,
+            text="❌ This thread has not been registered.",
+            parse_mode="Markdown",
+            message_thread_id=thread_id
+        )
+        print("[DEBUG] Thread ID not found in GSheet.")
+
+    except Exception as e:
+        print(f"[ERROR] Failed to execute /remind: {e}")
@@ -0,0 +1,145 @@
+import os
+
+import pytz
+
+sg_tz = pytz.timezone("Asia/Singapore")
+
+# === CONFIGURATION ===
+BOT_TOKEN = os.environ.get("BOT_TOKEN")
+GOOGLE_CREDENTIALS_JSON = os.environ.get("GOOGLE_CREDENTIALS_JSON")
+SHEET_NAME = "NTUCD AY25/26 Timeline"
+SHEET_TAB_NAME = "PERFORMANCE List"
+ATTENDANCE_TAB = "ATTENDANCE List"
+CHAT_ID = -1002590844000 # Main group Chat ID
+# Groups served by this process (topic policy, spreadsheet, tabs); see chats.example.json.
+# Without this file the main-group settings in this module are used.
+CHATS_FILE = os.environ.get("NTUCD_CHATS_FILE", "chats.json")
+WELCOME_TEA_SHEET_NAME = "NTUCD Welcome Tea Registration 2025 (Responses)"
+SHEETS_SCOPES = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+SHEETS_POOL_SIZE = 10  # keep-alive connections kept open to the Sheets API
+TOKEN_REFRESH_MARGIN = 300  # seconds before expiry to refresh the access token
+SHEETS_READ_QUOTA = 60  # requests per minute (Sheets API per-user default)
+SHEETS_WRITE_QUOTA = 60
+SHEETS_READ_FRESHNESS = 2.0  # seconds an identical read can be answered from the last result
+SHEETS_STATS_INTERVAL = 3600  # seconds between [STATS] log lines
+SHEETS_MAX_ATTEMPTS = 4  # per request, for 429 / 5xx / network errors
+SHEETS_BACKOFF_BASE = 1.0  # seconds, doubled per attempt (full jitter)
+SHEETS_BACKOFF_CAP = 30.0
+SHEETS_MAX_RETRYING = 2  # requests allowed to wait on a retry at once; the rest fail fast
+SHEETS_BREAKER_THRESHOLD = 5  # consecutive failures before Sheets calls fail fast
+SHEETS_BREAKER_COOLDOWN = 30  # seconds before a probe request; doubles while Sheets stays down
+SHEETS_BREAKER_MAX_COOLDOWN = 300
+
+# State for conversation handler
+ASK_MATRIC = 1234
+
+# === Conversation states ===
+DATE, EVENT, LOCATION = range(3)
+MODIFY_FIELD, MODIFY_VALUE = range(3, 5) 
+
+# Add column names used in your Google Sheet
+SHEET_COLUMNS = ["THREAD ID", "EVENT", "PROPOSED DATE | TIME", "LOCATION", "PERFORMANCE INFO", "CONFIRMED DATE | TIME", "STATUS"]
+
+# Thread access configuration, for main group
+GENERAL_TOPIC_ID = None
+TOPIC_VOTING_ID = 4
+TOPIC_MEDIA_IDS = [25, 75]
+TOPIC_BLOCKED_ID = 5 # score
+
+# Add exempt thread IDs here: # threadid 11 is for chat (For Main Group)
+EXEMPTED_THREAD_IDS = [GENERAL_TOPIC_ID, TOPIC_VOTING_ID, TOPIC_BLOCKED_ID, 11] + TOPIC_MEDIA_IDS
+
+# === CACHES ===
+ADMIN_CACHE_TTL = 600  # seconds
+UI_STATE_TTL = 2 * 3600  # abandoned prompts/selections expire after this much inactivity
+UI_STATE_PIN_TTL = 120 * 24 * 3600  # pinned summary / interest poll pointers (about a semester)
+UI_STATE_MAX_THREADS = 500
+UI_STATE_SWEEP_INTERVAL = 600  # seconds
+UI_STATE_DELETE_ORPHANS = True  # delete prompts left behind by expired selections
+IDEMPOTENCY_CACHE_SIZE = 2000  # recent sheet-write keys remembered to drop duplicates (double taps, redelivered updates)
+IDEMPOTENCY_TTL = 6 * 3600  # seconds a key blocks the same write
+CONVERSATION_TIMEOUT = UI_STATE_TTL  # an abandoned PERF intake / /modify flow (and its data) ends after this
+CONVERSATION_MAX_THREADS = 20  # flows one user can have open at once; the least recently used is dropped
+MULTISELECT_PAGE_SIZE = 8  # options per page of a date selection keyboard
+
+# === FLOOD CONTROL (moderated topics) ===
+FLOOD_LIMIT = 8  # messages by one user in one topic...
+FLOOD_WINDOW = 10  # ...within this many seconds count as a flood
+FLOOD_RESTRICT_SECONDS = 600  # Telegram treats < 30s or > 366 days as a permanent restriction
+FLOOD_PURGE_DELAY = 2  # seconds to collect messages still in flight before deleting them together
+FLOOD_MAX_TRACKED = 5000  # (chat, user, topic) buffers kept before idle ones are pruned
+
+# === MEDIA ARCHIVE ===
+ARCHIVE_DIR = os.environ.get("NTUCD_ARCHIVE_DIR", "media_archive")  # objects/, partial/, manifest.jsonl
+ARCHIVE_INTERVAL = 60  # seconds between runs of the download job
+ARCHIVE_BATCH = 50  # queued files taken per run
+ARCHIVE_CONCURRENCY = 3  # downloads at once
+ARCHIVE_CHUNK_SIZE = 256 * 1024  # bytes held in memory per download
+ARCHIVE_MAX_ATTEMPTS = 5  # a file that keeps failing is left in the queue after this
+
+# === LOCAL SHEET MIRROR ===
+STORE_PATH = os.environ.get("NTUCD_STORE_PATH", "ntucd_store.sqlite3")  # one file per chat: ntucd_store_<id>.sqlite3
+STORE_SYNC_INTERVAL = 15  # seconds between Sheets pull/push rounds
+
+# === SCALE-OUT (python -m ntucd ingress / python -m ntucd worker) ===
+# Update queue, leases and scheduled reminders; ingress and workers must share this file
+COORD_PATH = os.environ.get("NTUCD_COORD_PATH", "ntucd_coord.sqlite3")
+QUEUE_PARTITIONS = 64  # updates of one (chat, thread) always land in the same partition
+QUEUE_POLL_INTERVAL = 0.2  # seconds a worker sleeps when its partitions are empty
+QUEUE_BATCH_SIZE = 100
+QUEUE_RETENTION = 24 * 3600  # processed updates are purged after this long
+LEASE_TTL = 30  # seconds; a dead worker's partitions / leadership move on after this
+LEASE_RENEW_INTERVAL = 5  # renewed from a task of its own, however long handlers take
+PARTITION_HANDOFF_IDLE = 600  # seconds without updates before a surplus partition goes to a new worker
+REMINDER_CHECK_INTERVAL = 30  # seconds between checks for due reminders
+REMINDER_GRACE = 6 * 3600  # reminders overdue by more than this (e.g. after downtime) are dropped
+SENT_REMINDER_PURGE_INTERVAL = 3600  # seconds between purges of sent-reminder keys of past events
+SENT_REMINDER_RETENTION = 90 * 24 * 3600  # keys recorded without an event time are kept this long
+
+# === AUTOMATIC TRAINING POLL ===
+# Defaults for each group (chats.json can override per group: auto_poll, poll_weekday, poll_time,
+# skip_training_dates). The poll is posted on poll_weekday before each Tuesday training.
+AUTO_POLL_ENABLED = True
+AUTO_POLL_WEEKDAY = 2  # 0 = Monday ... 6 = Sunday (Asia/Singapore)
+AUTO_POLL_TIME = "12:00"
+SKIP_TRAINING_DATES = []  # holiday / exam weeks: "2025-11-18" or "2025-11-18..2025-12-09"
+AUTO_POLL_HORIZON = 2  # upcoming trainings planned (attendance column created) ahead of time
+AUTO_POLL_PLAN_INTERVAL = 3600  # seconds between planning runs
+AUTO_POLL_RETRY = 300  # seconds before retrying a poll that failed to post
+
+# === OUTBOUND RATE LIMIT (bulk sends) ===
+TELEGRAM_GROUP_RATE = 20  # messages per minute to one group (Telegram's limit)
+TELEGRAM_GLOBAL_RATE = 25  # messages per second overall (Telegram allows about 30)
+
+# === BULK PERFORMANCE REMINDERS (/remind all [days]) ===
+REMIND_ALL_DAYS = 3  # ACCEPTED performances with a confirmed date within this many days
+REMIND_ALL_TIME = "09:00"  # daily automatic run (Asia/Singapore)
+
+# === T-MINUS PERFORMANCE REMINDERS ===
+# Sent automatically before each confirmed date of an ACCEPTED performance ("<n>d", "<n>h" or "<n>m").
+# Dates without a time only get the day-based ones, at REMIND_ALL_TIME.
+PERFORMANCE_REMINDER_OFFSETS = ["7d", "1d", "3h"]
+
+# === POLL CLOSING ===
+# Polls are stopped at a cutoff and their final tally is written to each group's POLL Results tab
+TRAINING_START_TIME = "19:00"  # training polls close when training starts (Asia/Singapore)
+INTEREST_POLL_CLOSE_DAYS = 7  # interest polls close this many days before the earliest proposed date
+
+# === /attendance ANALYTICS ===
+ANALYTICS_WINDOW = 8  # trainings in the "recent" rate and the rolling turnout
+ANALYTICS_LAPSE = 3  # members who attended before but missed this many in a row are flagged
+ANALYTICS_TOP = 10  # rows per section in the /attendance overview
+
+# === /upcoming and /history ===
+QUERY_PAGE_SIZE = 10  # performances per page
+QUERY_CACHE_SIZE = 100  # result sets kept for the page buttons (least recently used dropped)
+
+# === /report ===
+REPORT_WORKERS = 2  # processes aggregating attendance for /report
+REPORT_CHUNK_ROWS = 200  # members per task sent to a report process
+REPORT_PROGRESS_INTERVAL = 2  # seconds between progress message edits
+
+# === STARTUP WARM-UP ===
+STARTUP_WARMUP_DEADLINE = float(os.environ.get("STARTUP_WARMUP_DEADLINE", "20"))  # seconds
+# Polling only starts once these are ready (or the deadline passes)
+CRITICAL_WARMUPS = {"sheets_client", "store", "others_list", "performance_index", "admins"}
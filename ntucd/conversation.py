@@ -0,0 +1,79 @@
+from time import monotonic
+
+import telegram
+from telegram.ext import ConversationHandler
+
+from .config import CONVERSATION_TIMEOUT, CONVERSATION_MAX_THREADS
+
+# === THREAD-AWARE CONVERSATIONS ===
+# PTB has no public hook for the conversation key, so ThreadConversationHandler extends the private
+# ConversationHandler._get_key. That is only known to work on the pinned PTB version
+# (requirements.txt); on any other version the bot refuses to start instead of silently falling
+# back to one conversation per (chat, user).
+PTB_TESTED_VERSION = "21.5"
+
+def _check_ptb():
+    if telegram.__version__ != PTB_TESTED_VERSION or not callable(getattr(ConversationHandler, "_get_key", None)):
+        raise RuntimeError(
+            f"ThreadConversationHandler is tested on python-telegram-bot {PTB_TESTED_VERSION}, found "
+            f"{telegram.__version__}. Check ConversationHandler._get_key still builds the key, then update PTB_TESTED_VERSION."
+        )
+
+_check_ptb()
+
+def thread_key(update):
+    msg = update.effective_message
+    return getattr(msg, "message_thread_id", None) if msg else None
+
+class ThreadConversationHandler(ConversationHandler):
+    """
+    ConversationHandler keyed by (chat, user, topic thread) instead of (chat, user), so the
+    same admin (or several admins) can run a flow in different topics at the same time.
+    Abandoned flows end after CONVERSATION_TIMEOUT, like their conversation_data.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("per_chat", True)
+        kwargs.setdefault("per_user", True)
+        kwargs.setdefault("conversation_timeout", CONVERSATION_TIMEOUT)
+        super().__init__(*args, **kwargs)
+
+    def _get_key(self, update):
+        key = super()._get_key(update)
+        if not isinstance(key, tuple):
+            raise RuntimeError(f"Unexpected ConversationHandler key {key!r}; PTB internals changed.")
+        return (*key, thread_key(update))
+
+def conversation_data(update, context) -> dict:
+    """Scratch space for one flow, keyed by (chat, thread, user)."""
+    key = (update.effective_chat.id, thread_key(update))
+    threads = context.user_data.setdefault("threads", {})
+    touched = context.user_data.setdefault("threads_touched", {})
+    touched.pop(key, None)
+    touched[key] = monotonic()  # re-inserted: oldest first
+    while len(touched) > CONVERSATION_MAX_THREADS:
+        oldest = next(iter(touched))
+        del touched[oldest]
+        threads.pop(oldest, None)
+    return threads.setdefault(key, {})
+
+def end_conversation_data(update, context):
+    key = (update.effective_chat.id, thread_key(update))
+    context.user_data.get("threads", {}).pop(key, None)
+    context.user_data.get("threads_touched", {}).pop(key, None)
+
+def expire_conversation_data(user_data, now=None):
+    """Drops flows untouched for CONVERSATION_TIMEOUT from every user's data; returns how many."""
+    if now is None:
+        now = monotonic()
+    expired = 0
+    for data in list(user_data.values()):
+        threads = data.get("threads", {})
+        touched = data.get("threads_touched", {})
+        for key in list(touched):
+            if now - touched[key] < CONVERSATION_TIMEOUT:
+                break
+            del touched[key]
+            threads.pop(key, None)
+            expired += 1
+    return expired
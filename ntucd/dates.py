@@ -0,0 +1,151 @@
+import re
+from datetime import date, timedelta, datetime, time
+
+from .config import sg_tz, TRAINING_START_TIME, INTEREST_POLL_CLOSE_DAYS
+
+# === TIME HELPERS ===
+def get_next_tuesday(today=None):
+    if today is None:
+        today = date.today()
+    days_ahead = (1 - today.weekday() + 7) % 7
+    if days_ahead == 0:
+        days_ahead = 7
+    return today + timedelta(days=days_ahead)
+
+def get_next_monday_8pm(now=None):
+    if now is None:
+        now = datetime.now(sg_tz)
+    days_until_monday = (7 - now.weekday()) % 7
+    next_monday = now + timedelta(days=days_until_monday)
+    naive_dt = datetime.combine(next_monday, time(22, 0))
+    this_monday_8pm = sg_tz.localize(naive_dt)
+    if now >= this_monday_8pm:
+        return this_monday_8pm + timedelta(days=7)
+    return this_monday_8pm
+
+def get_training_eve_reminder(training_date):
+    """10PM on the evening before training (Asia/Singapore)."""
+    return sg_tz.localize(datetime.combine(training_date - timedelta(days=1), time(22, 0)))
+
+def get_training_start(training_date):
+    hour, minute = (int(part) for part in TRAINING_START_TIME.split(":"))
+    return sg_tz.localize(datetime.combine(training_date, time(hour, minute)))
+
+def parse_formatted_date(date_str):
+    """Reads back a parse_flexible_date result ('24 JUN 2025 | 2:30pm' or '24 JUN 2025'); None if it isn't one."""
+    day_part, _, time_part = date_str.strip().partition("|")
+    try:
+        day = datetime.strptime(day_part.strip().title(), "%d %b %Y")
+        if time_part.strip():
+            clock = datetime.strptime(time_part.strip().upper(), "%I:%M%p")
+            day = day.replace(hour=clock.hour, minute=clock.minute)
+    except ValueError:
+        return None
+    return sg_tz.localize(day)
+
+def get_interest_poll_cutoff(date_strs, now=None):
+    """INTEREST_POLL_CLOSE_DAYS before the earliest proposed date, or that date itself if that is already past."""
+    now = now or datetime.now(sg_tz)
+    starts = [d for d in map(parse_formatted_date, date_strs) if d]
+    if not starts:
+        return None
+    earliest = min(starts)
+    cutoff = earliest - timedelta(days=INTEREST_POLL_CLOSE_DAYS)
+    if cutoff > now:
+        return cutoff
+    return earliest if earliest > now else None
+
+def parse_flexible_date(date_str: str) -> str:
+    original = date_str.strip()
+    lower = original.lower()
+
+    # Normalize dot-separated times (e.g., 2.30 → 2:30)
+    lower = re.sub(r'(\d{1,2})\.(\d{2})', r'\1:\2', lower)
+
+    # Normalize 4-digit shorthand times (e.g., 1430 → 14:30)
+    lower = re.sub(r'\b(\d{4})\b', lambda m: f"{m.group(1)[:2]}:{m.group(1)[2:]}", lower)
+
+    # Normalize 3-4 digit shorthand times like 830am → 8:30 am
+    lower = re.sub(r'\b(\d{1,2})(\d{2})(am|pm)\b', r'\1:\2 \3', lower)
+
+    # Normalize AM/PM time (e.g., 2pm → 2:00 pm, 2:30pm → 2:30 pm)
+    lower = re.sub(r'(\d{1,2}:\d{2})(am|pm)\b', r'\1 \2', lower)
+    lower = re.sub(r'\b(\d{1,2})(am|pm)\b', r'\1:00 \2', lower)
+
+    # Match formats like: 24jun25 2:30pm, 24june2025, 24jun 2pm, 24june26
+    pattern = re.match(r"(\d{1,2})[\s-]?([a-zA-Z]{3,9})[\s-]?(\d{2,4})?(?:\s+(\d{1,2}:\d{2}(?:\s?(?:am|pm))?))?$", lower)
+    if not pattern:
+        raise ValueError(f"❌ Invalid date format: '{original}'\n👉 Use formats like '24jun25' or '24jun25 2:30pm'.")
+
+    day, month, year, time_part = pattern.groups()
+
+    # Default year to current year if not given
+    if not year:
+        year = str(datetime.now().year)
+    elif len(year) == 2:
+        year = "20" + year
+
+    # Build datetime string
+    date_time_str = f"{day} {month} {year}"
+    if time_part:
+        date_time_str += f" {time_part}"
+
+        # Try valid time formats (first 24h, then 12h)
+        for fmt in ("%d %b %Y %H:%M", "%d %B %Y %H:%M", "%d %b %Y %I:%M %p", "%d %B %Y %I:%M %p"):
+            try:
+                dt = datetime.strptime(date_time_str, fmt)
+                time_str = dt.strftime("%I:%M%p").lstrip("0").lower()
+                return f"{dt.strftime('%d %b %Y').upper()} | {time_str}"
+            except ValueError:
+                continue
+
+        raise ValueError(f"❌ Time format is invalid: '{time_part}'\n👉 Use formats like 2pm, 2:30pm, 1430")
+
+    # No time part → just parse date
+    for fmt in ("%d %b %Y", "%d %B %Y"):
+        try:
+            dt = datetime.strptime(f"{day} {month} {year}", fmt)
+            return dt.strftime("%d %b %Y").upper()
+        except ValueError:
+            continue
+
+    raise ValueError(f"❌ Date format is invalid: '{original}'\n👉 Use formats like '24jun25', not numeric months.")
+
+def parse_and_format_dates(dates_str):
+    parts = [p.strip() for p in dates_str.split(",")]
+    results = []
+    invalid_parts = []
+
+    for part in parts:
+        if not part:
+            invalid_parts.append("(empty)")
+            continue
+        try:
+            formatted = parse_flexible_date(part)
+            results.append(formatted)
+        except ValueError:
+            invalid_parts.append(part)
+
+    if invalid_parts:
+        if len(parts) == 1:
+            # 🟥 Single entry error
+            raise ValueError(
+                "❌ Invalid *date/time* format.\n"
+                "👉 Use formats like:\n"
+                "- `23aug25 8:30pm`\n"
+                "- `23aug 1430`\n"
+                "- `23aug25`\n"
+                "- `23aug`\n"
+                "\n⚠️ Make sure your input uses letters for month (e.g. `aug`, not `08`)."
+            )
+        else:
+            # 🟥 Multiple entry error
+            raise ValueError(
+                "❌ One or more *date/time* entries are invalid.\n"
+                "👉 Use correct comma `,` between entries and formats like:\n"
+                "- `23aug 8pm, 24aug 9pm`\n"
+                "- `23aug25 1430, 24aug25`\n"
+                "\n⚠️ Use *letter months*, not numeric (e.g. `aug`, not `08`)."
+            )
+
+    return results
@@ -0,0 +1,99 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from time import monotonic
+
+from telegram import ChatPermissions
+
+from .config import FLOOD_LIMIT, FLOOD_WINDOW, FLOOD_RESTRICT_SECONDS, FLOOD_PURGE_DELAY, FLOOD_MAX_TRACKED
+
+# === FLOOD CONTROL ===
+# Non-admin messages in moderated topics are counted per (chat, user, thread) in a ring buffer of
+# the last FLOOD_LIMIT messages; an album (one media_group_id) counts as one message. When all of
+# them fall inside FLOOD_WINDOW seconds the user is restricted once and their tracked messages are
+# deleted in one bulk call, so a raid costs a constant number of API calls per user instead of one
+# delete per message.
+
+@dataclass
+class Restriction:
+    until: float
+    pending: list = field(default_factory=list)  # message ids sent before the restriction took effect
+    flush_scheduled: bool = False
+
+class FloodGuard:
+    def __init__(self, limit=FLOOD_LIMIT, window=FLOOD_WINDOW):
+        self.limit = limit
+        self.window = window
+        # (chat_id, user_id, thread_id) -> deque of (sent_at, media_group_id, [message_id, ...]), oldest first
+        self._recent = {}
+        self.restricted = {}  # (chat_id, user_id) -> Restriction
+
+    def record(self, chat_id, user_id, thread_id, message_id, now=None, media_group_id=None) -> bool:
+        """Adds a message; True if the user's last `limit` messages in the thread came within `window`."""
+        now = now or monotonic()
+        key = (chat_id, user_id, thread_id)
+        recent = self._recent.get(key)
+        if recent is None:
+            if len(self._recent) >= FLOOD_MAX_TRACKED:
+                self._prune(now)
+            recent = self._recent[key] = deque(maxlen=self.limit)
+        if media_group_id is not None and recent and recent[-1][1] == media_group_id:
+            recent[-1][2].append(message_id)  # the rest of an album: deleted with it, not counted again
+            return False
+        recent.append((now, media_group_id, [message_id]))
+        return len(recent) == self.limit and now - recent[0][0] <= self.window
+
+    def take_messages(self, chat_id, user_id):
+        """Tracked message ids of a user in every thread of the chat; forgets them."""
+        keys = [key for key in self._recent if key[0] == chat_id and key[1] == user_id]
+        return [message_id for key in keys for *_, message_ids in self._recent.pop(key) for message_id in message_ids]
+
+    def _prune(self, now):
+        for key in [k for k, recent in self._recent.items() if now - recent[-1][0] > self.window]:
+            del self._recent[key]
+        for key in [k for k, r in self.restricted.items() if r.until <= now and not r.flush_scheduled]:
+            del self.restricted[key]
+
+flood_guard = FloodGuard()
+
+async def _purge(bot, chat_id, message_ids):
+    for start in range(0, len(message_ids), 100):  # Telegram's limit per bulk delete
+        try:
+            await bot.delete_messages(chat_id, message_ids[start:start + 100])
+        except Exception as e:
+            print(f"[ERROR] Failed to bulk delete {len(message_ids[start:start + 100])} messages: {e}")
+
+async def _flush_pending(bot, chat_id, restriction):
+    await asyncio.sleep(FLOOD_PURGE_DELAY)
+    message_ids, restriction.pending = restriction.pending, []
+    restriction.flush_scheduled = False
+    await _purge(bot, chat_id, message_ids)
+
+async def check_flood(context, chat_id, user_id, thread_id, message_id, media_group_id=None) -> bool:
+    """True if the message is part of a flood and has been dealt with (skip further handling)."""
+    now = monotonic()
+    restriction = flood_guard.restricted.get((chat_id, user_id))
+    if restriction and restriction.until > now:
+        # Still arriving from before the restriction: collect and delete them together
+        restriction.pending.append(message_id)
+        if not restriction.flush_scheduled:
+            restriction.flush_scheduled = True
+            context.application.create_task(_flush_pending(context.bot, chat_id, restriction))
+        return True
+
+    if not flood_guard.record(chat_id, user_id, thread_id, message_id, now, media_group_id):
+        return False
+
+    message_ids = flood_guard.take_messages(chat_id, user_id)
+    flood_guard.restricted[(chat_id, user_id)] = Restriction(until=now + FLOOD_RESTRICT_SECONDS)
+    print(f"[FLOOD] User {user_id} sent {flood_guard.limit} messages in {flood_guard.window}s in thread {thread_id}. "
+          f"Restricting for {FLOOD_RESTRICT_SECONDS}s and deleting {len(message_ids)} messages.")
+    try:
+        await context.bot.restrict_chat_member(
+            chat_id, user_id, ChatPermissions.no_permissions(), until_date=timedelta(seconds=FLOOD_RESTRICT_SECONDS)
+        )
+    except Exception as e:
+        print(f"[ERROR] Failed to restrict user {user_id}: {e}")
+    await _purge(context.bot, chat_id, message_ids)
+    return True
@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+from .config import IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL
+
+# === IDEMPOTENT WRITES ===
+# Sheet writes made on behalf of an update are keyed by where they came from plus what they change.
+# A key seen within IDEMPOTENCY_TTL turns the write into a no-op, so a redelivered update or a
+# double tap on a button can't append a row twice or spend quota rewriting the same cells.
+# Keys live in a bounded LRU in this process; updates of one topic are always handled by the
+# same process, so that is where their duplicates arrive.
+
+class IdempotencyKeys:
+    def __init__(self, size=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._keys = OrderedDict()  # key -> claimed at (monotonic); least recently claimed first
+        self._lock = threading.Lock()
+
+    def claim(self, key) -> bool:
+        """True the first time key is seen (within ttl); False for a duplicate."""
+        now = monotonic()
+        with self._lock:
+            claimed_at = self._keys.get(key)
+            if claimed_at is not None and now - claimed_at < self.ttl:
+                return False
+            self._keys[key] = now
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.size:
+                self._keys.popitem(last=False)
+            return True
+
+    def release(self, key):
+        """Forgets key after its write failed, so a retry goes through."""
+        with self._lock:
+            self._keys.pop(key, None)
+
+recent_writes = IdempotencyKeys()
+
+def update_key(update, mutation, *parts):
+    """
+    Key for a mutation made while handling update. Every button tap has its own callback ID, so
+    taps are keyed by the message the keyboard is on (one confirmation per keyboard); anything
+    else by its update ID (the same update delivered again).
+    """
+    query = update.callback_query
+    if query and query.message:
+        source = ("keyboard", query.message.chat.id, query.message.message_id)
+    else:
+        source = ("update", update.update_id)
+    return (*source, mutation, *parts)
+
+def write_once(key, write, *args, **kwargs) -> bool:
+    """Runs write(*args, **kwargs) unless key was applied recently; False if it was skipped."""
+    if not recent_writes.claim(key):
+        print(f"[INFO] Skipped duplicate write {key}.")
+        return False
+    try:
+        write(*args, **kwargs)
+    except Exception:
+        recent_writes.release(key)
+        raise
+    return True
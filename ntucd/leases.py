@@ -0,0 +1,131 @@
+import math
+import os
+import socket
+import threading
+from functools import wraps
+from time import time
+
+from .config import COORD_PATH, QUEUE_PARTITIONS, LEASE_TTL, LEASE_RENEW_INTERVAL, PARTITION_HANDOFF_IDLE
+from .update_queue import connect
+
+# === LEASES (worker mode) ===
+# Workers heartbeat into `workers` and hold time-limited leases: one per queue partition they
+# consume, plus 'scheduler' for the single leader that runs the scheduled jobs. A lease that
+# is not renewed within LEASE_TTL (worker crashed or hung) can be taken over by another worker.
+# A worker stops using its leases once they may have expired (valid_until), even before it learns
+# they were taken. Surplus partitions are only handed to a new worker after PARTITION_HANDOFF_IDLE
+# without updates, because a topic's in-memory state (open conversations, selections, pending
+# verifications, polls) stays in the process that handled it.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workers (
+    owner TEXT PRIMARY KEY,
+    heartbeat REAL NOT NULL
+);
+"""
+
+LEADER_LEASE = "scheduler"
+
+
+class LeaseManager:
+    def __init__(self, path=COORD_PATH, owner=None, ttl=LEASE_TTL):
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.ttl = ttl
+        self.is_leader = False
+        self.partitions = set()
+        self.valid_until = 0.0  # leases may have been taken over after this (epoch)
+        self.last_active = {}  # partition -> when this worker last handled one of its updates
+        self._lock = threading.Lock()
+        self._db = connect(path)
+        self._db.executescript(SCHEMA)
+
+    def _try_acquire(self, name, now):
+        cur = self._db.execute(
+            """
+            INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE leases.owner = excluded.owner OR leases.expires_at < ?
+            """,
+            (name, self.owner, now + self.ttl, now),
+        )
+        return cur.rowcount > 0
+
+    def tick(self):
+        """Heartbeat, renew held leases, contend for leadership and rebalance partitions."""
+        now = time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("INSERT OR REPLACE INTO workers (owner, heartbeat) VALUES (?, ?)", (self.owner, now))
+                self._db.execute("DELETE FROM workers WHERE heartbeat < ?", (now - self.ttl,))
+                (live,) = self._db.execute("SELECT COUNT(*) FROM workers").fetchone()
+                fair_share = math.ceil(QUEUE_PARTITIONS / max(live, 1))
+
+                was_leader = self.is_leader
+                self.is_leader = self._try_acquire(LEADER_LEASE, now)
+                if self.is_leader != was_leader:
+                    print(f"[LEASE] {self.owner} {'is now' if self.is_leader else 'is no longer'} the scheduler leader.")
+
+                held = {p for p in self.partitions if self._try_acquire(f"partition:{p}", now)}
+                # Give back partitions above our share so newly started workers get some, quietest first
+                quiet = sorted(
+                    (p for p in held if now - self.last_active.get(p, 0) >= PARTITION_HANDOFF_IDLE),
+                    key=lambda p: self.last_active.get(p, 0),
+                )
+                for p in quiet[:max(len(held) - fair_share, 0)]:
+                    self._db.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (f"partition:{p}", self.owner))
+                    held.discard(p)
+                for p in range(QUEUE_PARTITIONS):
+                    if len(held) >= fair_share:
+                        break
+                    if p not in held and self._try_acquire(f"partition:{p}", now):
+                        held.add(p)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            if held != self.partitions:
+                print(f"[LEASE] {self.owner} now consumes {len(held)} of {QUEUE_PARTITIONS} partitions ({live} worker(s)).")
+            self.partitions = held
+            # Stop a renew interval early: another worker may take them the moment they expire
+            self.valid_until = now + self.ttl - LEASE_RENEW_INTERVAL
+            return held
+
+    def owns(self, partition):
+        """Whether updates of partition may still be handled here."""
+        return partition in self.partitions and time() < self.valid_until
+
+    def touch(self, partition):
+        self.last_active[partition] = time()
+
+    def release_all(self):
+        with self._lock:
+            self._db.execute("DELETE FROM leases WHERE owner = ?", (self.owner,))
+            self._db.execute("DELETE FROM workers WHERE owner = ?", (self.owner,))
+            self.partitions = set()
+            self.is_leader = False
+            self.valid_until = 0.0
+
+
+_manager = None  # set in worker mode; a single polling process is always the leader
+
+def set_lease_manager(manager):
+    global _manager
+    _manager = manager
+
+def is_leader():
+    return _manager is None or (_manager.is_leader and time() < _manager.valid_until)
+
+def leader_only(job):
+    """Job callbacks wrapped with this run on one process only, however many workers are up."""
+    @wraps(job)
+    async def wrapper(*args, **kwargs):
+        if not is_leader():
+            return
+        return await job(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,63 @@
+import threading
+from hashlib import blake2b
+
+from .config import COORD_PATH
+from .update_queue import connect
+
+# === MEDIA DEDUPLICATION ===
+# Photos, videos and image/video documents posted in the media topics are remembered by a 64-bit
+# digest of Telegram's file_unique_id (the same for every re-upload or forward of a file). The set
+# lives in the coordination file, so it survives restarts and is shared by worker processes, and
+# costs about 30 bytes per upload on disk. Each digest keeps the message it was first seen in, so
+# a redelivered update (queue delivery is at-least-once) is never taken for its own repeat.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_seen (
+    chat_id INTEGER NOT NULL,
+    digest INTEGER NOT NULL,
+    message_id INTEGER,  -- first message with this file
+    PRIMARY KEY (chat_id, digest)
+) WITHOUT ROWID;
+"""
+
+_db = None
+_db_lock = threading.Lock()
+
+def _get_db():
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = connect(COORD_PATH)
+            _db.executescript(SCHEMA)
+            # Files recorded before message ids were kept
+            if "message_id" not in {column[1] for column in _db.execute("PRAGMA table_info(media_seen)")}:
+                _db.execute("ALTER TABLE media_seen ADD COLUMN message_id INTEGER")
+        return _db
+
+def media_digest(file_unique_id):
+    return int.from_bytes(blake2b(file_unique_id.encode(), digest_size=8).digest(), "big", signed=True)
+
+def media_file_id(msg):
+    """file_unique_id of a photo (largest size), video or image/video document; None otherwise."""
+    if msg.animation:
+        return None  # GIFs also carry a document; they aren't allowed in the media topics anyway
+    if msg.photo:
+        return msg.photo[-1].file_unique_id
+    if msg.video:
+        return msg.video.file_unique_id
+    if msg.document and (msg.document.mime_type or "").startswith(("image/", "video/")):
+        return msg.document.file_unique_id
+    return None
+
+def seen_before(chat_id, file_unique_id, message_id) -> bool:
+    """Records the file for the chat; True if another message had already posted it there. Blocking."""
+    db = _get_db()
+    digest = media_digest(file_unique_id)
+    with _db_lock:
+        cursor = db.execute("INSERT OR IGNORE INTO media_seen (chat_id, digest, message_id) VALUES (?, ?, ?)",
+                            (chat_id, digest, message_id))
+        if cursor.rowcount:
+            return False
+        (first,) = db.execute("SELECT message_id FROM media_seen WHERE chat_id = ? AND digest = ?",
+                              (chat_id, digest)).fetchone()
+    return first != message_id
@@ -0,0 +1,248 @@
+import asyncio
+from datetime import datetime
+
+from telegram import Update, ChatMember
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes, ConversationHandler
+
+from .admin import admin_cache
+from .config import ASK_MATRIC
+from .quota import sheets_priority, INTERACTIVE, BACKGROUND
+from .sheets import chat_sheets
+from .state import pending_users
+
+# Join request 
+async def join_request_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user = update.chat_join_request.from_user
+    #FORM_LINK = "https://docs.google.com/forms/d/e/1FAIpQLSdZkIn2NC3TkLCLJpgB-jynKSlAKZg_vqw0bu3vywu4tqTzIg/viewform?usp=header"
+
+    print(f"Join request received from {user.first_name}")
+
+    # Always send the form
+    # First message
+    try:
+        await context.bot.send_message(
+            chat_id=user.id,
+            text=(
+                f"Hi {user.first_name}, Welcome!!🥁\n\n"
+                "<b>NTU Chinese Drums' Welcome Tea Session</b>\n"
+                "<b>Date:</b> 19th August 2025 (Tuesday)\n"
+                "<b>Time:</b> 1830 – 2130 (GMT+8)\n"
+                "<b>Venue:</b> <a href='https://goo.gl/maps/7yqc3EfYNE92'>Nanyang House Foyer</a>\n"
+                "<b>Dress Code:</b> Comfortable & Casual (we generally go barefoot for our practices/performances, "
+                "so preferably wear slippers – but covered shoes are fine too!)\n\n"
+                "🍱 <b>Dinner is provided</b> and time is allocated to eat, so no need to dabao. You can come straight from class!\n\n"
+                "<b>🗺 Video Guide to Nanyang House</b>\n"
+                "▶️ <b>Red Bus (Hall 2) Video Guide:</b>\n"
+                "<a href='https://drive.google.com/file/d/1PWvvD4kmmnYbFOL0AzE25NEiQ2983ZJl/view?usp=drive_link'>Watch here</a>\n"
+                "▶️ <b>Blue Bus (Hall 6) Video Guide:</b>\n"
+                "<a href='https://drive.google.com/file/d/1ZFmAQHcFQL6VpNzO87UG6KB0u0FuOAlh/view?usp=drive_link'>Watch here</a>\n"
+                "📄 <b>PDF Guide to Nanyang House:</b>\n"
+                "<a href='https://drive.google.com/file/d/1pO1GoNn4MReqFXqBUowyZPL7EJqKpmHb/view?usp=drive_link'>View PDF</a>\n\n"
+            ),
+            parse_mode=ParseMode.HTML
+        )  
+
+        # Send registration form link
+        await context.bot.send_message(
+            chat_id=user.id,
+            text=(
+                f"🌸 To make our Welcome Tea run smoothly, we’d love it if you could fill in the sign-up form below 📝💛\n"
+                f"<a href='https://docs.google.com/forms/d/e/1FAIpQLSdZkIn2NC3TkLCLJpgB-jynKSlAKZg_vqw0bu3vywu4tqTzIg/viewform?usp=header'>Registration Form</a>\n"
+                f"(you can ignore this if you’ve already done so ✔️)\n\n"
+                f"💬 If you have any queries, feel free to contact:\n"
+                f"👉 Chairperson Brandon: @Brandonkjj\n"
+                f"👉 Vice-chairperson Pip Hui: @pip_1218\n\n"
+                f"👋 See you next Tuesday! 🎉"
+            ),
+            parse_mode=ParseMode.HTML
+        )
+    except Exception as e:
+        print("Could not message user:", e)
+
+    # ✅ Store their pending join request
+    pending_users[user.id] = update.chat_join_request
+
+async def start_verification(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.message.from_user.id
+
+    if user_id not in pending_users:
+        await update.message.reply_text(
+            "❌ You don't have a pending join request or it has already been approved. Please request to join the group first\n\n"
+            "Any issues feel free to contact chairperson Brandon @Brandonkjj or vice-chairperson Pip Hui @pip_1218 on telegram!"
+        )
+        return ConversationHandler.END
+
+    await update.message.reply_text("Please enter your NTU matriculation number (case sensitive) to verify. e.g U2512345F")
+    return ASK_MATRIC
+
+async def handle_matric(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.message.from_user.id
+    matric = update.message.text.strip()
+
+    if user_id not in pending_users:
+        await update.message.reply_text(
+            "❌ You don't have a pending join request or it has already been approved. Please request to join the group first.\n\n"
+            "Any issues feel free to contact chairperson Brandon @Brandonkjj or vice-chairperson Pip Hui @pip_1218 on telegram!"
+        )
+        return ConversationHandler.END
+
+    join_request = pending_users[user_id]
+    # /verify runs in the private chat; the group being joined decides which records to check
+    sheets = chat_sheets(join_request.chat.id)
+
+    try:
+        # The applicant is waiting on this one; run it off the event loop ahead of background Sheets work
+        with sheets_priority(INTERACTIVE):
+            verified = await asyncio.to_thread(sheets.matric_valid, matric)
+    except Exception as e:
+        print(f"[ERROR] Could not check matric {matric}: {e}")
+        await update.message.reply_text(
+            "⚠️ We can't reach our registration records right now. Please send your matric number again in a few minutes."
+        )
+        return ASK_MATRIC
+
+    if verified:
+        await join_request.approve()
+        try:
+            with sheets_priority(BACKGROUND):
+                await asyncio.to_thread(update_user_id_in_sheet, sheets, matric, user_id)
+        except Exception as e:
+            print(f"[ERROR] Failed to save User ID {user_id} for {matric}: {e}")
+        await update.message.reply_text(
+            "✅ Matric number and attendance verified. You have been approved. Welcome!"
+        )
+        pending_users.pop(user_id, None)
+        return ConversationHandler.END
+
+    else:
+        await update.message.reply_text(
+            "❌ We couldn't verify your matric number or attendance. Please check your entry and try again.\n\n"
+            "🔁 Please enter your NTU matriculation number (case sensitive) again e.g U2512345F:\n\n"
+            "Any issues feel free to contact chairperson Brandon @Brandonkjj or vice-chairperson Pip Hui @pip_1218 on telegram!"
+        )
+        # Stay in ASK_MATRIC state
+        return ASK_MATRIC
+
+def copy_user_to_timeline(sheets, welcome_row: dict, telegram_user_id: int):
+    others_sheet = sheets.performer_info()
+    name = welcome_row.get("Your Full Name (according to matric card)", "").strip()
+    nickname = welcome_row.get("What name or nickname do you prefer to be called? ", "").strip()
+
+    # Compose a new row
+    new_row = [name, nickname, str(telegram_user_id), "Join", ""]
+
+    # Append to the PERFORMER Info List
+    others_sheet.append_row(new_row, value_input_option="USER_ENTERED")
+    sheets.performer_user_ids.add(str(telegram_user_id))
+    print(f"[INFO] Copied to PERFORMER Info List: {new_row}")
+
+def update_user_id_in_sheet(sheets, matric_number: str, telegram_user_id: int):
+    sheet = sheets.welcome_tea()
+    rows = sheet.get_all_records()
+
+    for idx, row in enumerate(rows, start=2):  # +2 because get_all_records() skips header, rows start at index 2
+        matric_in_row = str(row.get("Matriculation Number", "")).strip().upper()
+        if matric_in_row == matric_number.strip().upper():
+            # Assume there is a column named 'User ID'
+            user_id_col = None
+            header = sheet.row_values(1)
+            for i, col_name in enumerate(header, start=1):
+                if col_name.strip().lower() == "user id":
+                    user_id_col = i
+                    break
+
+            if user_id_col:
+                sheet.update_cell(idx, user_id_col, str(telegram_user_id))
+                print(f"[INFO] User ID {telegram_user_id} saved for {matric_number} in row {idx}.")
+
+                # ✅ Copy to timeline sheet — PERFORMER info
+                copy_user_to_timeline(sheets, row, telegram_user_id)
+
+            else:
+                print("[ERROR] 'User ID' column not found in sheet.")
+            return
+
+    print("[WARN] Matric number not found when trying to update User ID.")
+
+# Manually adding new member
+async def handle_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    sheets = chat_sheets(update.effective_chat.id)
+    for member in update.message.new_chat_members:
+        user_id = member.id
+        name = member.first_name or member.last_name
+
+        print(f"[INFO] ✅ New member joined: {name} ({user_id})")
+        print(f"[DEBUG] Telegram user object: is_bot={member.is_bot}, full_name={member.full_name}")
+
+        if sheets.user_in_timeline(user_id):  # Avoid double entries
+            print(f"[INFO] User ID {user_id} already exists in timeline — skipping fallback insert.")
+        else:
+            # Fallback row → use name for both name & nickname
+            fallback_row = {
+                "Your Full Name (according to matric card)": name,
+                "What name or nickname do you prefer to be called? ": name
+            }
+            copy_user_to_timeline(sheets, fallback_row, user_id)
+
+async def handle_member_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    status_change = update.chat_member
+    old_status = status_change.old_chat_member.status
+    new_status = status_change.new_chat_member.status
+    user = status_change.new_chat_member.user
+    
+    print(f"[DEBUG] Status change for {user.full_name} ({user.id}): {old_status} ➝ {new_status}")
+
+    # Keep the admin cache in step with promotions/demotions
+    cached = admin_cache.get(status_change.chat.id)
+    if cached:
+        if new_status in (ChatMember.ADMINISTRATOR, ChatMember.OWNER):
+            cached[1].add(user.id)
+        else:
+            cached[1].discard(user.id)
+
+    # ✅ Detect first join
+    if old_status == "left" and new_status == "member":
+        print(f"[INFO] 🎉 User {user.full_name} ({user.id}) has joined the group for the first time.")
+        
+        if not chat_sheets(status_change.chat.id).user_in_timeline(user.id):
+            fallback_row = {
+                "Your Full Name (according to matric card)": user.full_name,
+                "What name or nickname do you prefer to be called? ": user.full_name
+            }
+            copy_user_to_timeline(chat_sheets(status_change.chat.id), fallback_row, user.id)
+        else:
+            print(f"[INFO] User {user.id} already exists in sheet — skip adding.")
+    
+    # ✅ Detect leave (either voluntarily or kicked)
+    elif old_status in ("member", "administrator") and new_status in ("left", "kicked"):
+        print(f"[INFO] 🚪 User {user.full_name} ({user.id}) has left the group.")
+        success = mark_user_left_in_sheet(chat_sheets(status_change.chat.id), user.id)
+        print(f"[INFO] Marked as 'Left' in sheet: {success}")
+
+def mark_user_left_in_sheet(sheets, user_id: int) -> bool:
+    sheet = sheets.performer_info()
+    records = sheet.get_all_records()
+    header = sheet.row_values(1)
+
+    # Get column indexes
+    user_id_col = header.index("User ID") + 1
+    status_col = header.index("Status") + 1 if "Status" in header else None
+    leave_date_col = header.index("Leave Date") + 1 if "Leave Date" in header else None
+
+    # If any expected column is missing, return False
+    if not (user_id_col and status_col and leave_date_col):
+        print("[ERROR] Missing required columns: 'User ID', 'Status', or 'Leave Date'")
+        return False
+
+    for idx, row in enumerate(records, start=2):  # +2: header + 1-based index
+        if str(row.get("User ID", "")).strip() == str(user_id):
+            # Update 'Status' to 'Left'
+            sheet.update_cell(idx, status_col, "Left")
+            # Update 'Leave Date' to now
+            leave_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            sheet.update_cell(idx, leave_date_col, leave_time)
+            return True
+
+    print(f"[WARN] User ID {user_id} not found in sheet.")
+    return False
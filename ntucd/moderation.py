@@ -0,0 +1,166 @@
+import asyncio
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes
+
+from .admin import is_admin
+from .archive import enqueue_media
+from .chats import chat_config
+from .flood import check_flood
+from .media_index import media_file_id, seen_before
+from .sheets import chat_sheets
+from .state import initialized_topics
+from .ui_state import ui_state
+
+# === Restriction handler ===
+async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    msg = update.effective_message
+    user = update.effective_user
+    chat = update.effective_chat  # ✅ always handy!
+    thread_id = msg.message_thread_id
+    config = chat_config(chat.id)
+    if config is None:
+        return  # private chats and groups this process doesn't manage
+    sheets = chat_sheets(chat.id)
+    user_is_admin = await is_admin(update, context)
+
+    print(f"[DEBUG] handle_message called by user {user.id} in thread {thread_id}")
+    print(f"[DEBUG] user_is_admin: {user_is_admin}")
+
+    if thread_id in config.exempted_thread_ids or sheets.is_others_thread(thread_id):
+        pass
+    else:
+        if msg.is_topic_message and (chat.id, thread_id) not in initialized_topics:
+            initialized_topics.add((chat.id, thread_id))
+
+            if sheets.thread_registered(thread_id):
+                return
+
+            if user_is_admin:
+                keyboard = InlineKeyboardMarkup([
+                    [InlineKeyboardButton("PERF", callback_data=f"topic_type|PERF|{thread_id}")],
+                    [InlineKeyboardButton("OTHERS", callback_data=f"topic_type|OTHERS|{thread_id}")]
+                ])
+                prompt = await chat.send_message(
+                    "What's the topic for? PERF or OTHERS?",
+                    reply_markup=keyboard,
+                    message_thread_id=thread_id
+                )
+                ui_state.get(chat.id, thread_id).init_prompt = prompt.message_id
+
+            # ✅ SAFE DELETE
+            if chat.type in ["group", "supergroup"]:
+                await msg.delete()
+            else:
+                print(f"[DEBUG] Not a group — skip delete.")
+            return
+
+    # === THREAD MESSAGE RESTRICTIONS ===
+    # restrict all actions except for admin users
+    if not user_is_admin:
+
+        # Floods in moderated topics are handled in bulk (restrict + one delete call)
+        moderated = (
+            thread_id is None or thread_id == config.voting_topic_id
+            or thread_id in config.media_topic_ids or thread_id == config.blocked_topic_id
+        )
+        if moderated and chat.type in ["group", "supergroup"]:
+            if await check_flood(context, chat.id, user.id, thread_id, msg.message_id, msg.media_group_id):
+                return
+
+        # Restrict all command messages (e.g., /command)
+        if msg.text and msg.text.startswith("/"):
+            print(f"[DEBUG] User {user.id} sent command in thread {thread_id}. Deleting.")
+            if chat.type in ["group", "supergroup"]:
+                try:
+                    await msg.delete()
+                except Exception as e:
+                    print(f"[ERROR] Failed to delete command message: {e}")
+            else:
+                print(f"[DEBUG] Not a group — skip delete.")
+
+        # About NTUCD — block all messages
+        if thread_id is None:
+            print(f"[DEBUG] Message in ABOUT NTUCD. Deleting.")
+            if chat.type in ["group", "supergroup"]:
+                try:
+                    await msg.delete()
+                except Exception as e:
+                    print(f"[ERROR] Failed to delete message in ABOUT thread: {e}")
+            else:
+                print(f"[DEBUG] Not a group — skip delete.")
+
+        # Voting Topic — only allow replies to polls
+        elif thread_id == config.voting_topic_id:
+            if msg.poll or not (msg.reply_to_message and msg.reply_to_message.poll):
+                print(f"[DEBUG] Message not a poll or poll reply in VOTING. Deleting.")
+                try:
+                    await msg.delete()
+                except Exception as e:
+                    print(f"[ERROR] Failed to delete message in VOTING: {e}")
+
+        elif thread_id in config.media_topic_ids:
+            is_photo = msg.photo is not None
+            is_video = msg.video is not None
+            is_valid_doc = (
+                msg.document is not None and
+                getattr(msg.document, "mime_type", "").startswith(("image/", "video/"))
+            )
+
+            is_gif = msg.animation is not None
+            is_sticker = msg.sticker is not None
+            is_voice = msg.voice is not None
+            is_audio = msg.audio is not None
+            is_text = msg.text is not None
+            is_contact = msg.contact is not None
+            is_location = msg.location is not None
+            is_venue = msg.venue is not None
+            is_poll = msg.poll is not None
+            is_video_note = msg.video_note is not None
+            
+            # is_web_app = getattr(msg, "web_app_data", None) is not None
+            # is_via_bot = msg.via_bot is not None
+
+            file_unique_id = media_file_id(msg)
+            if file_unique_id and await asyncio.to_thread(seen_before, chat.id, file_unique_id, msg.message_id):
+                print(f"[DEBUG] ❌ Repeat upload of {file_unique_id} in MEDIA thread {thread_id}. Deleting.")
+                try:
+                    await msg.delete()
+                except Exception as e:
+                    print(f"[ERROR] Failed to delete repeat upload: {e}")
+            elif is_gif or is_sticker or is_voice or is_audio or is_contact or is_location or is_venue or is_poll or is_video_note:
+                print(f"[DEBUG] ❌ msg in MEDIA thread {thread_id}. Deleting.")
+                await msg.delete()
+            # elif is_web_app or is_via_bot:
+            #     print(f"[DEBUG] ❌ Web App or Telebubble message in MEDIA thread {thread_id}. Deleting.")
+            #     await msg.delete()
+            elif is_text:
+                print(f"[DEBUG] ❌ Text message in MEDIA thread {thread_id}. Deleting.")
+                await msg.delete()
+            elif is_valid_doc:
+                print(f"[ALLOWED] ✅ Valid document in MEDIA thread {thread_id}")
+                enqueue_media(chat.id, thread_id, msg)
+            elif msg.document:
+                print(f"[DEBUG] ❌ Invalid document type: {msg.document.mime_type} in MEDIA thread {thread_id}. Deleting.")
+                await msg.delete()
+            elif not (is_photo or is_video or is_valid_doc):
+                print(f"[DEBUG] ❌ Non-media message in MEDIA thread {thread_id}. Deleting.")
+                print(f"[INFO] Message type details: {msg}")
+                await msg.delete()
+            else:
+                print(f"[DEBUG] Valid media message{msg} in MEDIA thread {thread_id}.")
+                print(f"[ALLOWED] ✅ Valid media message in MEDIA thread {thread_id}")
+                enqueue_media(chat.id, thread_id, msg)
+
+        # BLOCKED Topic — block all messages
+        elif thread_id == config.blocked_topic_id:
+            print(f"[DEBUG] User {user.id} tried to send message in BLOCKED thread {thread_id}. Deleting.")
+            print(f"[INFO] Deleted message type: {msg}")
+            try:
+                await msg.delete()
+            except Exception as e:
+                print(f"[ERROR] Failed to delete in BLOCKED topic: {e}")
+
+    # === Fallback log for all messages
+    else:
+        print(f"[INFO] Message from admin in thread {thread_id}: allowed.")
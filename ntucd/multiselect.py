@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from .config import MULTISELECT_PAGE_SIZE
+
+# === MULTI-SELECT KEYBOARD ===
+# A list of options (e.g. proposed date/time slots) as a paged inline keyboard. The selection is a
+# bitset in one int, callback data is "<prefix>|<token>" with a token of a few characters, and the
+# keyboard is only re-sent when what the user sees has changed.
+#   "<i>"  toggle option i      "p<n>"  show page n
+#   "ok"   confirm              "."     the page counter (does nothing)
+
+CONFIRM, CHANGED, UNCHANGED = "confirm", "changed", "unchanged"
+
+@dataclass
+class MultiSelect:
+    options: list
+    prefix: str  # callback data prefix, e.g. "FINALDATE|<thread id>"
+    selected: int = 0  # bit i set: options[i] is selected
+    page: int = 0
+    shown: Optional[tuple] = None  # view of the keyboard last rendered
+
+    def page_count(self):
+        return max(-(-len(self.options) // MULTISELECT_PAGE_SIZE), 1)
+
+    def indices(self):
+        return [i for i in range(len(self.options)) if self.selected >> i & 1]
+
+    def values(self):
+        """Selected options in their original order (not click order)."""
+        return [self.options[i] for i in self.indices()]
+
+    def _view(self):
+        start = self.page * MULTISELECT_PAGE_SIZE
+        page_bits = self.selected >> start & ((1 << MULTISELECT_PAGE_SIZE) - 1)
+        return self.page, page_bits, self.selected.bit_count()
+
+    def apply(self, token):
+        """Applies a callback token; CONFIRM, or whether the keyboard needs re-sending."""
+        if token in ("ok", "CONFIRM"):
+            return CONFIRM
+        if token.startswith("p") and token[1:].isdigit():
+            self.page = min(int(token[1:]), self.page_count() - 1)
+        elif token.isdigit() and int(token) < len(self.options):
+            self.selected ^= 1 << int(token)
+        return CHANGED if self._view() != self.shown else UNCHANGED
+
+    def markup(self):
+        self.shown = self._view()
+        start = self.page * MULTISELECT_PAGE_SIZE
+        rows = [
+            [InlineKeyboardButton(f"✅ {option}" if self.selected >> i & 1 else option, callback_data=f"{self.prefix}|{i}")]
+            for i, option in enumerate(self.options[start:start + MULTISELECT_PAGE_SIZE], start)
+        ]
+        pages = self.page_count()
+        if pages > 1:
+            nav = []
+            if self.page > 0:
+                nav.append(InlineKeyboardButton("◀️", callback_data=f"{self.prefix}|p{self.page - 1}"))
+            nav.append(InlineKeyboardButton(f"{self.page + 1}/{pages}", callback_data=f"{self.prefix}|."))
+            if self.page < pages - 1:
+                nav.append(InlineKeyboardButton("▶️", callback_data=f"{self.prefix}|p{self.page + 1}"))
+            rows.append(nav)
+        count = self.selected.bit_count()
+        rows.append([InlineKeyboardButton(
+            f"✅ Confirm Selection ({count})" if count else "✅ Confirm Selection", callback_data=f"{self.prefix}|ok"
+        )])
+        return InlineKeyboardMarkup(rows)
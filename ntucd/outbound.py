@@ -0,0 +1,47 @@
+import asyncio
+from time import monotonic
+
+from telegram.error import RetryAfter
+
+from .config import TELEGRAM_GROUP_RATE, TELEGRAM_GLOBAL_RATE
+from .quota import TokenBucket
+
+# === OUTBOUND RATE LIMIT ===
+# Bulk sends (e.g. /remind all) go through here so a burst stays inside Telegram's per-group and
+# global message limits instead of collecting RetryAfter errors.
+
+class OutboundLimiter:
+    def __init__(self, per_chat_minute=TELEGRAM_GROUP_RATE, per_second=TELEGRAM_GLOBAL_RATE):
+        self.per_chat_minute = per_chat_minute
+        self._global = TokenBucket(per_second * 60)
+        self._chats = {}  # chat_id -> TokenBucket
+        self._locks = {}  # chat_id -> asyncio.Lock: a chat's sends queue up in order
+
+    async def acquire(self, chat_id):
+        # Only this chat's lock is held while sleeping, so a group at its limit doesn't hold up the
+        # others. The global bucket is checked and taken with no await in between, which on the
+        # event loop is the short critical section it needs.
+        async with self._locks.setdefault(chat_id, asyncio.Lock()):
+            bucket = self._chats.setdefault(chat_id, TokenBucket(self.per_chat_minute))
+            while True:
+                now = monotonic()
+                bucket.refill(now)
+                self._global.refill(now)
+                if bucket.tokens >= 1 and self._global.tokens >= 1:
+                    bucket.tokens -= 1
+                    self._global.tokens -= 1
+                    return
+                await asyncio.sleep(max(bucket.wait_time(), self._global.wait_time()))
+
+outbound_limiter = OutboundLimiter()
+
+async def send_limited(chat_id, send):
+    """Awaits send() once the limiter allows a message to chat_id; waits out one RetryAfter."""
+    await outbound_limiter.acquire(chat_id)
+    try:
+        return await send()
+    except RetryAfter as e:
+        delay = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else e.retry_after
+        print(f"[WARN] Telegram asked to slow down for {delay}s.")
+        await asyncio.sleep(delay)
+        return await send()
@@ -0,0 +1,195 @@
+import asyncio
+import heapq
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, time as dt_time
+from time import time
+
+from .chats import CHATS
+from .commands import performance_reminder_text
+from .config import PERFORMANCE_REMINDER_OFFSETS, REMIND_ALL_TIME, REMINDER_GRACE, sg_tz
+from .dates import parse_formatted_date
+from .leases import leader_only
+from .outbound import send_limited
+from .reminders import claim_send, release_send
+from .sheets import chat_sheets
+
+# === PERFORMANCE CALENDAR ===
+# Every confirmed date of an ACCEPTED performance gets one entry per PERFORMANCE_REMINDER_OFFSETS
+# in a per-chat min-heap keyed by when the reminder is due, so the next one is always heap[0].
+# A date change re-pushes that topic's entries under a new version and the old ones are dropped
+# when they reach the top; human edits (or another worker's) show up as a new store revision and
+# rebuild the heap from the local mirror. Each (topic, date, offset) is sent once (claim_send).
+
+def _parse_offset(text):
+    unit = {"d": "days", "h": "hours", "m": "minutes"}[text[-1]]
+    return timedelta(**{unit: int(text[:-1])})
+
+OFFSETS = [(label, _parse_offset(label)) for label in PERFORMANCE_REMINDER_OFFSETS]
+
+@dataclass(order=True)
+class CalendarEntry:
+    due_at: float
+    thread_id: int = field(compare=False)
+    event_at: datetime = field(compare=False)
+    offset: str = field(compare=False)
+    version: int = field(compare=False)
+
+def due_times(date_line):
+    """(offset, due datetime) for one confirmed date line; [] if it can't be read."""
+    event_at = parse_formatted_date(date_line)
+    if event_at is None:
+        return []
+    has_time = bool(date_line.partition("|")[2].strip())
+    hour, minute = (int(part) for part in REMIND_ALL_TIME.split(":"))
+    due = []
+    for label, offset in OFFSETS:
+        if has_time:
+            due.append((label, event_at - offset))
+        elif offset >= timedelta(days=1):
+            # Date only: day-based reminders go out at the usual morning time
+            day = (event_at - offset).date()
+            due.append((label, sg_tz.localize(datetime.combine(day, dt_time(hour, minute)))))
+        # hour-based reminders need a start time
+    return due
+
+class PerformanceCalendar:
+    def __init__(self):
+        self.heap = []
+        self.rows = {}  # thread_id -> PERFORMANCE List row (dict) the entries were made from
+        self.versions = {}  # thread_id -> current version; older entries are stale
+        self.revision = None  # store revision of the PERFORMANCE tab the heap reflects
+        self.lock = threading.Lock()
+
+    def _entries(self, thread_id, row, version, now):
+        if str(row.get("STATUS", "")).strip().upper() != "ACCEPTED":
+            return []
+        entries = []
+        for line in str(row.get("CONFIRMED DATE | TIME", "")).splitlines():
+            event_at = parse_formatted_date(line)
+            for label, due_at in due_times(line):
+                if event_at > now and now.timestamp() - due_at.timestamp() <= REMINDER_GRACE:
+                    entries.append(CalendarEntry(due_at.timestamp(), thread_id, event_at, label, version))
+        return entries
+
+    def rebuild(self, records, revision, now=None):
+        """O(n): heapifies the entries of every ACCEPTED row."""
+        now = now or datetime.now(sg_tz)
+        with self.lock:
+            self.rows.clear()
+            self.versions.clear()
+            heap = []
+            for row in records:
+                thread_id = str(row.get("THREAD ID", "")).strip()
+                if not thread_id.isdigit():
+                    continue
+                thread_id = int(thread_id)
+                self.rows[thread_id] = row
+                self.versions[thread_id] = 0
+                heap += self._entries(thread_id, row, 0, now)
+            heapq.heapify(heap)
+            self.heap = heap
+            self.revision = revision
+
+    def update(self, thread_id, row, now=None):
+        """O(k log n) for a topic's k entries; its previous entries become stale."""
+        now = now or datetime.now(sg_tz)
+        with self.lock:
+            version = self.versions.get(thread_id, 0) + 1
+            self.versions[thread_id] = version
+            self.rows[thread_id] = row
+            for entry in self._entries(thread_id, row, version, now):
+                heapq.heappush(self.heap, entry)
+
+    def retry(self, entry):
+        with self.lock:
+            heapq.heappush(self.heap, entry)
+
+    def _drop_stale(self):
+        while self.heap and self.heap[0].version != self.versions.get(self.heap[0].thread_id):
+            heapq.heappop(self.heap)
+
+    def next_due(self):
+        with self.lock:
+            self._drop_stale()
+            return self.heap[0] if self.heap else None
+
+    def pop_due(self, now_ts):
+        """Removes and returns (entry, row) for every entry due by now_ts."""
+        due = []
+        with self.lock:
+            self._drop_stale()
+            while self.heap and self.heap[0].due_at <= now_ts:
+                entry = heapq.heappop(self.heap)
+                due.append((entry, self.rows[entry.thread_id]))
+                self._drop_stale()
+        return due
+
+_calendars = {}  # chat_id -> PerformanceCalendar
+
+def calendar(chat_id):
+    return _calendars.setdefault(chat_id, PerformanceCalendar())
+
+def refresh_calendar(chat_id):
+    """Rebuilds the chat's heap from the local mirror if the PERFORMANCE tab changed since."""
+    sheets = chat_sheets(chat_id)
+    cal = calendar(chat_id)
+    revision = sheets.store.revision(sheets.config.performance_tab)
+    if cal.revision != revision:
+        cal.rebuild(sheets.worksheet().get_all_records(), revision)
+    return cal
+
+def update_performance_date(chat_id, thread_id, row):
+    """
+    Called after a topic's CONFIRMED DATE | TIME is written (ACCEPT or /modify). The heap has the
+    new dates straight away; the revision is left alone, so the next refresh still rebuilds and
+    picks up whatever else changed meanwhile (pulled edits, a REJECT, other topics' writes).
+    """
+    try:
+        calendar(chat_id).update(int(thread_id), row)
+    except Exception as e:
+        print(f"[ERROR] Failed to update performance calendar for thread {thread_id}: {e}")
+
+def _offset_heading(entry):
+    offset = dict(OFFSETS)[entry.offset]
+    if offset >= timedelta(days=2):
+        left = f"in {offset.days} days"
+    elif offset >= timedelta(days=1):
+        left = "tomorrow"
+    else:
+        left = f"in {max(round((entry.event_at.timestamp() - time()) / 3600), 1)} hour(s)"  # may be sent late
+    return f"⏰ *{entry.event_at.strftime('%d %b %Y').upper()} is {left}*"
+
+async def _send_entry(bot, chat_id, cal, entry, row):
+    key = f"tminus:{chat_id}:{entry.thread_id}:{entry.event_at.isoformat()}:{entry.offset}"
+    if not await asyncio.to_thread(claim_send, key, entry.event_at.timestamp()):
+        return
+    try:
+        await send_limited(chat_id, lambda: bot.send_message(
+            chat_id=chat_id,
+            text=f"{_offset_heading(entry)}\n\n{performance_reminder_text(row)}",
+            parse_mode="Markdown",
+            message_thread_id=entry.thread_id,
+        ))
+        print(f"[INFO] Sent T-{entry.offset} reminder to thread {entry.thread_id}.")
+    except Exception as e:
+        await asyncio.to_thread(release_send, key)
+        print(f"[ERROR] Failed to send T-{entry.offset} reminder to thread {entry.thread_id}: {e}")
+        if time() - entry.due_at < REMINDER_GRACE:
+            cal.retry(entry)  # next run tries again
+
+@leader_only
+async def fire_performance_reminders(context):
+    """Job: sends the T-minus reminders at the top of each chat's heap that came due."""
+    now = time()
+    for chat_id in CHATS:
+        try:
+            cal = await asyncio.to_thread(refresh_calendar, chat_id)
+        except Exception as e:
+            print(f"[ERROR] Failed to load performance calendar for chat {chat_id}: {e}")
+            continue
+        nxt = cal.next_due()
+        if nxt is None or nxt.due_at > now:
+            continue
+        due = cal.pop_due(now)
+        await asyncio.gather(*(_send_entry(context.bot, chat_id, cal, entry, row) for entry, row in due))
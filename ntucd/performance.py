@@ -0,0 +1,512 @@
+import asyncio
+from datetime import datetime
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes, ConversationHandler
+
+from .admin import is_admin
+from .config import DATE
+from .conversation import conversation_data, end_conversation_data
+from .callbacks import callback_busy, run_deferred
+from .dates import parse_and_format_dates
+from .idempotency import write_once, update_key
+from .multiselect import MultiSelect, CONFIRM, CHANGED
+from .perf_calendar import update_performance_date
+from .polls import send_interest_poll
+from .sheets import chat_sheets, get_gspread_sheet
+from .ui_state import ui_state
+
+# === Handle PERF/EVENT/OTHERS selection ===
+async def topic_type_selection(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+
+    _, selection, thread_id = query.data.split("|")
+    thread_id = int(thread_id)
+
+    # Delete the initial prompt if it exists
+    ui = ui_state.get(query.message.chat.id, thread_id)
+    prompt_id, ui.init_prompt = ui.init_prompt, None
+    if prompt_id:
+        try:
+            await context.bot.delete_message(chat_id=query.message.chat.id, message_id=prompt_id)
+        except Exception as e:
+            print(f"[DELETE ERROR] {e}")
+
+    conv = conversation_data(update, context)
+    conv["thread_id"] = thread_id
+    conv["topic_type"] = selection
+
+    if selection == "PERF":
+        prompt = await query.message.chat.send_message(
+            "\U0001F4DD Please enter: *Event // Date // Location // Info (If any)*",
+            parse_mode="Markdown", message_thread_id=thread_id
+        )
+        conv["perf_prompt"] = prompt.message_id
+        return DATE
+
+    elif selection == "DATE_ONLY":
+        prompt = await query.message.chat.send_message(
+            "\U0001F4C5 Please enter the *Performance Date* (e.g. 12 MAR 2025):",
+            parse_mode="Markdown", message_thread_id=thread_id
+        )
+        conv["date_prompt"] = prompt.message_id
+        return DATE
+    
+    elif selection == "OTHERS":
+        chat_sheets(update.effective_chat.id).append_to_others_list(thread_id)
+    
+    await query.message.edit_text(f"Topic marked as {selection}. No further action.")
+    end_conversation_data(update, context)
+    return ConversationHandler.END
+
+# Handle button selection
+async def confirmation_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    parts = query.data.split("|")
+    if len(parts) != 3:
+        return await query.answer()
+    _, thread_id, action = parts
+    toast = {"ACCEPT": "⏳ Loading the proposed dates…", "REJECT": "⏳ Rejecting…"}.get(action, "⏳ Working…")
+    await run_deferred(
+        update, context, lambda: _handle_confirmation(update, context, int(thread_id), action),
+        toast=toast, description=f"{action.lower()} of this performance",
+    )
+
+async def _delete_confirmation_prompt(context, query, ui) -> bool:
+    """Deletes the ACCEPT/REJECT prompt (this message, even if ui_state lost track of it); True if it is gone."""
+    msg_ids = {query.message.message_id, ui.confirm_prompt} - {None}
+    ui.confirm_prompt = None
+    deleted = True
+    for msg_id in msg_ids:
+        try:
+            await context.bot.delete_message(chat_id=query.message.chat.id, message_id=msg_id)
+        except Exception as e:
+            print(f"[WARNING] Failed to delete ACCEPT/REJECT message {msg_id}: {e}")
+            if msg_id == query.message.message_id:
+                deleted = False
+    return deleted
+
+async def _handle_confirmation(update, context, thread_id, action) -> bool:
+    """Returns True once the prompt is deleted; otherwise run_deferred puts its buttons back."""
+    query = update.callback_query
+    ui = ui_state.get(query.message.chat.id, thread_id)
+
+    if action == "CANCEL":
+        # Unpin summary (if exists), and send back Performance Opportunity
+        # old_msg_id = context.chat_data.get(f"summary_msg_{thread_id}")
+        # if old_msg_id:
+        #     try:
+        #         await context.bot.unpin_chat_message(chat_id=query.message.chat.id, message_id=old_msg_id)
+        #     except:
+        #         pass
+        return await _delete_confirmation_prompt(context, query, ui)
+
+    sheet = get_gspread_sheet(update.effective_chat.id)
+    records = sheet.get_all_records()
+    row_number, row_data = None, None
+    for idx, row in enumerate(records):
+        if str(row["THREAD ID"]) == str(thread_id):
+            row_number = idx + 2
+            row_data = row
+            break
+    if not row_data:
+        print(f"[WARNING] Thread {thread_id} is not in the performance sheet; keeping its ACCEPT/REJECT prompt.")
+        return False
+
+    # 🧹 Delete the ACCEPT/REJECT prompt
+    deleted = await _delete_confirmation_prompt(context, query, ui)
+
+    if action == "REJECT":
+        # === Update status in GSheet ===
+        try:
+            chat_sheets(update.effective_chat.id).performance_row(thread_id, row_number).update_cell(7, "REJECTED")
+        except KeyError as e:
+            print(f"[WARNING] Could not mark performance as rejected: {e}")
+
+        # === Send rejection message
+        await query.message.chat.send_message("❌ Performance rejected. This topic will now be closed.", message_thread_id=thread_id)
+
+        # ✅ Delay + delete topic
+        await delete_topic_with_delay(context, chat_id=query.message.chat.id, thread_id=thread_id)
+    
+    if action == "ACCEPT":
+        all_dates = row_data["PROPOSED DATE | TIME"].splitlines()
+        ui.final_owner = query.from_user.id
+        ui.final_row_number = row_number
+        ui.final_select = MultiSelect(all_dates, prefix=f"FINALDATE|{thread_id}")
+
+        prompt = await query.message.chat.send_message(
+            "🗓️ Select final date(s) to confirm:",
+            reply_markup=ui.final_select.markup(),
+            message_thread_id=thread_id
+        )
+        ui.final_prompt = prompt.message_id
+    return deleted
+
+# Handle final date selection
+async def final_date_selection(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    data = query.data.split("|")
+    if len(data) != 3:
+        return await query.answer()
+
+    _, thread_id, selection = data
+    thread_id = int(thread_id)
+
+    print(f"[DEBUG] Callback received for thread_id={thread_id}, selection={selection}")
+    if await callback_busy(query):
+        return  # the confirmation is being applied; leave its keyboard alone
+
+    ui = ui_state.get(query.message.chat.id, thread_id)
+    # The selection belongs to the admin who pressed ACCEPT
+    if ui.final_owner and ui.final_owner != query.from_user.id:
+        return await query.answer("⛔ Another admin is confirming this performance.", show_alert=True)
+    select = ui.final_select
+    if select is None:
+        return await query.answer("⌛ This selection has expired.", show_alert=True)
+    row_number = ui.final_row_number
+    action = select.apply(selection)
+
+    print(f"[DEBUG] row_number={row_number}")
+    print(f"[DEBUG] currently selected={select.indices()}")
+
+    if action == CONFIRM and select.selected:
+        return await run_deferred(
+            update, context, lambda: _confirm_final_dates(update, context, ui, select, row_number, thread_id),
+            toast="⏳ Confirming…", description="date confirmation",
+        )
+    await query.answer()
+    if action == CONFIRM:
+        return await query.message.reply_text("⚠️ Please select at least one date before confirming.")
+
+    # === Toggle / page: only re-send the keyboard if it looks different
+    if action == CHANGED:
+        await query.message.edit_reply_markup(reply_markup=select.markup())
+
+async def _confirm_final_dates(update, context, ui, select, row_number, thread_id) -> bool:
+    """Returns True if the selection message was deleted (run_deferred restores it otherwise)."""
+    query = update.callback_query
+    # === Cleanup UI messages ===
+    deleted = False
+    try:
+        await context.bot.delete_message(chat_id=query.message.chat_id, message_id=query.message.message_id)
+        deleted = True
+        print("[DEBUG] Deleted final selection message.")
+    except Exception as e:
+        print(f"[WARNING] Failed to delete final date selection message: {e}")
+
+    try:
+        msg_id, ui.confirm_prompt = ui.confirm_prompt, None
+        if msg_id:
+            await context.bot.delete_message(chat_id=query.message.chat_id, message_id=msg_id)
+            print(f"[DEBUG] Deleted ACCEPT/REJECT message: {msg_id}")
+    except Exception as e:
+        print(f"[WARNING] Failed to delete ACCEPT/REJECT message: {e}")
+
+    # === Update sheet ===
+    value = "\n".join(select.values())
+    # Picking dates can take minutes: the row is found by THREAD ID in case rows moved since ACCEPT
+    row = chat_sheets(update.effective_chat.id).performance_row(thread_id, row_number)
+    # Columns F:G (CONFIRMED DATE | TIME, STATUS) in one write; a second tap on this keyboard is a no-op
+    if not write_once(update_key(update, "accept", thread_id), row.update, [[value, "ACCEPTED"]], "F", "G"):
+        return deleted
+
+    # === Refresh row ===
+    updated_row = row.values()
+    while len(updated_row) < 7:
+        updated_row += [""] * (7 - len(updated_row))
+
+    event, proposed, location, info, confirmed, status = updated_row[1:7]
+    update_performance_date(update.effective_chat.id, thread_id, {
+        "THREAD ID": thread_id, "EVENT": event, "LOCATION": location,
+        "CONFIRMED DATE | TIME": confirmed, "STATUS": status,
+    })
+
+    # === Format confirmed date
+    date_lines = []
+    for line in confirmed.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            dt = datetime.strptime(line, "%d %b %Y | %I:%M%p")
+            formatted = f"• {dt.strftime('%d %b %Y').upper()} | {dt.strftime('%I:%M%p').lower()}"
+        except:
+            formatted = f"• {line}"
+        date_lines.append(formatted)
+
+    # === Format summary
+    template = (
+        f"📢 *Performance Summary*\n\n"
+        f"📍 *Event*\n"
+        f"• {event}\n\n"
+        f"📅 *Confirmed Date | Time*\n"
+        f"{chr(10).join(date_lines)}\n\n"
+        f"📌 *Location*\n"
+        f"• {location}\n\n"
+        f"📝 *Performance Information:*\n"
+        f"{info.strip()}"
+    )
+
+    # === Unpin previous summary (if any), then pin new summary
+    try:
+        old_summary_id, ui.summary_msg = ui.summary_msg, None
+        if old_summary_id:
+            await context.bot.unpin_chat_message(chat_id=query.message.chat.id, message_id=old_summary_id)
+            print(f"[DEBUG] Unpinned old summary: {old_summary_id}")
+    except Exception as e:
+        print(f"[WARNING] Failed to unpin previous summary: {e}")
+
+    # ✅ Send new summary
+    msg = await query.message.chat.send_message(template, parse_mode="Markdown", message_thread_id=thread_id)
+    await context.bot.pin_chat_message(chat_id=query.message.chat.id, message_id=msg.message_id, disable_notification=True)
+    ui.summary_msg = msg.message_id
+    # Selection is done; drop it so it doesn't linger until the sweep
+    ui.clear_pending()
+    return deleted
+
+def upsert_performance_row(chat_id, thread_id, values):
+    """Writes B:G of the topic's PERFORMANCE List row, appending the row only if the topic has none yet."""
+    sheets = chat_sheets(chat_id)
+    try:
+        sheets.performance_row(thread_id).update([values], "B", "G")
+    except KeyError:
+        sheets.worksheet().append_row([thread_id] + values)
+        sheets.performance_thread_ids.add(str(thread_id))
+
+# === Conversation steps ===
+async def parse_perf_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.message.delete()
+    sheet = get_gspread_sheet(update.effective_chat.id)
+    # Everything below is keyed by (chat, thread, user), so parallel topic set-ups don't collide
+    conv = conversation_data(update, context)
+
+    try:
+        if "perf_prompt" in conv:
+            await context.bot.delete_message(
+                chat_id=update.effective_chat.id,
+                message_id=conv.pop("perf_prompt")
+            )
+    except Exception as e:
+        print(f"[WARNING] Failed to delete perf input prompt: {e}")
+    
+    # Delete any previously shown error message from the bot
+    try:
+        if "last_error" in conv:
+            await context.bot.delete_message(
+                chat_id=update.effective_chat.id,
+                message_id=conv.pop("last_error")
+            )
+    except Exception as e:
+        print(f"[WARNING] Failed to delete previous error message: {e}")
+
+    # === Case 1: Retrying Date Only ===
+    if "perf_temp" in conv:
+        raw_date = update.message.text.strip()
+        try:
+            formatted_dates = parse_and_format_dates(raw_date)
+            date = "\n".join(formatted_dates)
+        except ValueError as e:
+            # Clean up older messages if exist
+            for key in ["last_error", "invalid_input"]:
+                msg_id = conv.pop(key, None)
+                if msg_id:
+                    try:
+                        await context.bot.delete_message(chat_id=update.effective_chat.id, message_id=msg_id)
+                    except Exception as ex:
+                        print(f"[WARNING] Failed to delete previous {key} message: {ex}")
+
+            error_msg = await update.effective_chat.send_message(
+                str(e),
+                parse_mode="Markdown",
+                message_thread_id=conv["perf_temp"]["thread_id"]
+            )
+            conv["last_error"] = error_msg.message_id
+            conv["invalid_input"] = update.message.message_id
+            return DATE
+
+        # Restore previous info
+        temp = conv.pop("perf_temp")
+        event = temp["event"]
+        location = temp["location"]
+        info = temp["info"]
+        thread_id = temp["thread_id"]
+
+        # Update sheet
+        write_once(update_key(update, "perf_row", thread_id),
+                   upsert_performance_row, update.effective_chat.id, thread_id, [event, date, location, info, "", ""])
+
+    # === Case 2: Full Input ===
+    else:
+        raw_text = update.message.text.strip()
+        parts = [p.strip() for p in raw_text.split("//")]
+        print(f"[DEBUG] Parsed parts: {len(parts)} - {parts}")
+
+        thread_id = conv.get("thread_id")  # ✅ Define this early
+
+        if len(parts) < 3 or any(not p for p in parts[:3]):
+            error_msg = await update.effective_chat.send_message(
+            "❌ Invalid input format. Use:\n*Event // Date // Location // Info (optional)*\n\n"
+            "Example:\n`NTU Welcome Tea // 23 JUN 2025 8:00pm // NYA // Formal wear required`",
+            parse_mode="Markdown",
+            message_thread_id=thread_id
+        )
+
+            # Clean up older messages if exist
+            for key in ["last_error", "invalid_input"]:
+                msg_id = conv.pop(key, None)
+                if msg_id:
+                    try:
+                        await context.bot.delete_message(chat_id=update.effective_chat.id, message_id=msg_id)
+                    except Exception as e:
+                        print(f"[WARNING] Failed to delete previous {key} message: {e}")
+
+            conv["last_error"] = error_msg.message_id
+            conv["invalid_input"] = update.message.message_id
+            return DATE
+
+        event, date, location = parts[0], parts[1], parts[2]
+        info = parts[3] if len(parts) >= 4 else ""
+        thread_id = conv.get("thread_id")
+
+        # Try to format date
+        try:
+            raw_date = date
+            formatted_dates = parse_and_format_dates(raw_date)
+            date = "\n".join(formatted_dates)
+        except ValueError as e:
+            date = raw_date
+            # Save temp and still append to sheet
+            conv["perf_temp"] = {
+                "event": event,
+                "location": location,
+                "info": info,
+                "thread_id": thread_id
+            }
+            try:
+                write_once(update_key(update, "perf_row", thread_id),
+                           upsert_performance_row, update.effective_chat.id, thread_id, [event, date, location, info, "", ""])
+                print("[DEBUG] Row appended with invalid date")
+            except Exception as e2:
+                print(f"[ERROR] Failed to append row with invalid date: {e2}")
+ 
+            # Clean up previous errors
+            for key in ["last_error", "invalid_input"]:
+                msg_id = conv.pop(key, None)
+                if msg_id:
+                    try:
+                        await context.bot.delete_message(chat_id=update.effective_chat.id, message_id=msg_id)
+                    except Exception as ex:
+                        print(f"[WARNING] Failed to delete previous {key} message: {ex}")
+
+            # Show proper error message from parse_and_format_dates()
+            error_msg = await update.effective_chat.send_message(
+                str(e),
+                parse_mode="Markdown",
+                message_thread_id=thread_id
+            )
+            conv["last_error"] = error_msg.message_id
+            conv["invalid_input"] = update.message.message_id
+            return DATE
+
+        # Valid date → Append to sheet
+        try:
+            write_once(update_key(update, "perf_row", thread_id),
+                       upsert_performance_row, update.effective_chat.id, thread_id, [event, date, location, info, "", ""])
+            print("[DEBUG] Row appended successfully")
+        except Exception as e:
+            print(f"[ERROR] Failed to append row: {e}")
+
+    # Format multiline Date | Time block
+    date_lines = []
+    for entry in date.splitlines(): 
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            dt = datetime.strptime(entry, "%d %b %Y %H%M")
+            formatted = f"• {dt.strftime('%d %b %Y').upper()} | {dt.strftime('%I:%M%p').lower()}"
+            date_lines.append(formatted)
+        except:
+            date_lines.append(f"• {entry}")  # fallback if not parseable
+    formatted_dates = "\n".join(date_lines)
+
+    # Then build the final message
+    template = (
+        f"\U0001F4E2 *Performance Opportunity*\n\n"
+        f"\U0001F4CD *Event*\n"
+        f"• {event}\n\n"
+        f"\U0001F4C5 *Date | Time*\n"
+        f"{formatted_dates}\n\n"
+        f"\U0001F4CC *Location*\n"
+        f"• {location}\n\n"
+        f"*Performance Information:*\n"
+        f"{info.strip()}"
+    )
+    msg = await update.effective_chat.send_message(template, parse_mode="Markdown", message_thread_id=thread_id)
+    await context.bot.pin_chat_message(chat_id=update.effective_chat.id, message_id=msg.message_id, disable_notification=True)
+    ui = ui_state.get(update.effective_chat.id, thread_id)
+    ui.summary_msg = msg.message_id
+    # Send interest poll (single/multi-choice)
+    poll = await send_interest_poll(context.bot, update.effective_chat.id, thread_id, sheet)
+    ui.interest_poll_msg = poll["message_id"] if poll else None
+    print(f"[DEBUG] Saved new poll message ID: {ui.interest_poll_msg}")
+
+    end_conversation_data(update, context)
+    return ConversationHandler.END
+
+async def delete_topic_with_delay(context: ContextTypes.DEFAULT_TYPE, chat_id: int, thread_id: int, delay_seconds: int = 5):
+    await asyncio.sleep(delay_seconds)
+    try:
+        await context.bot.delete_forum_topic(chat_id=chat_id, message_thread_id=thread_id)
+        print(f"[INFO] Topic {thread_id} deleted after delay.")
+    except Exception as e:
+        print(f"[ERROR] Failed to delete topic {thread_id}: {e}")
+
+async def confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    msg = update.effective_message
+    chat = update.effective_chat
+
+    if not msg.is_topic_message:
+        return await msg.reply_text("⛔ This command must be used inside a topic thread.")
+
+    thread_id = msg.message_thread_id
+    if not await is_admin(update, context):
+        return await msg.reply_text("⛔ Only admins can use this command.")
+
+    # Delete the /confirmation command message
+    try:
+        await msg.delete()
+    except:
+        pass
+
+    sheet = get_gspread_sheet(update.effective_chat.id)
+    records = sheet.get_all_records()
+    row_data = None
+    for row in records:
+        if str(row["THREAD ID"]) == str(thread_id):
+            row_data = row
+            break
+
+    if not row_data:
+        return await msg.reply_text("❌ This thread is not registered.")
+
+    if row_data["STATUS"]:
+        return await msg.reply_text(
+            f"❌ This performance is already marked as `{row_data['STATUS']}`.",
+            parse_mode="Markdown"
+        )
+
+    keyboard = [
+        [InlineKeyboardButton("✅ ACCEPT", callback_data=f"CONFIRM|{thread_id}|ACCEPT")],
+        [InlineKeyboardButton("❌ REJECT", callback_data=f"CONFIRM|{thread_id}|REJECT")],
+        [InlineKeyboardButton("🚫 CANCEL", callback_data=f"CONFIRM|{thread_id}|CANCEL")]
+    ]
+    prompt = await chat.send_message(
+        "🎯 Is this performance *ACCEPTED* or *REJECTED*?",
+        parse_mode="Markdown",
+        reply_markup=InlineKeyboardMarkup(keyboard),
+        message_thread_id=thread_id
+    )
+    ui_state.get(chat.id, thread_id).confirm_prompt = prompt.message_id
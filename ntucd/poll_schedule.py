@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime, timedelta, time as dt_time
+from time import time
+
+from .attendance import ensure_date_column
+from .chats import CHATS, chat_config
+from .quota import BACKGROUND, sheets_priority
+from .config import AUTO_POLL_HORIZON, AUTO_POLL_RETRY, sg_tz
+from .dates import get_next_tuesday
+from .leases import leader_only
+from .polls import post_training_poll, forget_poll
+from .reminders import schedule_reminder
+from .sheets import chat_sheets
+
+# === AUTOMATIC TRAINING POLL ===
+# Each upcoming training gets one "training_poll" entry in the reminders table, named after the
+# group and date. The entry fires once (even across restarts and several workers), overdue entries
+# are caught up while the training is still ahead, and post_training_poll skips dates whose poll
+# ID is already in ATTENDANCE List, so a manual /poll never gets a duplicate either.
+
+def poll_name(chat_id, training_date):
+    return f"poll:{chat_id}:{training_date.isoformat()}"
+
+def poll_post_time(config, training_date):
+    """The last poll_weekday (at poll_time) before the training, Asia/Singapore."""
+    days_before = (training_date.weekday() - config.poll_weekday) % 7 or 7
+    hour, minute = (int(part) for part in config.poll_time.split(":"))
+    return sg_tz.localize(datetime.combine(training_date - timedelta(days=days_before), dt_time(hour, minute)))
+
+def plan_training_polls_once(now=None):
+    now = now or datetime.now(sg_tz)
+    first = get_next_tuesday(now.date())
+    for config in CHATS.values():
+        if not config.auto_poll or config.voting_topic_id is None:
+            continue
+        for week in range(AUTO_POLL_HORIZON):
+            training = first + timedelta(weeks=week)
+            if config.skips_training(training):
+                continue
+            try:
+                # Column exists before the poll, so the sheet shows the coming trainings
+                ensure_date_column(config.chat_id, training.strftime('%B %d, %Y'))
+                schedule_reminder(
+                    poll_name(config.chat_id, training), poll_post_time(config, training),
+                    config.chat_id, config.voting_topic_id, kind="training_poll", once=True,
+                )
+            except Exception as e:
+                print(f"[ERROR] Failed to plan training poll for chat {config.chat_id} on {training}: {e}")
+
+@leader_only
+async def plan_training_polls(context):
+    """Job: keeps the next AUTO_POLL_HORIZON training polls scheduled."""
+    await asyncio.to_thread(plan_training_polls_once)
+
+async def post_scheduled_poll(bot, name, chat_id, thread_id):
+    """Called by fire_due_reminders for a due "training_poll" entry."""
+    training = datetime.strptime(name.rsplit(":", 1)[1], "%Y-%m-%d").date()
+    config = chat_config(chat_id)
+    # Settings may have changed since the entry was planned
+    if config is None or not config.auto_poll or config.skips_training(training):
+        print(f"[INFO] Scheduled poll {name} dropped (auto poll off or training skipped).")
+        return
+    if training < datetime.now(sg_tz).date():
+        print(f"[WARN] Scheduled poll {name} missed its training date, dropped.")
+        return
+    try:
+        await post_training_poll(bot, chat_id, thread_id, training)
+    except Exception as e:
+        print(f"[ERROR] Failed to post scheduled poll {name}, retrying in {AUTO_POLL_RETRY}s: {e}")
+        await asyncio.to_thread(schedule_reminder, name, time() + AUTO_POLL_RETRY, chat_id, thread_id, kind="training_poll")
+
+# === POLL CLOSING ===
+# "close_training" / "close_interest" entries (scheduled when the poll is posted) stop the poll at
+# its cutoff, write the final counts from the returned Poll in one append, and drop the vote state.
+
+def write_poll_tally(chat_id, poll_type, thread_id, poll):
+    row = [
+        datetime.now(sg_tz).strftime("%Y-%m-%d %H:%M"), poll_type, str(thread_id or ""), poll.id,
+        poll.question, poll.total_voter_count,
+    ] + [f"{option.text}: {option.voter_count}" for option in poll.options]
+    with sheets_priority(BACKGROUND):
+        chat_sheets(chat_id).poll_results().append_row(row, value_input_option="RAW")
+
+async def close_scheduled_poll(bot, name, kind, chat_id, thread_id):
+    """Called by fire_due_reminders for a due "close_*" entry."""
+    message_id = int(name.rsplit(":", 1)[1])
+    try:
+        poll = await bot.stop_poll(chat_id, message_id)
+    except Exception as e:
+        # Already closed, or the poll message was deleted (e.g. replaced after a date change)
+        print(f"[WARN] Could not close poll message {message_id} in chat {chat_id}: {e}")
+        return
+    try:
+        await asyncio.to_thread(write_poll_tally, chat_id, kind.removeprefix("close_"), thread_id, poll)
+        print(f"[INFO] Closed poll {poll.id} with {poll.total_voter_count} voters.")
+    except Exception as e:
+        print(f"[ERROR] Failed to write final tally of poll {poll.id}: {e}")
+    forget_poll(poll.id, chat_id)
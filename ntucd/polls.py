@@ -0,0 +1,204 @@
+import re
+import asyncio
+from datetime import datetime
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from .admin import admin_only, is_admin
+from .attendance import append_poll, poll_recorded
+from .chats import chat_config
+from .config import SHEET_COLUMNS, sg_tz
+from .dates import get_next_tuesday, get_training_eve_reminder, get_training_start, get_interest_poll_cutoff
+from .idempotency import recent_writes
+from .reminders import schedule_reminder
+from .state import active_polls, yes_voters, interest_votes, interest_poll_threads
+from .update_queue import remember_poll_route
+
+# === POLL SEND ===
+async def post_training_poll(bot, chat_id, thread_id, training_date):
+    """
+    Posts the attendance poll for training_date, records it in ATTENDANCE List and arms the
+    eve-of-training reminder. Returns None if a poll for that date was already recorded.
+    """
+    tues_date = training_date.strftime('%B %d, %Y')
+    # Claimed before the check: a /poll and the scheduled post racing each other (or a repeated
+    # /poll) must not both get past it while the first is still being sent and recorded
+    key = ("training_poll", chat_id, tues_date)
+    if not recent_writes.claim(key) or await asyncio.to_thread(poll_recorded, chat_id, tues_date):
+        print(f"[INFO] Training poll for {tues_date} already posted in chat {chat_id}.")
+        return None
+
+    try:
+        msg = await bot.send_poll(
+            chat_id=chat_id,
+            question=f"Are you joining the training on {tues_date}?",
+            options=["Yes", "No"],
+            is_anonymous=False,
+            message_thread_id=thread_id
+        )
+    except Exception:
+        recent_writes.release(key)
+        raise
+
+    # ✅ Register the poll type
+    active_polls[msg.poll.id] = ("training", chat_id)
+    yes_voters[chat_id] = set()  # reset voters for the new training poll
+    remember_poll_route(msg.poll.id, chat_id, thread_id)
+
+    await asyncio.to_thread(append_poll, {
+        "poll_id": msg.poll.id,
+        "message_id": msg.message_id,
+        "chat_id": chat_id,
+        "thread_id": thread_id,
+        "date": tues_date
+    })
+    # Schedule reminder (sent by fire_due_reminders; one per group and training date)
+    await asyncio.to_thread(
+        schedule_reminder, f"training:{chat_id}:{tues_date}", get_training_eve_reminder(training_date), chat_id, thread_id
+    )
+    # Answers stop when training starts; the final tally goes to POLL Results
+    await asyncio.to_thread(
+        schedule_reminder, close_poll_name(chat_id, msg.message_id), get_training_start(training_date),
+        chat_id, thread_id, kind="close_training"
+    )
+    return msg
+
+@admin_only
+async def send_poll_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    print("[DEBUG] send_poll_handler triggered")
+    chat_id = update.effective_chat.id
+    thread_id = getattr(update.effective_message, "message_thread_id", None)
+
+    config = chat_config(chat_id)
+    if config is None or thread_id != config.voting_topic_id:
+        try:
+            await context.bot.delete_message(chat_id=chat_id, message_id=update.message.message_id)
+        except Exception as e:
+            print(f"[ERROR] Failed to delete message in wrong thread: {e}")
+        return
+
+    if not await is_admin(update, context):
+        try:
+            await context.bot.delete_message(chat_id=chat_id, message_id=update.message.message_id)
+        except Exception as e:
+            print(f"[DELETE ERROR] {e}")
+        return
+
+    try:
+        await context.bot.delete_message(chat_id, update.message.message_id)
+    except:
+        pass
+
+    next_tuesday = get_next_tuesday(datetime.now(sg_tz).date())
+    if await post_training_poll(context.bot, chat_id, thread_id, next_tuesday) is None:
+        await context.bot.send_message(
+            chat_id,
+            f"ℹ️ The poll for {next_tuesday.strftime('%B %d, %Y')} has already been posted.",
+            message_thread_id=thread_id
+        )
+
+def close_poll_name(chat_id, message_id):
+    return f"close_poll:{chat_id}:{message_id}"
+
+def forget_poll(poll_id, chat_id):
+    """Drops a closed poll's vote state; no more answers can arrive for it."""
+    poll_type, _ = active_polls.pop(poll_id, (None, None))
+    interest_votes.pop(poll_id, None)
+    interest_poll_threads.pop(poll_id, None)
+    if poll_type == "training" and not any(kind == "training" and chat == chat_id for kind, chat in active_polls.values()):
+        yes_voters.pop(chat_id, None)
+
+async def handle_poll_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    poll_id = update.poll_answer.poll_id
+    user = update.poll_answer.user
+    selected_options = update.poll_answer.option_ids
+
+    # Poll answers carry no chat, so the poll remembers which group it was posted in
+    poll_type, chat_id = active_polls.get(poll_id, (None, None))
+
+    if poll_type == "training":
+        voters = yes_voters.setdefault(chat_id, set())
+        if 0 in selected_options and user.id not in voters:
+            voters.add(user.id)
+            print(f"[DEBUG] {user.full_name} voted YES for training")
+    elif poll_type == "interest":
+        interest_votes[poll_id][user.id] = selected_options
+        print(f"[DEBUG] {user.full_name} voted for interest poll: {selected_options}")
+    else:
+        print(f"[WARN] Received answer for unknown poll ID {poll_id}")
+
+async def send_interest_poll(bot, chat_id, thread_id, sheet):
+    try:
+        # Get all rows in the sheet
+        all_rows = sheet.get_all_values()
+
+        # Find the row where column 1 matches the thread_id
+        matched_row = None
+        for row in all_rows:
+            if row and str(row[0]).strip() == str(thread_id):
+                matched_row = row
+                break
+
+        if not matched_row:
+            print(f"[WARN] No matching row for thread_id {thread_id}")
+            return None
+
+        # ✅ Check STATUS before sending poll
+        status_col_index = SHEET_COLUMNS.index("STATUS")
+        if len(matched_row) > status_col_index and matched_row[status_col_index].strip():
+            print(f"[SKIPPED] Interest poll not sent. STATUS is {matched_row[status_col_index]}")
+            return None
+
+        # Extract date string from column 3 (index 2)
+        raw_date_str = matched_row[2].strip() if len(matched_row) > 1 else ''
+        if not raw_date_str:
+            print(f"[WARN] No date data for thread_id {thread_id}")
+            return None
+
+        # Split by comma and clean
+        dates = [d.strip() for d in re.split(r'[\n,]', raw_date_str) if d.strip()]
+
+        # Send poll based on number of dates
+        if len(dates) == 1:
+            msg = await bot.send_poll(
+                chat_id=chat_id,
+                message_thread_id=thread_id,
+                question=f"Are you interested in the performance on {dates[0]}?",
+                options=["Yes", "No"],
+                is_anonymous=False
+            )
+        elif len(dates) > 1:
+            msg = await bot.send_poll(
+                chat_id=chat_id,
+                message_thread_id=thread_id,
+                question="Which dates are you interested in?",
+                options=dates,
+                allows_multiple_answers=True,
+                is_anonymous=False
+            )
+        else:
+            print(f"[WARN] No valid dates after parsing for thread_id {thread_id}")
+            return None
+        
+         # ✅ Register poll as 'interest'
+        active_polls[msg.poll.id] = ("interest", chat_id)
+        remember_poll_route(msg.poll.id, chat_id, thread_id)
+        interest_votes[msg.poll.id] = {}
+        interest_poll_threads[msg.poll.id] = (chat_id, thread_id)
+
+        cutoff = get_interest_poll_cutoff(dates)
+        if cutoff:
+            await asyncio.to_thread(
+                schedule_reminder, close_poll_name(chat_id, msg.message_id), cutoff, chat_id, thread_id, kind="close_interest"
+            )
+
+        print(f"[DEBUG] Sent interest poll for thread {thread_id}")
+        return {
+            "message_id": msg.message_id,
+            "poll_id": msg.poll.id
+        }
+
+    except Exception as e:
+        print(f"[ERROR] Failed to send interest poll: {e}")
+        return None
@@ -0,0 +1,216 @@
+import asyncio
+import secrets
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes
+from telegram.helpers import escape_markdown
+
+from .admin import admin_only, is_admin
+from .chats import chat_config
+from .config import QUERY_PAGE_SIZE, QUERY_CACHE_SIZE, sg_tz
+from .dates import parse_formatted_date
+from .sheets import chat_sheets
+
+# === /upcoming AND /history ===
+# PERFORMANCE List is indexed once per store revision: one (timestamp, record) entry per date,
+# sorted, so a date range is two bisects. Results are rendered into pages once and kept in a small
+# LRU; the ◀️ ▶️ buttons only look a page up, so paging never touches the sheet.
+
+STATUSES = {"accepted", "rejected", "pending", "all"}
+
+@dataclass
+class PerformanceRecord:
+    thread_id: str
+    event: str
+    location: str
+    status: str  # ACCEPTED / REJECTED / PENDING (blank in the sheet)
+    confirmed: bool  # dates are the confirmed ones; otherwise the proposed ones
+
+class PerformanceIndex:
+    def __init__(self, records):
+        entries = []
+        for row in records:
+            thread_id = str(row.get("THREAD ID", "")).strip()
+            if not thread_id:
+                continue
+            confirmed = str(row.get("CONFIRMED DATE | TIME", "")).strip()
+            lines = confirmed or str(row.get("PROPOSED DATE | TIME", ""))
+            record = PerformanceRecord(
+                thread_id=thread_id,
+                event=str(row.get("EVENT", "")).strip(),
+                location=str(row.get("LOCATION", "")).strip(),
+                status=str(row.get("STATUS", "")).strip().upper() or "PENDING",
+                confirmed=bool(confirmed),
+            )
+            for when in filter(None, map(parse_formatted_date, lines.splitlines())):
+                entries.append((when.timestamp(), when, record))
+        entries.sort(key=lambda entry: entry[0])
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+
+    def query(self, start=None, end=None, status="all", location=""):
+        """(first date in range, record) per performance, in date order."""
+        lo = bisect_left(self.keys, start.timestamp()) if start else 0
+        hi = bisect_right(self.keys, end.timestamp()) if end else len(self.keys)
+        location = location.lower()
+        seen, results = set(), []
+        for _, when, record in self.entries[lo:hi]:
+            if record.thread_id in seen:
+                continue
+            if status != "all" and record.status != status.upper():
+                continue
+            if location and location not in record.location.lower():
+                continue
+            seen.add(record.thread_id)
+            results.append((when, record))
+        return results
+
+_index_cache = {}  # chat_id -> (store revision, PerformanceIndex)
+_index_lock = threading.Lock()
+
+def performance_index(chat_id):
+    """Cached until PERFORMANCE List is written locally or changes on pull / in another process."""
+    sheets = chat_sheets(chat_id)
+    revision = sheets.store.revision(sheets.config.performance_tab)
+    with _index_lock:
+        cached = _index_cache.get(chat_id)
+        if cached and cached[0] == revision:
+            return cached[1]
+        index = PerformanceIndex(sheets.worksheet().get_all_records())
+        _index_cache[chat_id] = (revision, index)
+        return index
+
+# --- filters: [status] [period] [location words] ---
+def _period(token, now, past):
+    """(start, end) for 'Nd', 'month', 'YYYY-MM' or 'YYYY'; None if token isn't a period."""
+    token = token.lower()
+    if token[:-1].isdigit() and token.endswith("d"):
+        days = timedelta(days=int(token[:-1]))
+        return (now - days, now) if past else (now, now + days)
+    if token == "month":
+        first = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        return first, (first + timedelta(days=32)).replace(day=1) - timedelta(microseconds=1)
+    for fmt, step in (("%Y-%m", 32), ("%Y", 366)):
+        try:
+            first = sg_tz.localize(datetime.strptime(token, fmt))
+        except ValueError:
+            continue
+        following = (first + timedelta(days=step)).replace(day=1)
+        if fmt == "%Y":
+            following = following.replace(month=1)
+        return first, following - timedelta(microseconds=1)
+    return None
+
+def parse_filters(args, past, now=None):
+    now = now or datetime.now(sg_tz)
+    status, period, words = None, None, []
+    for token in args:
+        if status is None and token.lower() in STATUSES:
+            status = token.lower()
+        elif period is None and (found := _period(token, now, past)):
+            period = found
+        else:
+            words.append(token)
+    start, end = period or (None, None)
+    # /history never shows what is still ahead, /upcoming never what is over
+    if past:
+        end = min(end, now) if end else now
+    else:
+        start = max(start, now) if start else now
+    return status, start, end, " ".join(words)
+
+# --- pages ---
+_pages = OrderedDict()  # token -> [page text, ...]; least recently used first
+
+def _md(text):
+    return escape_markdown(text, version=1)
+
+def render_pages(title, results, show_status):
+    lines = []
+    for when, record in results:
+        line = f"• {when.strftime('%d %b %Y').upper()} — {_md(record.event or '(no name)')}"
+        if record.location:
+            line += f" @ {_md(record.location)}"
+        if show_status:
+            line += f" ({record.status.lower()}{'' if record.confirmed else ', proposed'})"
+        lines.append(line)
+    if not lines:
+        return [f"{title}\n\nNothing found."]
+    chunks = [lines[i:i + QUERY_PAGE_SIZE] for i in range(0, len(lines), QUERY_PAGE_SIZE)]
+    return [f"{title} — {len(lines)} found\n\n" + "\n".join(chunk) for chunk in chunks]
+
+def _store_pages(pages):
+    token = secrets.token_urlsafe(6)
+    _pages[token] = pages
+    while len(_pages) > QUERY_CACHE_SIZE:
+        _pages.popitem(last=False)
+    return token
+
+def _page_markup(token, page, count):
+    if count <= 1:
+        return None
+    row = []
+    if page > 0:
+        row.append(InlineKeyboardButton("◀️", callback_data=f"QUERY|{token}|{page - 1}"))
+    row.append(InlineKeyboardButton(f"{page + 1}/{count}", callback_data=f"QUERY|{token}|-"))
+    if page < count - 1:
+        row.append(InlineKeyboardButton("▶️", callback_data=f"QUERY|{token}|{page + 1}"))
+    return InlineKeyboardMarkup([row])
+
+async def _run_query(update, context, past):
+    msg = update.effective_message
+    chat_id = update.effective_chat.id
+    if chat_config(chat_id) is None:
+        return
+    try:
+        index = await asyncio.to_thread(performance_index, chat_id)
+    except Exception as e:
+        print(f"[ERROR] Failed to index PERFORMANCE List: {e}")
+        await msg.reply_text("❌ Could not read the performance sheet. Please try again later.")
+        return
+
+    status, start, end, location = parse_filters(context.args, past)
+    status = status or ("all" if past else "accepted")
+    results = index.query(start, end, status, location)
+    if past:
+        results.reverse()  # most recent first
+    title = "📜 *Performance history*" if past else "📅 *Upcoming performances*"
+    if status != "all":
+        title += f" · {status}"
+    if location:
+        title += f" · {_md(location)}"
+    pages = render_pages(title, results, show_status=past or status == "all")
+    token = _store_pages(pages)
+    await msg.reply_text(pages[0], parse_mode="Markdown", reply_markup=_page_markup(token, 0, len(pages)))
+
+@admin_only
+async def upcoming_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/upcoming [status] [7d|month|YYYY-MM|YYYY] [location]: ACCEPTED performances from now on by default."""
+    await _run_query(update, context, past=False)
+
+@admin_only
+async def history_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/history [status] [30d|month|YYYY-MM|YYYY] [location]: past performances of any status by default."""
+    await _run_query(update, context, past=True)
+
+async def query_page_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    _, token, page = query.data.split("|")
+    cached = _pages.get(token)
+    if cached is None:
+        await query.answer("⌛ These results have expired. Run the command again.", show_alert=True)
+        return
+    if not await is_admin(update, context):
+        await query.answer("Only admins can browse these results.", show_alert=True)
+        return
+    await query.answer()
+    if page == "-":
+        return  # the page counter
+    _pages.move_to_end(token)
+    pages, page = cached, int(page)
+    await query.edit_message_text(pages[page], parse_mode="Markdown", reply_markup=_page_markup(token, page, len(pages)))
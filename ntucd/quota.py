@@ -0,0 +1,104 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .config import SHEETS_READ_QUOTA, SHEETS_WRITE_QUOTA
+
+# === SHEETS QUOTA SCHEDULER ===
+# Sits in front of every Sheets API request (see sheets_http.ResilientHTTPClient): spends the
+# per-minute read/write quota as token buckets and serves waiting requests by priority.
+
+INTERACTIVE, NORMAL, BACKGROUND = 0, 1, 2
+
+_priority = ContextVar("sheets_priority", default=NORMAL)
+
+@contextmanager
+def sheets_priority(level):
+    """Runs the enclosed Sheets calls (including ones made via asyncio.to_thread) at this priority."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def request_kind(method, endpoint):
+    # Drive calls (opening a spreadsheet by name) have their own, much larger quota
+    if "sheets.googleapis.com" not in endpoint:
+        return None
+    return "read" if method.upper() == "GET" else "write"
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class SheetsScheduler:
+    def __init__(self, read_quota=SHEETS_READ_QUOTA, write_quota=SHEETS_WRITE_QUOTA):
+        self._buckets = {"read": TokenBucket(read_quota), "write": TokenBucket(write_quota)}
+        self._waiting = {"read": [], "write": []}  # heaps of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.stats = Counter()
+
+    def acquire(self, kind, priority=None):
+        """Blocks until a `kind` token is free and no higher-priority request is waiting for one."""
+        ticket = (_priority.get() if priority is None else priority, next(self._seq))
+        queue, bucket = self._waiting[kind], self._buckets[kind]
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(queue, ticket)
+            try:
+                while True:
+                    bucket.refill(time.monotonic())
+                    if queue[0] == ticket and bucket.tokens >= 1:
+                        heapq.heappop(queue)
+                        bucket.tokens -= 1
+                        break
+                    # The head waits for the bucket to refill; everyone else waits for the head to move
+                    self._cond.wait(bucket.wait_time() if queue[0] == ticket else None)
+            except BaseException:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                raise
+            finally:
+                self._cond.notify_all()
+        waited = time.monotonic() - started
+        self.stats[f"{kind}_requests"] += 1
+        if waited > 1:
+            self.stats[f"{kind}_queued"] += 1
+            print(f"[QUOTA] {kind} request waited {waited:.1f}s for quota ({len(queue)} still queued).")
+
+    def drain(self, kind):
+        # Sheets says the quota is gone (shared project, other clients): stop spending until it refills
+        with self._cond:
+            self._buckets[kind].tokens = 0
+
+    def call(self, method, endpoint, send):
+        kind = request_kind(method, endpoint)
+        if kind is None:
+            return send()
+        self.acquire(kind)
+        try:
+            return send()
+        except Exception as e:
+            if getattr(e, "code", None) == 429:
+                self.drain(kind)
+            raise
+
+
+sheets_scheduler = SheetsScheduler()
@@ -0,0 +1,145 @@
+import asyncio
+import sqlite3
+import threading
+from time import time
+
+from .attendance import send_reminder
+from .config import COORD_PATH, REMINDER_GRACE, SENT_REMINDER_PURGE_INTERVAL, SENT_REMINDER_RETENTION
+from .leases import leader_only
+from .update_queue import connect
+
+# === SCHEDULED REMINDERS ===
+# Stored in the coordination file instead of in-process timers, so they survive restarts and,
+# with several workers, are sent exactly once (claimed by the leader in a transaction).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,  -- re-scheduling under the same name replaces the pending reminder
+    kind TEXT NOT NULL,
+    chat_id INTEGER NOT NULL,
+    thread_id INTEGER,
+    due_at REAL NOT NULL,
+    fired_at REAL
+);
+CREATE INDEX IF NOT EXISTS reminders_due ON reminders (due_at) WHERE fired_at IS NULL;
+CREATE TABLE IF NOT EXISTS sent_reminders (
+    key TEXT PRIMARY KEY,  -- e.g. 'perf:<chat>:<thread>:<date>' for /remind all
+    sent_at REAL NOT NULL,
+    expires_at REAL  -- the event is over: the key can't come up again (NULL: SENT_REMINDER_RETENTION)
+);
+"""
+
+_db = None
+_db_lock = threading.Lock()
+
+def _get_db():
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = connect(COORD_PATH)
+            _db.executescript(SCHEMA)
+            # Coordination files created before sent keys expired
+            if "expires_at" not in {column[1] for column in _db.execute("PRAGMA table_info(sent_reminders)")}:
+                _db.execute("ALTER TABLE sent_reminders ADD COLUMN expires_at REAL")
+        return _db
+
+def schedule_reminder(name, due_at, chat_id, thread_id, kind="training", once=False):
+    """
+    due_at: aware datetime or epoch seconds.
+    once: a reminder under this name that already fired is left alone instead of being re-armed.
+    Returns True if a pending reminder was created or moved.
+    """
+    due = due_at if isinstance(due_at, (int, float)) else due_at.timestamp()
+    db = _get_db()
+    with _db_lock:
+        cursor = db.execute(
+            f"""
+            INSERT INTO reminders (name, kind, chat_id, thread_id, due_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET kind = excluded.kind, chat_id = excluded.chat_id,
+                thread_id = excluded.thread_id, due_at = excluded.due_at, fired_at = NULL
+            {"WHERE reminders.fired_at IS NULL AND reminders.due_at != excluded.due_at" if once else ""}
+            """,
+            (name, kind, chat_id, thread_id, due),
+        )
+    if cursor.rowcount:
+        print(f"[INFO] Reminder {name} scheduled for {due_at}.")
+    return cursor.rowcount > 0
+
+def claim_send(key, expires_at=None) -> bool:
+    """
+    Records that the reminder `key` is being sent; False if it was sent before.
+    expires_at: epoch after which the key can't be claimed again (its event is over), so it is purged.
+    """
+    db = _get_db()
+    with _db_lock:
+        cursor = db.execute(
+            "INSERT OR IGNORE INTO sent_reminders (key, sent_at, expires_at) VALUES (?, ?, ?)", (key, time(), expires_at)
+        )
+    return cursor.rowcount > 0
+
+def release_send(key):
+    """Undoes claim_send after a failed send, so the next run tries again."""
+    db = _get_db()
+    with _db_lock:
+        db.execute("DELETE FROM sent_reminders WHERE key = ?", (key,))
+
+_purged_at = 0.0
+
+def purge_sent(now=None):
+    """Forgets sent keys of events that are over; returns how many."""
+    now = now or time()
+    db = _get_db()
+    with _db_lock:
+        cursor = db.execute(
+            "DELETE FROM sent_reminders WHERE expires_at < ? OR (expires_at IS NULL AND sent_at < ?)",
+            (now, now - SENT_REMINDER_RETENTION),
+        )
+    return cursor.rowcount
+
+def claim_due(now=None):
+    """Marks due reminders as fired and returns them; a reminder is only ever claimed once."""
+    now = now or time()
+    db = _get_db()
+    with _db_lock:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute(
+                "SELECT id, name, kind, chat_id, thread_id, due_at FROM reminders WHERE fired_at IS NULL AND due_at <= ?",
+                (now,),
+            ).fetchall()
+            db.executemany("UPDATE reminders SET fired_at = ? WHERE id = ?", [(now, r[0]) for r in rows])
+            db.execute("COMMIT")
+        except sqlite3.Error:
+            db.execute("ROLLBACK")
+            raise
+    return rows
+
+@leader_only
+async def fire_due_reminders(context):
+    """Job: sends reminders that came due since the last check."""
+    from .poll_schedule import post_scheduled_poll, close_scheduled_poll  # poll_schedule imports this module
+    global _purged_at
+
+    if time() - _purged_at >= SENT_REMINDER_PURGE_INTERVAL:
+        _purged_at = time()
+        purged = await asyncio.to_thread(purge_sent)
+        if purged:
+            print(f"[INFO] Purged {purged} sent reminder key(s) of past events.")
+
+    for _, name, kind, chat_id, thread_id, due_at in await asyncio.to_thread(claim_due):
+        if kind == "training_poll":
+            # Catches up after downtime for as long as the training is still ahead
+            await post_scheduled_poll(context.bot, name, chat_id, thread_id)
+            continue
+        if kind.startswith("close_"):
+            # Closing late is still right: the poll just stays open a little longer
+            await close_scheduled_poll(context.bot, name, kind, chat_id, thread_id)
+            continue
+        if time() - due_at > REMINDER_GRACE:
+            print(f"[WARN] Reminder {name} is {(time() - due_at) / 3600:.1f}h overdue, dropped.")
+            continue
+        if kind == "training":
+            await send_reminder(context.bot, chat_id, thread_id)
+        else:
+            print(f"[WARN] Unknown reminder kind {kind} for {name}.")
@@ -0,0 +1,205 @@
+import asyncio
+import io
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from time import monotonic
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InputFile
+from telegram.ext import ContextTypes
+
+from .admin import admin_only, is_admin
+from .analytics import parse_attendance
+from .config import REPORT_WORKERS, REPORT_CHUNK_ROWS, REPORT_PROGRESS_INTERVAL, sg_tz
+from .report_compute import member_totals, render_csv
+from .sheets import chat_sheets
+from .state import interest_votes, interest_poll_threads
+
+# === /report ===
+# The snapshot is taken from the local mirror in a thread; aggregation and CSV rendering run in
+# a process pool, so a big report never blocks moderation on the event loop.
+
+@dataclass
+class ReportJob:
+    owner: int
+    cancelled: bool = False
+    futures: list = field(default_factory=list)
+
+running_reports = {}  # chat_id -> ReportJob (one report per group at a time)
+_pool = None
+
+def get_report_pool():
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs asyncio and Sheets threads is not safe
+        _pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+def shutdown_report_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def _lines(value):
+    return [line for line in str(value or "").splitlines() if line.strip()]
+
+def interest_poll_votes(chat_id):
+    """
+    [(thread_id, {user_id: options}), ...] for the chat's interest polls. Taken on the event loop,
+    where handle_poll_answer changes the vote dicts, so build_snapshot's thread only sees a copy.
+    """
+    return [
+        (str(thread_id), dict(interest_votes.get(poll_id, {})))
+        for poll_id, (poll_chat, thread_id) in interest_poll_threads.items()
+        if poll_chat == chat_id
+    ]
+
+def build_snapshot(chat_id, poll_votes):
+    """Columnar copy of ATTENDANCE List, PERFORMER Info and PERFORMANCE List (picklable)."""
+    sheets = chat_sheets(chat_id)
+
+    members, dates, marks = parse_attendance(sheets.attendance().get_all_values())
+
+    perf_rows = sheets.performer_info().get_all_values()
+    header = perf_rows[0] if perf_rows else []
+    uid_col = header.index("User ID") if "User ID" in header else None
+    status_col = header.index("Status") if "Status" in header else None
+    performers = [
+        (
+            row[0].strip(),
+            row[uid_col].strip() if uid_col is not None and uid_col < len(row) else "",
+            row[status_col].strip() if status_col is not None and status_col < len(row) else "",
+        )
+        for row in perf_rows[1:] if row and row[0].strip()
+    ]
+
+    # Interest polls answered since the bot started (votes are not persisted)
+    votes_per_user = Counter()
+    interested = Counter()
+    polled_threads = set()
+    for thread_id, votes in poll_votes:
+        polled_threads.add(thread_id)
+        for user_id, options in votes.items():
+            if options:
+                votes_per_user[str(user_id)] += 1
+                interested[thread_id] += 1
+
+    events = []
+    for record in sheets.worksheet().get_all_records():
+        thread_id = str(record.get("THREAD ID", "")).strip()
+        events.append((
+            str(record.get("EVENT", "")).strip(),
+            str(record.get("STATUS", "")).strip() or "PENDING",
+            interested[thread_id] if thread_id in polled_threads else None,
+            len(_lines(record.get("PROPOSED DATE | TIME"))),
+            len(_lines(record.get("CONFIRMED DATE | TIME"))),
+        ))
+
+    return {
+        "members": members,
+        "dates": dates,
+        "marks": marks,
+        "performers": performers,
+        "votes_per_user": dict(votes_per_user),
+        "events": events,
+    }
+
+def _cancel_keyboard(chat_id):
+    return InlineKeyboardMarkup([[InlineKeyboardButton("✖️ Cancel", callback_data=f"REPORT_CANCEL|{chat_id}")]])
+
+@admin_only
+async def report_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    msg = update.effective_message
+    chat_id = update.effective_chat.id
+    thread_id = msg.message_thread_id if msg.is_topic_message else None
+    try:
+        await msg.delete()
+    except Exception as e:
+        print(f"[DEBUG] Failed to delete /report command: {e}")
+
+    if chat_id in running_reports:
+        await context.bot.send_message(chat_id, "⏳ A report is already being built.", message_thread_id=thread_id)
+        return
+
+    job = ReportJob(owner=update.effective_user.id)
+    running_reports[chat_id] = job
+    progress = await context.bot.send_message(
+        chat_id, "📊 Building report…", message_thread_id=thread_id, reply_markup=_cancel_keyboard(chat_id)
+    )
+    # Runs in the background; this handler returns straight away
+    context.application.create_task(_build_and_send(context.bot, chat_id, thread_id, progress, job), update=update)
+
+async def _build_and_send(bot, chat_id, thread_id, progress, job):
+    loop = asyncio.get_running_loop()
+    started = monotonic()
+    try:
+        snapshot = await asyncio.to_thread(build_snapshot, chat_id, interest_poll_votes(chat_id))
+        if job.cancelled:
+            raise asyncio.CancelledError
+        marks = snapshot.pop("marks")
+        n_members, n_dates = len(snapshot["members"]), len(snapshot["dates"])
+        attended, sessions, turnout = [0] * n_members, [0] * n_members, [0] * n_dates
+
+        pool = get_report_pool()
+        if n_dates:
+            job.futures = [
+                loop.run_in_executor(pool, member_totals, marks[start * n_dates:(start + REPORT_CHUNK_ROWS) * n_dates].tobytes(), n_dates, start)
+                for start in range(0, n_members, REPORT_CHUNK_ROWS)
+            ]
+        last_edit = monotonic()
+        for done, next_chunk in enumerate(asyncio.as_completed(job.futures), start=1):
+            start, counts, eligible, chunk_turnout = await next_chunk
+            attended[start:start + len(counts)] = counts
+            sessions[start:start + len(eligible)] = eligible
+            for d, present in enumerate(chunk_turnout):
+                turnout[d] += present
+            if monotonic() - last_edit >= REPORT_PROGRESS_INTERVAL:
+                last_edit = monotonic()
+                await progress.edit_text(
+                    f"📊 Building report… {done * 100 // len(job.futures)}%", reply_markup=_cancel_keyboard(chat_id)
+                )
+
+        csv_bytes = await loop.run_in_executor(pool, render_csv, snapshot, attended, sessions, turnout)
+        if job.cancelled:
+            raise asyncio.CancelledError
+        stamp = datetime.now(sg_tz).strftime("%Y-%m-%d")
+        await bot.send_document(
+            chat_id,
+            document=InputFile(io.BytesIO(csv_bytes), filename=f"ntucd_report_{stamp}.csv"),
+            caption=f"📊 Report: {n_members} members, {n_dates} trainings, {len(snapshot['events'])} events.",
+            message_thread_id=thread_id,
+        )
+        await progress.delete()
+        print(f"[INFO] Report for chat {chat_id} built in {monotonic() - started:.1f}s.")
+    except asyncio.CancelledError:
+        for future in job.futures:
+            future.cancel()
+        try:
+            await progress.edit_text("✖️ Report cancelled.")
+        except Exception as e:
+            print(f"[DEBUG] Failed to update cancelled report message: {e}")
+    except Exception as e:
+        print(f"[ERROR] Failed to build report for chat {chat_id}: {e}")
+        try:
+            await progress.edit_text("❌ Failed to build the report. Please try again later.")
+        except Exception:
+            pass
+    finally:
+        running_reports.pop(chat_id, None)
+
+async def report_cancel_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    job = running_reports.get(update.effective_chat.id)
+    if job is None:
+        await query.answer("This report is no longer running.")
+        return
+    if not await is_admin(update, context):
+        await query.answer("Only admins can cancel reports.", show_alert=True)
+        return
+    job.cancelled = True
+    for future in job.futures:
+        future.cancel()
+    await query.answer("Cancelling…")
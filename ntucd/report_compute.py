@@ -0,0 +1,56 @@
+import csv
+import io
+
+# === REPORT AGGREGATION (runs in worker processes) ===
+# Only stdlib imports: this module is what each ProcessPoolExecutor worker has to import.
+
+def member_totals(marks, n_dates, start):
+    """
+    marks: bytes, row-major (member x training date), 1 = attended, 0 = blank (see analytics.PRESENT /
+    BLANK), for members start.. .
+    Returns (start, [attended per member], [sessions per member], [turnout per date]). Like
+    analytics.compute_stats, a member's sessions start at their first mark.
+    """
+    attended, sessions = [], []
+    turnout = [0] * n_dates
+    for offset in range(0, len(marks), n_dates):
+        row = marks[offset:offset + n_dates]
+        attended.append(row.count(1))
+        first = next((d for d, mark in enumerate(row) if mark != 0), n_dates)
+        sessions.append(n_dates - first)
+        for d, mark in enumerate(row):
+            if mark == 1:
+                turnout[d] += 1
+    return start, attended, sessions, turnout
+
+def render_csv(snapshot, attended, sessions, turnout):
+    members, dates = snapshot["members"], snapshot["dates"]
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    writer.writerow(["ATTENDANCE PER MEMBER"])
+    writer.writerow(["Member", "Attended", "Sessions", "Rate"])
+    ranked = sorted(zip(members, attended, sessions), key=lambda item: (-item[1], item[0]))
+    for member, count, eligible in ranked:
+        writer.writerow([member, count, eligible, f"{count / eligible:.0%}" if eligible else "-"])
+
+    writer.writerow([])
+    writer.writerow(["TURNOUT PER TRAINING"])
+    writer.writerow(["Date", "Present", "Members", "Rate"])
+    for date, present in zip(dates, turnout):
+        writer.writerow([date, present, len(members), f"{present / len(members):.0%}" if members else "-"])
+
+    writer.writerow([])
+    writer.writerow(["PERFORMANCE PARTICIPATION (interest polls answered)"])
+    writer.writerow(["Name", "User ID", "Status", "Polls answered"])
+    votes = snapshot["votes_per_user"]
+    for name, user_id, status in sorted(snapshot["performers"], key=lambda p: -votes.get(p[1], 0)):
+        writer.writerow([name, user_id, status, votes.get(user_id, 0)])
+
+    writer.writerow([])
+    writer.writerow(["EVENTS"])
+    writer.writerow(["Event", "Status", "Interested", "Proposed dates", "Confirmed dates", "Interested per confirmed date"])
+    for event, status, interested, proposed, confirmed in snapshot["events"]:
+        ratio = f"{interested / confirmed:.1f}" if confirmed and interested is not None else "-"
+        writer.writerow([event, status, interested if interested is not None else "-", proposed, confirmed, ratio])
+    return out.getvalue().encode("utf-8-sig")  # BOM so Excel picks up UTF-8 names
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+
+from .config import (
+    SHEETS_MAX_ATTEMPTS, SHEETS_BACKOFF_BASE, SHEETS_BACKOFF_CAP, SHEETS_MAX_RETRYING,
+    SHEETS_BREAKER_THRESHOLD, SHEETS_BREAKER_COOLDOWN, SHEETS_BREAKER_MAX_COOLDOWN
+)
+
+# === SHEETS RESILIENCE ===
+# Every gspread request goes through call_sheets() (see sheets_http.ResilientHTTPClient).
+
+DEGRADED_NOTICE = (
+    "⚠️ Google Sheets is not responding right now. The bot keeps working from its local copy "
+    "and will sync your changes once Sheets recovers."
+)
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+class SheetsUnavailable(Exception):
+    """Raised without contacting Sheets while the circuit breaker is open."""
+
+
+def classify(error) -> str:
+    """'retry' for quota and transient errors, 'fail' for everything else (bad range, no access...)."""
+    code = getattr(error, "code", None)  # gspread.exceptions.APIError
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    if code in RETRYABLE_STATUS:
+        return "retry"
+    if code == 403 and ("rateLimitExceeded" in str(error) or "usageLimits" in str(error)):
+        return "retry"  # Drive reports quota exhaustion as 403
+    if code is None and isinstance(error, OSError):
+        return "retry"  # requests' ConnectionError / Timeout
+    return "fail"
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, retry_after=None):
+    delay = random.uniform(0, min(SHEETS_BACKOFF_CAP, SHEETS_BACKOFF_BASE * 2 ** (attempt - 1)))
+    if retry_after:
+        delay = max(delay, min(retry_after, SHEETS_BACKOFF_CAP))
+    return delay
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failures; open -> half_open after the cooldown,
+    letting a single probe through. A failed probe re-opens it with a doubled cooldown.
+    """
+
+    def __init__(self, threshold=SHEETS_BREAKER_THRESHOLD, cooldown=SHEETS_BREAKER_COOLDOWN,
+                 max_cooldown=SHEETS_BREAKER_MAX_COOLDOWN):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.notified_chats = set()  # chats already told about the current outage
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.state != "closed"
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return
+            retry_in = max(0, self.cooldown - (now - self.opened_at))
+            raise SheetsUnavailable(f"Google Sheets unavailable, retrying in {retry_in:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                print("[SHEETS] Google Sheets reachable again, circuit closed.")
+            self.state = "closed"
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self._probing = False
+            self.notified_chats.clear()
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open":
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+            elif self.state == "closed" and self.failures >= self.threshold:
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self._probing = False
+        print(f"[SHEETS] Circuit open after {self.failures} failure(s); failing fast for {self.cooldown:.0f}s.")
+
+
+sheets_breaker = CircuitBreaker()
+_retry_slots = threading.BoundedSemaphore(SHEETS_MAX_RETRYING)
+
+def call_sheets(request, *args, **kwargs):
+    """Runs one Sheets request with classified retries, jittered backoff and the circuit breaker."""
+    for attempt in range(1, SHEETS_MAX_ATTEMPTS + 1):
+        sheets_breaker.before_call()
+        try:
+            result = request(*args, **kwargs)
+        except Exception as e:
+            if classify(e) != "retry":
+                sheets_breaker.record_success()  # Sheets answered; the request itself is wrong
+                raise
+            sheets_breaker.record_failure()
+            if attempt == SHEETS_MAX_ATTEMPTS or sheets_breaker.is_open:
+                raise
+            # Only a few requests may sit in backoff at once so retries don't pile onto the quota
+            if not _retry_slots.acquire(blocking=False):
+                raise
+            try:
+                delay = backoff_delay(attempt, _retry_after(e))
+                print(f"[SHEETS] Attempt {attempt} failed ({e}), retrying in {delay:.1f}s.")
+                time.sleep(delay)
+            finally:
+                _retry_slots.release()
+            continue
+        sheets_breaker.record_success()
+        return result
+
+def degraded_notice(chat_id):
+    """The degraded-mode message, once per chat per outage (None otherwise)."""
+    if sheets_breaker.state != "open" or chat_id in sheets_breaker.notified_chats:
+        return None
+    sheets_breaker.notified_chats.add(chat_id)
+    return DEGRADED_NOTICE
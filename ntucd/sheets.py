@@ -0,0 +1,300 @@
+import json
+import threading
+import time
+from datetime import datetime
+
+from .chats import CHATS, chat_config
+from .config import GOOGLE_CREDENTIALS_JSON, SHEETS_SCOPES, SHEETS_POOL_SIZE, TOKEN_REFRESH_MARGIN
+from .store import LocalStore, LocalWorksheet
+
+# === CACHES (pre-warmed at startup, see warm_up) ===
+# The client and its session are shared by every chat (the quota is per service account)
+_gspread_client = None
+_gspread_lock = threading.Lock()
+_credentials = None
+_session = None  # one AuthorizedSession (pooled keep-alive connections) shared by every Sheets call
+_refresher = None
+_spreadsheets = {}  # spreadsheet name -> Spreadsheet
+_spreadsheets_lock = threading.Lock()
+_chat_sheets = {}  # chat_id -> ChatSheets
+_chat_sheets_lock = threading.Lock()
+
+def get_gspread_client():
+    global _gspread_client
+    with _gspread_lock:
+        if _gspread_client is None:
+            # Heavy imports are deferred until the first Sheets access
+            import gspread
+
+            from .sheets_http import ResilientHTTPClient
+
+            session = get_authorized_session()
+            _gspread_client = gspread.Client(auth=_credentials, session=session, http_client=ResilientHTTPClient)
+        return _gspread_client
+
+def get_authorized_session():
+    global _credentials, _session, _refresher
+    if _session is None:
+        from google.auth.transport.requests import AuthorizedSession
+        from google.oauth2.service_account import Credentials
+        from requests.adapters import HTTPAdapter
+
+        creds_dict = json.loads(GOOGLE_CREDENTIALS_JSON)
+        # creds_dict = GOOGLE_CREDENTIALS_JSON
+        _credentials = Credentials.from_service_account_info(creds_dict, scopes=SHEETS_SCOPES)
+        # Near expiry, requests keep using the current token while a refresh runs in the background
+        _credentials.with_non_blocking_refresh()
+
+        _session = AuthorizedSession(_credentials)
+        # Handlers call Sheets from worker threads, so keep enough warm connections for all of them
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=SHEETS_POOL_SIZE)
+        _session.mount("https://", adapter)
+
+        _refresher = threading.Thread(target=_refresh_token_forever, name="sheets-token-refresh", daemon=True)
+        _refresher.start()
+    return _session
+
+def _refresh_token_forever():
+    """Refreshes the access token ahead of expiry so no Sheets call ever waits on a token fetch."""
+    from google.auth.transport.requests import Request
+
+    request = Request(session=_session)  # token fetches reuse the pooled connections too
+    while True:
+        try:
+            if not _credentials.token or _credentials.expiry is None:
+                wait = 0
+            else:
+                wait = (_credentials.expiry - datetime.utcnow()).total_seconds() - TOKEN_REFRESH_MARGIN
+            if wait > 0:
+                time.sleep(wait)
+            _credentials.refresh(request)
+            print(f"[INFO] Sheets access token refreshed, valid until {_credentials.expiry} UTC.")
+        except Exception as e:
+            print(f"[ERROR] Failed to refresh Sheets access token: {e}")
+            time.sleep(30)
+
+def get_spreadsheet(name):
+    with _spreadsheets_lock:
+        spreadsheet = _spreadsheets.get(name)
+    if spreadsheet is None:
+        spreadsheet = get_gspread_client().open(name)
+        with _spreadsheets_lock:
+            spreadsheet = _spreadsheets.setdefault(name, spreadsheet)
+    return spreadsheet
+
+
+# One row per closed poll; the option counts follow RESULTS, one "option: votes" cell each
+POLL_RESULTS_HEADER = ["CLOSED AT", "TYPE", "THREAD ID", "POLL ID", "QUESTION", "VOTERS", "RESULTS"]
+
+class KeyedRow:
+    """
+    A row addressed by the value in its key column (THREAD ID, column A) rather than its position.
+    Before each read or write the key cell is checked (one cell); if a committee member inserted,
+    deleted or sorted rows in the meantime, the row is found again with a find on that column.
+    That covers the local mirror; the sync re-checks the key against the sheet itself before pushing.
+    """
+
+    def __init__(self, worksheet, key, row=None, key_col=1):
+        self.worksheet = worksheet
+        self.key = str(key).strip()
+        self.row = row  # last known position; a hint only
+        self.key_col = key_col
+
+    def resolve(self) -> int:
+        if self.row is not None and str(self.worksheet.cell(self.row, self.key_col).value or "").strip() == self.key:
+            return self.row
+        cell = self.worksheet.find(self.key, in_column=self.key_col)
+        if cell is None:
+            raise KeyError(f"{self.key} is no longer in {self.worksheet.title}")
+        if self.row is not None:
+            print(f"[SYNC] Row of {self.key} in {self.worksheet.title} moved from {self.row} to {cell.row}.")
+        self.row = cell.row
+        return self.row
+
+    def values(self):
+        return self.worksheet.row_values(self.resolve())
+
+    def update_cell(self, col, value):
+        self.worksheet.update_cell(self.resolve(), col, value)
+
+    def update(self, values, first_col, last_col):
+        """values: one row of cells for columns first_col..last_col (letters), e.g. update([[a, b]], "F", "G")."""
+        row = self.resolve()
+        self.worksheet.update(values=values, range_name=f"{first_col}{row}:{last_col}{row}")
+
+
+class ChatSheets:
+    """One chat's worksheets, local mirror and tab indexes. Nothing here is shared between chats."""
+
+    def __init__(self, config):
+        self.config = config
+        # PERFORMANCE List rows are identified by THREAD ID (column A)
+        self.store = LocalStore(config.store_path, on_pull=self._reload_indexes, key_columns={config.performance_tab: 1})
+        self._worksheets = {}  # (spreadsheet name, tab name) -> Worksheet
+        self.performance_thread_ids = set()  # thread IDs registered in PERFORMANCE List
+        self.performer_user_ids = set()  # user IDs in PERFORMER Info
+        self.others_thread_ids = set()  # thread IDs in OTHERS List
+        self.matric_index = {}  # matric number -> attendance value (Welcome Tea responses)
+        self.indexes_loaded = set()  # names of the indexes above that are populated
+        self._index_revisions = {}  # index name -> store revision of its tab when it was loaded
+
+    # --- worksheets ---
+    def _get_worksheet(self, spreadsheet_name, tab_name):
+        key = (spreadsheet_name, tab_name)
+        ws = self._worksheets.get(key)
+        if ws is None:
+            ws = get_spreadsheet(spreadsheet_name).worksheet(tab_name)
+            self._worksheets[key] = ws
+        return ws
+
+    def worksheet(self, tab_name=None):
+        tab_name = tab_name or self.config.performance_tab
+        # Mirrored tabs are read and written locally; ntucd.sync keeps them in step with the sheet
+        if tab_name in self.config.mirrored_tabs:
+            return LocalWorksheet(self.store, tab_name)
+        return self.remote_worksheet(tab_name)
+
+    def remote_worksheet(self, tab_name=None):
+        return self._get_worksheet(self.config.sheet_name, tab_name or self.config.performance_tab)
+
+    def spreadsheet(self):
+        return get_spreadsheet(self.config.sheet_name)
+
+    def attendance(self):
+        return self.worksheet(self.config.attendance_tab)
+
+    def performer_info(self):
+        return self.worksheet(self.config.performer_tab)
+
+    def poll_results(self):
+        from gspread.exceptions import WorksheetNotFound
+
+        try:
+            return self.remote_worksheet(self.config.poll_results_tab)
+        except WorksheetNotFound:
+            ws = self.spreadsheet().add_worksheet(self.config.poll_results_tab, rows=100, cols=len(POLL_RESULTS_HEADER) + 10)
+            ws.append_row(POLL_RESULTS_HEADER)
+            self._worksheets[(self.config.sheet_name, ws.title)] = ws
+            print(f"[INFO] Created {ws.title} tab in {self.config.sheet_name}.")
+            return ws
+
+    def welcome_tea(self):
+        return self._get_worksheet(self.config.welcome_tea_sheet, self.config.welcome_tea_tab)
+
+    def warm(self):
+        for ws in self.spreadsheet().worksheets():
+            self._worksheets.setdefault((self.config.sheet_name, ws.title), ws)
+
+    def performance_row(self, thread_id, row=None) -> KeyedRow:
+        """The topic's PERFORMANCE List row; `row` is where it was last seen, if known."""
+        return KeyedRow(self.worksheet(), thread_id, row)
+
+    # --- tab indexes ---
+    def _loading(self, name, tab):
+        # Taken before reading, so a write that lands during the read triggers another reload
+        self._index_revisions[name] = self.store.revision(tab)
+        self.indexes_loaded.add(name)
+
+    def _index_stale(self, name, tab) -> bool:
+        return self._index_revisions.get(name) != self.store.revision(tab)
+
+    def load_others_list(self):
+        self._loading("others_list", self.config.others_tab)
+        rows = self.worksheet(self.config.others_tab).col_values(1)
+        self.others_thread_ids.clear()
+        self.others_thread_ids.update({int(r.strip()) for r in rows if r.strip().isdigit()})
+        print(f"[INFO] Loaded {len(self.others_thread_ids)} OTHERS thread IDs for chat {self.config.chat_id}.")
+
+    def load_performance_index(self):
+        self._loading("performance_index", self.config.performance_tab)
+        thread_ids = self.worksheet().col_values(1)[1:]  # skip header
+        self.performance_thread_ids.clear()
+        self.performance_thread_ids.update(str(t).strip() for t in thread_ids if str(t).strip())
+
+    def load_performer_index(self):
+        self._loading("performer_index", self.config.performer_tab)
+        records = self.performer_info().get_all_records()
+        self.performer_user_ids.clear()
+        self.performer_user_ids.update(str(r.get("User ID", "")).strip() for r in records if str(r.get("User ID", "")).strip())
+
+    def load_matric_index(self):
+        rows = self.welcome_tea().get_all_records()  # Each row is a dict
+        self.matric_index.clear()
+        for row in rows:
+            matric_in_row = str(row.get("Matriculation Number", "")).strip().upper()
+            if matric_in_row and matric_in_row not in self.matric_index:
+                self.matric_index[matric_in_row] = str(row.get("Attendance", "")).strip()
+        self.indexes_loaded.add("matric_index")
+
+    def _reload_indexes(self, tab):
+        # Human edits pulled into the mirror change what the indexes should contain
+        loader = {
+            self.config.performance_tab: self.load_performance_index,
+            self.config.others_tab: self.load_others_list,
+            self.config.performer_tab: self.load_performer_index,
+        }.get(tab)
+        if loader:
+            loader()
+
+    # Indexes re-read the local mirror whenever its tab's revision moved: rows added or deleted
+    # here, pulled from the sheet or written by another worker process
+    def thread_registered(self, thread_id) -> bool:
+        if self._index_stale("performance_index", self.config.performance_tab):
+            self.load_performance_index()
+        return str(thread_id) in self.performance_thread_ids
+
+    def user_in_timeline(self, user_id) -> bool:
+        if self._index_stale("performer_index", self.config.performer_tab):
+            self.load_performer_index()
+        return str(user_id) in self.performer_user_ids
+
+    def is_others_thread(self, thread_id) -> bool:
+        if self._index_stale("others_list", self.config.others_tab):
+            self.load_others_list()
+        return thread_id in self.others_thread_ids
+
+    def matric_valid(self, matric_number: str) -> bool:
+        matric = matric_number.strip().upper()
+        # Registrations keep coming in, so a miss re-reads the form responses once
+        if "matric_index" not in self.indexes_loaded or matric not in self.matric_index:
+            try:
+                self.load_matric_index()
+            except Exception as e:
+                if "matric_index" not in self.indexes_loaded:
+                    raise
+                # Sheets is struggling: answer from the last good copy of the responses
+                print(f"[WARN] Welcome Tea responses unavailable, using cached index: {e}")
+
+        # ✅ Attendance must be exactly '1'
+        return self.matric_index.get(matric) == "1"
+
+    def append_to_others_list(self, thread_id):
+        try:
+            self.worksheet(self.config.others_tab).append_row([thread_id])
+            print(f"[INFO] Thread ID {thread_id} written to OTHERS List.")
+            self.others_thread_ids.add(thread_id)  # Also track in memory
+        except Exception as e:
+            print(f"[ERROR] Failed to write Thread ID {thread_id} to OTHERS List: {e}")
+
+
+def chat_sheets(chat_id) -> ChatSheets:
+    """The ChatSheets of a configured chat (created on first use); KeyError for unknown chats."""
+    sheets = _chat_sheets.get(chat_id)
+    if sheets is None:
+        config = chat_config(chat_id)
+        if config is None:
+            raise KeyError(f"Chat {chat_id} is not configured")
+        with _chat_sheets_lock:
+            sheets = _chat_sheets.get(chat_id) or _chat_sheets.setdefault(chat_id, ChatSheets(config))
+    return sheets
+
+def all_chat_sheets():
+    return [chat_sheets(chat_id) for chat_id in CHATS]
+
+def get_gspread_sheet(chat_id, tab_name=None):
+    return chat_sheets(chat_id).worksheet(tab_name)
+
+def warm_sheets_client():
+    get_gspread_client()
+    for sheets in all_chat_sheets():
+        sheets.warm()
@@ -0,0 +1,27 @@
+from functools import partial
+
+from gspread.http_client import HTTPClient
+
+from .coalesce import read_coalescer, read_key
+from .quota import sheets_scheduler
+from .resilience import call_sheets
+
+# Imported lazily by sheets.get_gspread_client() together with gspread itself.
+
+class ResilientHTTPClient(HTTPClient):
+    """
+    gspread HTTP client whose every API request is quota-scheduled and goes through
+    call_sheets(); identical reads are coalesced, writes invalidate the spreadsheet's reads.
+    """
+
+    def request(self, method, endpoint, params=None, **kwargs):
+        send = partial(super().request, method, endpoint, params=params, **kwargs)
+        # Each attempt (including retries) waits for its own quota token
+        attempt = partial(sheets_scheduler.call, method, endpoint, send)
+        key = read_key(endpoint, params)
+        if method.upper() != "GET":
+            try:
+                return call_sheets(attempt)
+            finally:
+                read_coalescer.invalidate(key[0])
+        return read_coalescer.read(key, partial(call_sheets, attempt))
@@ -0,0 +1,108 @@
+import asyncio
+from time import perf_counter
+
+from telegram import BotCommand, BotCommandScopeDefault, BotCommandScopeChatAdministrators
+
+from .admin import load_admins
+from .chats import CHATS
+from .config import STARTUP_WARMUP_DEADLINE, CRITICAL_WARMUPS
+from .sheets import all_chat_sheets, warm_sheets_client
+from .report import shutdown_report_pool
+from .sync import warm_store, flush_store
+
+# === GUI COMMANDS ===
+# Step 1: Define admin-only commands
+admin_commands = [
+    BotCommand("start", "Just to test the bot and grab chat ID"),
+    BotCommand("threadid", "To obtain the thread ID of the current topic"),
+    BotCommand("poll", "Create attendance poll in Attendance Topic"),
+    BotCommand("modify", "Modify performance summary details"),
+    BotCommand("remind", "Remind about performance (/remind all [days] for every upcoming one)"),
+    BotCommand("confirmation", "Confirm performance details"),
+    BotCommand("attendance", "Attendance stats (add a name for one member)"),
+    BotCommand("report", "Export attendance and performance report (CSV)"),
+    BotCommand("upcoming", "Upcoming performances (filter: status, 30d/month/YYYY-MM, location)"),
+    BotCommand("history", "Past performances (filter: status, 30d/month/YYYY-MM, location)"),
+]
+
+# Step 2: Function to register them for admins only, in every configured group
+async def set_admin_commands(application):
+    await asyncio.gather(*(
+        application.bot.set_my_commands(commands=admin_commands, scope=BotCommandScopeChatAdministrators(chat_id=chat_id))
+        for chat_id in CHATS
+    ))
+
+# Step 3: Optional - clear commands for regular users
+async def clear_global_commands(application):
+    await application.bot.set_my_commands([], scope=BotCommandScopeDefault())
+
+# Step 4: Warm up everything concurrently in startup
+async def on_startup(application):
+    # Keep references so the still-running background warm-ups aren't garbage collected
+    application.bot_data["warmup_tasks"] = await warm_up(application)
+
+async def on_shutdown(application):
+    await flush_store(application)
+    shutdown_report_pool()
+
+async def _timed_warmup(name, coro, timings):
+    started = perf_counter()
+    try:
+        await coro
+        timings[name] = (perf_counter() - started, None)
+        print(f"[WARMUP] {name} ready in {timings[name][0] * 1000:.0f} ms")
+    except Exception as e:
+        timings[name] = (perf_counter() - started, e)
+        print(f"[WARMUP] {name} failed after {timings[name][0] * 1000:.0f} ms: {e}")
+
+def _for_all_chats(loader_name):
+    # Loads the same index for every configured chat, concurrently
+    return asyncio.gather(*(asyncio.to_thread(getattr(sheets, loader_name)) for sheets in all_chat_sheets()))
+
+async def _load_all_admins(bot):
+    await asyncio.gather(*(load_admins(bot, chat_id) for chat_id in CHATS))
+
+async def warm_up(application, deadline=None):
+    """
+    Pre-warms the Sheets client, tab indexes, admin cache and command scopes of every chat concurrently.
+    Returns once the critical components are ready or the deadline passes; the rest keep
+    loading in the background.
+    """
+    if deadline is None:
+        deadline = STARTUP_WARMUP_DEADLINE
+    timings = {}
+    started = perf_counter()
+
+    async def sheet_warmups():
+        # Every tab needs the client, so open it first, then pull the mirrored tabs in one
+        # batchGet and build the indexes from the local mirror
+        await _timed_warmup("sheets_client", asyncio.to_thread(warm_sheets_client), timings)
+        await _timed_warmup("store", asyncio.to_thread(warm_store), timings)
+        await asyncio.gather(
+            _timed_warmup("others_list", _for_all_chats("load_others_list"), timings),
+            _timed_warmup("performance_index", _for_all_chats("load_performance_index"), timings),
+            _timed_warmup("performer_index", _for_all_chats("load_performer_index"), timings),
+            _timed_warmup("matric_index", _for_all_chats("load_matric_index"), timings),
+        )
+
+    tasks = [
+        asyncio.create_task(sheet_warmups()),
+        asyncio.create_task(_timed_warmup("admins", _load_all_admins(application.bot), timings)),
+        asyncio.create_task(_timed_warmup("admin_commands", set_admin_commands(application), timings)),
+        asyncio.create_task(_timed_warmup("global_commands", clear_global_commands(application), timings)),
+    ]
+
+    async def critical_ready():
+        while not CRITICAL_WARMUPS.issubset(timings):
+            await asyncio.sleep(0.05)
+
+    try:
+        await asyncio.wait_for(critical_ready(), timeout=deadline)
+    except asyncio.TimeoutError:
+        missing = sorted(CRITICAL_WARMUPS - set(timings))
+        print(f"[WARMUP] Deadline of {deadline:.0f}s passed, still waiting on: {', '.join(missing)}")
+
+    print(f"[WARMUP] Accepting updates after {(perf_counter() - started) * 1000:.0f} ms")
+    for name, (elapsed, error) in sorted(timings.items(), key=lambda item: item[1][0], reverse=True):
+        print(f"[WARMUP]   {name:<18} {elapsed * 1000:>7.0f} ms {'FAILED' if error else 'ok'}")
+    return tasks
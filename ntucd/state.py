@@ -0,0 +1,11 @@
+# Runtime state shared across handlers
+
+# Track topic initialization: {(chat_id, thread_id), ...}
+initialized_topics = set()
+# Track all active polls: poll_id -> (type, chat_id)
+active_polls = {}  # Example: {"123456789": ("training", -100...), "987654321": ("interest", -100...)}
+# For each type of poll, track answers if needed
+yes_voters = {}  # chat_id -> {user_id, ...} for the group's current training poll
+interest_votes = {}  # poll_id -> {user_id: [option_indices]}
+interest_poll_threads = {}  # poll_id -> (chat_id, thread_id) of the event the poll is about
+pending_users = {} # pending user join request
@@ -0,0 +1,474 @@
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+from time import time
+
+# === LOCAL SHEET MIRROR ===
+# Handlers read and write these tables synchronously through LocalWorksheet (a drop-in for the
+# subset of gspread's Worksheet API they use). ntucd.sync pushes local changes to Google Sheets
+# in batches and pulls human edits back, resolving conflicts last-writer-wins per cell.
+# Tabs with a key column (PERFORMANCE List: THREAD ID in column A) remember each dirty cell's row
+# key, so a pending edit follows its row when someone sorts or inserts rows in the sheet.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cells (
+    tab TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    value TEXT NOT NULL DEFAULT '',
+    synced_value TEXT,                  -- value last seen in / pushed to the sheet (NULL = never)
+    dirty INTEGER NOT NULL DEFAULT 0,   -- local write not pushed yet
+    appended INTEGER NOT NULL DEFAULT 0, -- part of a row appended locally, pushed with append_rows
+    user_entered INTEGER NOT NULL DEFAULT 0,
+    row_key TEXT,                       -- key column value of the row when written (keyed tabs)
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (tab, row, col)
+);
+CREATE INDEX IF NOT EXISTS cells_dirty ON cells (tab, dirty);
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY,
+    at REAL NOT NULL,
+    tab TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    local_value TEXT,
+    sheet_value TEXT,
+    winner TEXT NOT NULL,  -- 'sheet' or 'local'
+    reason TEXT NOT NULL   -- 'human_edit' or 'conflict'
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    tab TEXT PRIMARY KEY,
+    pulled_at REAL,
+    pushed_at REAL
+);
+"""
+
+def a1_to_rowcol(label):
+    match = re.match(r"^([A-Za-z]+)(\d+)$", label.strip())
+    if not match:
+        raise ValueError(f"Unsupported cell label: {label}")
+    letters, row = match.groups()
+    col = 0
+    for ch in letters.upper():
+        col = col * 26 + (ord(ch) - 64)
+    return int(row), col
+
+def rowcol_to_a1(row, col):
+    letters = ""
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return f"{letters}{row}"
+
+def _numericise(value):
+    # Same conversion gspread's get_all_records() applies
+    if value == "":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+def _normalized(value):
+    """
+    How a value compares across a round trip: USER_ENTERED cells come back formatted by the sheet
+    (" 5" -> "5", "1.50" -> "1.5", "true" -> "TRUE", "1,000" -> "1000"), which is not an edit.
+    """
+    value = str(value).strip()
+    if value.upper() in ("TRUE", "FALSE"):
+        return value.upper()
+    number = _numericise(value.replace(",", "")) if value[:1].isdigit() or value[:1] in "-+." else value
+    if isinstance(number, float) and number.is_integer():
+        number = int(number)
+    return str(number)
+
+def _same(a, b):
+    return a == b or _normalized(a) == _normalized(b)
+
+
+class LocalStore:
+    def __init__(self, path, on_pull=None, key_columns=None):
+        self.path = path
+        self.on_pull = on_pull  # callback(tab) run after a pull changed a tab
+        self.key_columns = key_columns or {}  # tab -> column whose value identifies a row
+        self._lock = threading.RLock()
+        # Worker processes (python -m ntucd worker) share the file, so wait on each other's locks
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        # Mirrors created before row keys were recorded
+        if "row_key" not in {column[1] for column in self._db.execute("PRAGMA table_info(cells)")}:
+            self._db.execute("ALTER TABLE cells ADD COLUMN row_key TEXT")
+        self._rows_cache = {}  # tab -> list of rows (materialized, invalidated on change)
+        self._data_version = None  # changes when another process commits to the file
+        self._revisions = {}  # tab -> count of local changes, for caches built on rows()
+
+    # --- reads ---
+    def rows(self, tab):
+        with self._lock:
+            (version,) = self._db.execute("PRAGMA data_version").fetchone()
+            if version != self._data_version:
+                self._rows_cache.clear()
+                self._data_version = version
+            rows = self._rows_cache.get(tab)
+            if rows is None:
+                rows = self._materialize(tab)
+                self._rows_cache[tab] = rows
+            return [list(r) for r in rows]
+
+    def cell_value(self, tab, row, col):
+        with self._lock:
+            found = self._db.execute(
+                "SELECT value FROM cells WHERE tab = ? AND row = ? AND col = ?", (tab, row, col)
+            ).fetchone()
+            return found[0] if found else ""
+
+    def find_cell(self, tab, value, row=None, col=None):
+        """(row, col) of the first cell holding value, optionally within one row / column; None if absent."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT row, col FROM cells WHERE tab = ? AND value = ? AND (? IS NULL OR row = ?) AND (? IS NULL OR col = ?) "
+                "ORDER BY row, col LIMIT 1",
+                (tab, value, row, row, col, col),
+            ).fetchone()
+
+    def revision(self, tab):
+        """Differs from the previous call whenever the tab may have changed, here or in another process."""
+        with self._lock:
+            (version,) = self._db.execute("PRAGMA data_version").fetchone()
+            return version, self._revisions.get(tab, 0)
+
+    def _changed(self, tab):
+        self._rows_cache.pop(tab, None)
+        self._revisions[tab] = self._revisions.get(tab, 0) + 1
+
+    def _materialize(self, tab):
+        cells = self._db.execute(
+            "SELECT row, col, value FROM cells WHERE tab = ? AND value != '' ORDER BY row, col", (tab,)
+        ).fetchall()
+        if not cells:
+            return []
+        height = cells[-1][0]
+        width = max(c for _, c, _ in cells)
+        rows = [[""] * width for _ in range(height)]
+        for row, col, value in cells:
+            rows[row - 1][col - 1] = value
+        return rows
+
+    def has_tab(self, tab):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM sync_state WHERE tab = ? AND pulled_at IS NOT NULL", (tab,)).fetchone() is not None
+
+    # --- writes ---
+    def write_cells(self, tab, cells, user_entered=False, appended=False):
+        """cells: iterable of (row, col, value). Marks them dirty for the next push."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._upsert_dirty(tab, cells, user_entered, appended)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._changed(tab)
+
+    def append_row(self, tab, values, user_entered=False):
+        with self._lock:
+            # Row number and insert in one transaction so concurrent processes never pick the same row
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                (height,) = self._db.execute(
+                    "SELECT COALESCE(MAX(row), 0) FROM cells WHERE tab = ? AND value != ''", (tab,)
+                ).fetchone()
+                next_row = height + 1
+                self._upsert_dirty(tab, [(next_row, col, v) for col, v in enumerate(values, start=1)],
+                                   user_entered, appended=True)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._changed(tab)
+            return next_row
+
+    def _upsert_dirty(self, tab, cells, user_entered, appended):
+        now = time()
+        cells = [(row, col, "" if value is None else str(value)) for row, col, value in cells]
+        key_col = self.key_columns.get(tab)
+        row_keys = {}
+        if key_col and not appended:
+            # Keys as the rows stood before this write
+            for row in {row for row, _, _ in cells}:
+                found = self._db.execute(
+                    "SELECT value FROM cells WHERE tab = ? AND row = ? AND col = ?", (tab, row, key_col)
+                ).fetchone()
+                row_keys[row] = found[0].strip() if found and found[0].strip() else None
+        for row, col, value in cells:
+            self._db.execute(
+                """
+                INSERT INTO cells (tab, row, col, value, dirty, appended, user_entered, row_key, version, updated_at)
+                VALUES (?, ?, ?, ?, 1, ?, ?, ?, 1, ?)
+                ON CONFLICT (tab, row, col) DO UPDATE SET
+                    value = excluded.value, dirty = 1, appended = MAX(cells.appended, excluded.appended),
+                    user_entered = excluded.user_entered, row_key = excluded.row_key, version = cells.version + 1,
+                    updated_at = excluded.updated_at
+                """,
+                (tab, row, col, value, int(appended), int(user_entered), row_keys.get(row), now),
+            )
+
+    # --- sync support (used by ntucd.sync) ---
+    def pending_changes(self, tab):
+        """Returns (appended_rows, dirty_cells) waiting to be pushed; dirty cells carry their row key."""
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT row, col, value, appended, user_entered, version, row_key FROM cells WHERE tab = ? AND dirty = 1 ORDER BY row, col",
+                (tab,),
+            )
+            appended, dirty = {}, []
+            for row, col, value, is_appended, user_entered, version, row_key in cur.fetchall():
+                if is_appended:
+                    appended.setdefault(row, []).append((col, value, user_entered, version))
+                else:
+                    dirty.append((row, col, value, user_entered, version, row_key))
+            return appended, dirty
+
+    def mark_pushed(self, tab, cells):
+        """cells: (row, col, value, version) as pushed. Cells written again meanwhile stay dirty."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            for row, col, value, version in cells:
+                self._db.execute(
+                    "UPDATE cells SET synced_value = ?, appended = 0, dirty = CASE WHEN version = ? THEN 0 ELSE 1 END "
+                    "WHERE tab = ? AND row = ? AND col = ?",
+                    (value, version, tab, row, col),
+                )
+            self._db.execute(
+                "INSERT INTO sync_state (tab, pushed_at) VALUES (?, ?) ON CONFLICT (tab) DO UPDATE SET pushed_at = excluded.pushed_at",
+                (tab, time()),
+            )
+            self._db.execute("COMMIT")
+
+    def apply_pull(self, tab, values, sheet_modified_at=None):
+        """
+        Merges the sheet's current values into the mirror.
+        - Sheet unchanged since last sync: keep local (pending writes will be pushed).
+        - Sheet changed, local clean: take the sheet value (human edit).
+        - Both changed: last writer wins, using the spreadsheet's modified time for the human edit.
+        Rows appended locally but not pushed yet are moved below the sheet's last row.
+        sheet_modified_at: callable returning the spreadsheet's last modified epoch (only called on conflict).
+        Returns the number of cells changed locally.
+        """
+        sheet = {}
+        for r, row in enumerate(values, start=1):
+            for c, v in enumerate(row, start=1):
+                if v != "":
+                    sheet[(r, c)] = v
+
+        now = time()
+        changed = 0
+        modified_at = None
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                local = {}
+                pending_appends = {}
+                keyed = {}  # (row, col) -> (row key, user_entered, version) of dirty cells of a keyed row
+                for row, col, value, synced, dirty, appended, user_entered, version, updated_at, row_key in self._db.execute(
+                    "SELECT row, col, value, synced_value, dirty, appended, user_entered, version, updated_at, row_key FROM cells WHERE tab = ?",
+                    (tab,),
+                ).fetchall():
+                    if appended:
+                        pending_appends.setdefault(row, []).append((col, value, user_entered, version, updated_at))
+                    else:
+                        local[(row, col)] = (value, synced, dirty, updated_at)
+                        if dirty and row_key:
+                            keyed[(row, col)] = (row_key, user_entered, version)
+                # Unpushed appended rows are set aside so rows added in the sheet can take their place
+                self._db.execute("DELETE FROM cells WHERE tab = ? AND appended = 1", (tab,))
+                if keyed and tab in self.key_columns:
+                    self._follow_rows(tab, sheet, local, keyed)
+
+                for key in set(sheet) | set(local):
+                    row, col = key
+                    sheet_value = sheet.get(key, "")
+                    value, synced, dirty, updated_at = local.get(key, ("", None, 0, 0))
+                    base = synced if synced is not None else ""
+                    if sheet_value == base:
+                        continue
+                    if _same(sheet_value, base):
+                        # Only the sheet's formatting of what we pushed: not an edit, no audit entry
+                        if not dirty:
+                            self._upsert_synced(tab, row, col, sheet_value)
+                            changed += 1
+                        continue
+                    if not dirty or _same(sheet_value, value):
+                        if synced is not None and not _same(sheet_value, value):
+                            self._audit(tab, row, col, value, sheet_value, "sheet", "human_edit", now)
+                        self._upsert_synced(tab, row, col, sheet_value)
+                        changed += 1
+                        continue
+                    # Both sides changed since the last sync
+                    if modified_at is None and sheet_modified_at is not None:
+                        modified_at = sheet_modified_at() or 0
+                    if (modified_at or 0) > updated_at:
+                        self._audit(tab, row, col, value, sheet_value, "sheet", "conflict", now)
+                        self._upsert_synced(tab, row, col, sheet_value)
+                        changed += 1
+                    else:
+                        self._audit(tab, row, col, value, sheet_value, "local", "conflict", now)
+                        # Keep the local value dirty; the next push overwrites the sheet
+                        self._db.execute(
+                            "UPDATE cells SET synced_value = ? WHERE tab = ? AND row = ? AND col = ?",
+                            (sheet_value, tab, row, col),
+                        )
+
+                # Drop cleared cells, then re-seat unpushed appended rows below the last remaining row
+                self._db.execute("DELETE FROM cells WHERE tab = ? AND value = '' AND dirty = 0", (tab,))
+                if pending_appends:
+                    (height,) = self._db.execute("SELECT COALESCE(MAX(row), 0) FROM cells WHERE tab = ?", (tab,)).fetchone()
+                    for offset, row in enumerate(sorted(pending_appends), start=1):
+                        for col, value, user_entered, version, updated_at in pending_appends[row]:
+                            self._db.execute(
+                                "INSERT INTO cells (tab, row, col, value, dirty, appended, user_entered, version, updated_at) "
+                                "VALUES (?, ?, ?, ?, 1, 1, ?, ?, ?)",
+                                (tab, height + offset, col, value, user_entered, version, updated_at),
+                            )
+
+                self._db.execute(
+                    "INSERT INTO sync_state (tab, pulled_at) VALUES (?, ?) ON CONFLICT (tab) DO UPDATE SET pulled_at = excluded.pulled_at",
+                    (tab, now),
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            if changed or pending_appends:
+                self._changed(tab)
+            else:
+                self._rows_cache.pop(tab, None)
+
+        if (changed or pending_appends) and self.on_pull:
+            try:
+                self.on_pull(tab)
+            except Exception as e:
+                print(f"[ERROR] Store listener failed for {tab}: {e}")
+        return changed
+
+    def _follow_rows(self, tab, sheet, local, keyed):
+        """Moves pending edits to where their row key now is in the sheet (rows sorted / inserted)."""
+        key_col = self.key_columns[tab]
+        sheet_rows = {}
+        for (row, col), value in sheet.items():
+            if col == key_col:
+                sheet_rows.setdefault(value.strip(), row)
+        moves = [
+            ((row, col), (sheet_rows[row_key], col))
+            for (row, col), (row_key, _, _) in keyed.items()
+            if sheet_rows.get(row_key, row) != row
+        ]
+        if not moves:
+            return
+        # Take all of them out first: two rows may have swapped places
+        moved = [(new, local.pop(old), keyed[old]) for old, new in moves]
+        for (row, col), _ in moves:
+            self._db.execute("DELETE FROM cells WHERE tab = ? AND row = ? AND col = ?", (tab, row, col))
+        for (row, col), (value, synced, dirty, updated_at), (row_key, user_entered, version) in moved:
+            local[(row, col)] = (value, synced, dirty, updated_at)
+            self._db.execute(
+                "INSERT OR REPLACE INTO cells (tab, row, col, value, synced_value, dirty, appended, user_entered, row_key, version, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 1, 0, ?, ?, ?, ?)",
+                (tab, row, col, value, synced, user_entered, row_key, version, updated_at),
+            )
+        print(f"[SYNC] {tab}: {len(moves)} pending edit(s) moved with their rows.")
+
+    def _upsert_synced(self, tab, row, col, value):
+        self._db.execute(
+            """
+            INSERT INTO cells (tab, row, col, value, synced_value, dirty, version) VALUES (?, ?, ?, ?, ?, 0, 0)
+            ON CONFLICT (tab, row, col) DO UPDATE SET value = excluded.value, synced_value = excluded.synced_value, dirty = 0
+            """,
+            (tab, row, col, value, value),
+        )
+
+    def _audit(self, tab, row, col, local_value, sheet_value, winner, reason, at):
+        self._db.execute(
+            "INSERT INTO audit_log (at, tab, row, col, local_value, sheet_value, winner, reason) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (at, tab, row, col, local_value, sheet_value, winner, reason),
+        )
+        if reason == "conflict":
+            print(f"[SYNC] Conflict at {tab}!{rowcol_to_a1(row, col)}: local={local_value!r} sheet={sheet_value!r} -> {winner} wins")
+
+
+Cell = namedtuple("Cell", "row col value")  # the attributes of gspread's Cell the handlers read
+
+class LocalWorksheet:
+    """The gspread Worksheet calls the handlers use, served from the local mirror."""
+
+    def __init__(self, store, title):
+        self.store = store
+        self.title = title
+
+    def get_all_values(self):
+        return self.store.rows(self.title)
+
+    def get_all_records(self):
+        rows = self.store.rows(self.title)
+        if not rows:
+            return []
+        header = rows[0]
+        return [dict(zip(header, (_numericise(v) for v in row))) for row in rows[1:]]
+
+    def row_values(self, row):
+        rows = self.store.rows(self.title)
+        if row > len(rows):
+            return []
+        values = rows[row - 1]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def col_values(self, col):
+        values = [row[col - 1] if col <= len(row) else "" for row in self.store.rows(self.title)]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def cell(self, row, col):
+        return Cell(row, col, self.store.cell_value(self.title, row, col))
+
+    def find(self, query, in_row=None, in_column=None):
+        """First cell whose value equals query (like gspread's find); None if there is none."""
+        found = self.store.find_cell(self.title, str(query), in_row, in_column)
+        return Cell(*found, str(query)) if found else None
+
+    def update_cell(self, row, col, value):
+        # gspread's update_cell uses USER_ENTERED
+        self.store.write_cells(self.title, [(row, col, value)], user_entered=True)
+
+    def update_acell(self, label, value):
+        row, col = a1_to_rowcol(label)
+        self.update_cell(row, col, value)
+
+    def update(self, values=None, range_name=None, value_input_option=None, **kwargs):
+        # Accept both update(values, range_name) and the older update(range_name, values) order
+        if isinstance(values, str) and not isinstance(range_name, str):
+            values, range_name = range_name, values
+        start = range_name.split(":")[0]
+        top, left = a1_to_rowcol(start)
+        cells = [
+            (top + r, left + c, v)
+            for r, row in enumerate(values)
+            for c, v in enumerate(row)
+        ]
+        user_entered = str(value_input_option or "RAW").upper() == "USER_ENTERED"
+        self.store.write_cells(self.title, cells, user_entered=user_entered)
+
+    def append_row(self, values, value_input_option="RAW", **kwargs):
+        user_entered = str(value_input_option).upper() == "USER_ENTERED"
+        self.store.append_row(self.title, values, user_entered=user_entered)
@@ -0,0 +1,153 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+
+from .leases import is_leader, leader_only
+from .quota import sheets_priority, INTERACTIVE, BACKGROUND
+from .resilience import SheetsUnavailable
+from .sheets import all_chat_sheets
+from .store import rowcol_to_a1
+
+# === SHEETS <-> LOCAL MIRROR SYNC ===
+
+def _modified_epoch(spreadsheet):
+    # e.g. '2025-09-16T12:34:56.789Z'
+    stamp = spreadsheet.get_lastUpdateTime()
+    return datetime.strptime(stamp[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+
+def pull_all(sheets):
+    """Reads every mirrored tab of a chat in one batchGet and merges it into its local store."""
+    spreadsheet = sheets.spreadsheet()
+    tabs = sheets.config.mirrored_tabs
+    response = spreadsheet.values_batch_get([f"'{tab}'" for tab in tabs])
+    changed = 0
+    for tab, value_range in zip(tabs, response.get("valueRanges", [])):
+        changed += sheets.store.apply_pull(tab, value_range.get("values", []), sheet_modified_at=lambda: _modified_epoch(spreadsheet))
+    return changed
+
+def _ensure_grid(ws, rows, cols):
+    if rows > ws.row_count:
+        ws.add_rows(rows - ws.row_count)
+    if cols > ws.col_count:
+        ws.add_cols(cols - ws.col_count)
+
+def push_tab(sheets, tab):
+    """Pushes a tab's pending local writes: appended rows via append_rows, edits via one batch_update."""
+    appended, dirty = sheets.store.pending_changes(tab)
+    if not appended and not dirty:
+        return 0
+    if not sheets.store.has_tab(tab):
+        # Never pulled: pushing would overwrite whatever the sheet holds without weighing it
+        print(f"[SYNC] {tab}: {len(appended)} new row(s) and {len(dirty)} cell edit(s) wait for a first pull.")
+        return 0
+    with sheets_priority(INTERACTIVE if tab in sheets.config.interactive_tabs else BACKGROUND):
+        return _push(sheets, tab, appended, dirty)
+
+def _push(sheets, tab, appended, dirty):
+    store = sheets.store
+    ws = sheets.remote_worksheet(tab)
+    pushed = []
+
+    if appended:
+        rows = sorted(appended)
+        width = max(col for row in rows for col, *_ in appended[row])
+        values = []
+        for row in rows:
+            line = [""] * width
+            for col, value, _, version in appended[row]:
+                line[col - 1] = value
+                pushed.append((row, col, value, version))
+            values.append(line)
+        user_entered = any(ue for row in rows for _, _, ue, _ in appended[row])
+        response = ws.append_rows(values, value_input_option="USER_ENTERED" if user_entered else "RAW", table_range="A1")
+        updated_range = (response or {}).get("updates", {}).get("updatedRange", "")
+        match = re.search(r"!\$?[A-Z]+\$?(\d+)", updated_range)
+        if match and int(match.group(1)) != rows[0]:
+            # Someone added rows in the sheet meanwhile; the next pull re-seats our rows
+            print(f"[SYNC] {tab}: rows appended at {match.group(1)} instead of {rows[0]}, will re-pull.")
+
+    if dirty:
+        targets = _sheet_rows(sheets, tab, ws, dirty)
+        writes = [(targets[row], col, value, ue) for row, col, value, ue, *_ in dirty if targets.get(row)]
+        if writes:
+            _ensure_grid(ws, max(r for r, *_ in writes), max(c for _, c, *_ in writes))
+        for user_entered in (False, True):
+            batch = [
+                {"range": rowcol_to_a1(row, col), "values": [[value]]}
+                for row, col, value, ue in writes if bool(ue) == user_entered
+            ]
+            if batch:
+                ws.batch_update(batch, value_input_option="USER_ENTERED" if user_entered else "RAW")
+        # Edits of a row deleted in the sheet are dropped too; the next pull takes the sheet's state
+        pushed.extend((row, col, value, version) for row, col, value, _, version, _ in dirty)
+
+    store.mark_pushed(tab, pushed)
+    print(f"[SYNC] {tab}: pushed {len(appended)} new row(s) and {len(dirty)} cell edit(s).")
+    return len(pushed)
+
+def _sheet_rows(sheets, tab, ws, dirty):
+    """
+    {local row: sheet row} for the rows of dirty cells; None for a row no longer in the sheet.
+    Rows of a keyed tab are checked against the sheet's key column (one read) right before the
+    write, so a sort or insert since the last pull doesn't put the edit into another row.
+    """
+    targets = {row: row for row, *_ in dirty}
+    row_keys = {row: row_key for row, *_, row_key in dirty if row_key}
+    key_col = sheets.store.key_columns.get(tab)
+    if not key_col or not row_keys:
+        return targets
+    column = [str(value).strip() for value in ws.col_values(key_col)]
+    positions = {}
+    for row, value in enumerate(column, start=1):
+        positions.setdefault(value, row)
+    for row, row_key in row_keys.items():
+        if row <= len(column) and column[row - 1] == row_key:
+            continue
+        targets[row] = positions.get(row_key)
+        if targets[row] is None:
+            print(f"[SYNC] {tab}: row of {row_key} was deleted in the sheet, dropping its pending edits.")
+        else:
+            print(f"[SYNC] {tab}: row of {row_key} moved from {row} to {targets[row]} in the sheet, writing there.")
+    return targets
+
+def push_all(sheets):
+    # Admin-facing tabs (/confirmation, /modify, polls) go out before bookkeeping tabs
+    for tab in sorted(sheets.config.mirrored_tabs, key=lambda t: t not in sheets.config.interactive_tabs):
+        push_tab(sheets, tab)
+
+def sync_once():
+    for sheets in all_chat_sheets():
+        try:
+            # Pull first so human edits made since the last sync are weighed before we overwrite anything
+            pull_all(sheets)
+            push_all(sheets)
+        except SheetsUnavailable:
+            raise
+        except Exception as e:
+            # One group's broken sheet must not hold back the others
+            print(f"[SYNC] Sync failed for chat {sheets.config.chat_id}, will retry: {e}")
+
+def warm_store():
+    """Initial pull at startup so the first handler reads see current sheet data."""
+    for sheets in all_chat_sheets():
+        changed = pull_all(sheets)
+        print(f"[INFO] Local mirror for chat {sheets.config.chat_id} synced ({changed} cell(s) updated).")
+
+@leader_only  # workers share the mirror files; only one process may push them
+async def sync_store_job(context):
+    try:
+        await asyncio.to_thread(sync_once)
+    except SheetsUnavailable:
+        pass  # breaker open: nothing was sent, local changes wait for the next run
+    except Exception as e:
+        # Handlers keep working off the local mirror; pending writes go out on the next run
+        print(f"[SYNC] Sheets sync failed, will retry: {e}")
+
+async def flush_store(application):
+    if not is_leader():
+        return
+    try:
+        # A full sync, so edits made in the sheet since the last run are weighed before the final push
+        await asyncio.to_thread(sync_once)
+    except Exception as e:
+        print(f"[SYNC] Final push failed, changes stay in the local mirror: {e}")
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Optional
+
+from .config import UI_STATE_TTL, UI_STATE_PIN_TTL, UI_STATE_MAX_THREADS, UI_STATE_DELETE_ORPHANS
+from .conversation import expire_conversation_data
+from .multiselect import MultiSelect
+from .state import initialized_topics
+
+# === PER-THREAD UI STATE ===
+# Replaces the ad-hoc `context.chat_data[f"..._{thread_id}"]` keys, which were never cleaned up.
+
+@dataclass
+class ThreadUIState:
+    chat_id: int
+    thread_id: int
+    # Short-lived prompts/selections (expire after UI_STATE_TTL of inactivity)
+    init_prompt: Optional[int] = None
+    confirm_prompt: Optional[int] = None
+    final_prompt: Optional[int] = None
+    final_owner: Optional[int] = None  # admin who accepted and is picking the final dates
+    final_row_number: Optional[int] = None
+    final_select: Optional[MultiSelect] = None  # proposed dates and the ones picked so far
+    # Pointers to the pinned summary / interest poll (kept for UI_STATE_PIN_TTL)
+    summary_msg: Optional[int] = None
+    interest_poll_msg: Optional[int] = None
+    touched_at: float = field(default_factory=monotonic)
+
+    def prompt_ids(self):
+        return [m for m in (self.init_prompt, self.confirm_prompt, self.final_prompt) if m]
+
+    def has_pending(self):
+        return bool(self.prompt_ids() or self.final_row_number or self.final_select)
+
+    def clear_pending(self):
+        self.init_prompt = self.confirm_prompt = self.final_prompt = None
+        self.final_owner = None
+        self.final_row_number = None
+        self.final_select = None
+
+
+def _forget_init_prompt(state):
+    # The PERF/OTHERS prompt is about to be deleted: let the topic's next message ask again,
+    # otherwise the topic could never be registered
+    if state.init_prompt:
+        initialized_topics.discard((state.chat_id, state.thread_id))
+
+
+class ThreadUIStore:
+    """LRU of ThreadUIState keyed by (chat_id, thread_id) with TTL expiry and a size cap."""
+
+    def __init__(self, ttl=UI_STATE_TTL, pin_ttl=UI_STATE_PIN_TTL, max_threads=UI_STATE_MAX_THREADS):
+        self.ttl = ttl
+        self.pin_ttl = pin_ttl
+        self.max_threads = max_threads
+        self._states = OrderedDict()
+        self._evicted_prompts = []  # prompts of entries pushed out by the size cap, handed to the next sweep
+
+    def __len__(self):
+        return len(self._states)
+
+    def get(self, chat_id, thread_id) -> ThreadUIState:
+        """Returns (creating if needed) the state for a thread and marks it as recently used."""
+        key = (chat_id, thread_id)
+        state = self._states.get(key)
+        if state is None:
+            state = ThreadUIState(chat_id=chat_id, thread_id=thread_id)
+            self._states[key] = state
+            self._evict_over_cap()
+        else:
+            self._states.move_to_end(key)
+        state.touched_at = monotonic()
+        return state
+
+    def peek(self, chat_id, thread_id) -> Optional[ThreadUIState]:
+        return self._states.get((chat_id, thread_id))
+
+    def _evict_over_cap(self):
+        while len(self._states) > self.max_threads:
+            (chat_id, thread_id), state = self._states.popitem(last=False)
+            self._evicted_prompts.extend((chat_id, msg_id) for msg_id in state.prompt_ids())
+            _forget_init_prompt(state)
+            print(f"[DEBUG] UI state for thread {thread_id} evicted (cap {self.max_threads}).")
+
+    def sweep(self, now=None):
+        """
+        Expires abandoned selections and stale entries.
+        Returns [(chat_id, message_id), ...] of prompts left behind by the expired selections.
+        """
+        if now is None:
+            now = monotonic()
+        orphaned, self._evicted_prompts = self._evicted_prompts, []
+        # Oldest first; stop at the first entry that is still fresh
+        for key in list(self._states):
+            state = self._states[key]
+            idle = now - state.touched_at
+            if idle < self.ttl:
+                break
+            if state.has_pending():
+                orphaned.extend((state.chat_id, msg_id) for msg_id in state.prompt_ids())
+                _forget_init_prompt(state)
+                state.clear_pending()
+            if idle >= self.pin_ttl or not (state.summary_msg or state.interest_poll_msg):
+                del self._states[key]
+        return orphaned
+
+
+ui_state = ThreadUIStore()
+
+async def sweep_ui_state(context):
+    """Job: expire abandoned per-thread UI state and (optionally) delete its orphaned prompts."""
+    expired = expire_conversation_data(context.application.user_data)
+    if expired:
+        print(f"[INFO] Expired {expired} abandoned conversation(s).")
+    orphaned = ui_state.sweep()
+    if orphaned:
+        print(f"[INFO] Expired UI state left {len(orphaned)} orphaned prompt(s).")
+    if not UI_STATE_DELETE_ORPHANS:
+        return
+    for chat_id, message_id in orphaned:
+        try:
+            await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
+        except Exception as e:
+            print(f"[DEBUG] Orphaned prompt {message_id} already gone: {e}")
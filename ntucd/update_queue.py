@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import threading
+import zlib
+from time import time
+
+from .config import COORD_PATH, QUEUE_PARTITIONS, QUEUE_RETENTION
+
+# === SHARED UPDATE QUEUE ===
+# The ingress process appends every update here; workers consume the partitions they lease
+# (see ntucd.leases). Updates of one (chat, thread) share a partition, so they are handled in
+# order by one worker at a time.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS updates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    partition INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    done_at REAL
+);
+CREATE INDEX IF NOT EXISTS updates_pending ON updates (partition, id) WHERE done_at IS NULL;
+CREATE TABLE IF NOT EXISTS routes (
+    key TEXT PRIMARY KEY,  -- e.g. 'poll:<poll id>' for updates that carry no chat
+    chat_id INTEGER,
+    thread_id INTEGER,
+    created_at REAL NOT NULL
+);
+"""
+
+def connect(path=COORD_PATH):
+    db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+def partition_for(chat_id, thread_id):
+    # crc32 rather than hash(): it must agree across processes
+    return zlib.crc32(f"{chat_id}:{thread_id}".encode()) % QUEUE_PARTITIONS
+
+
+class UpdateQueue:
+    def __init__(self, path=COORD_PATH):
+        self._lock = threading.Lock()
+        self._db = connect(path)
+        self._db.executescript(SCHEMA)
+
+    def routing_key(self, update):
+        """(chat_id, thread_id) whose partition handles this update."""
+        if update.chat_join_request:
+            # /verify continues in the applicant's private chat, whose ID is the user ID
+            return update.chat_join_request.from_user.id, None
+        if update.poll_answer:
+            route = self.lookup_route(f"poll:{update.poll_answer.poll_id}")
+            return route or (f"poll:{update.poll_answer.poll_id}", None)
+        chat = update.effective_chat
+        msg = update.effective_message
+        return (chat.id if chat else 0), getattr(msg, "message_thread_id", None) if msg else None
+
+    def enqueue(self, update):
+        partition = partition_for(*self.routing_key(update))
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO updates (partition, payload, enqueued_at) VALUES (?, ?, ?)",
+                (partition, json.dumps(update.to_dict()), time()),
+            )
+
+    def fetch(self, partitions, limit):
+        """Oldest unprocessed updates of the given partitions: [(id, partition, payload), ...]."""
+        if not partitions:
+            return []
+        marks = ",".join("?" * len(partitions))
+        with self._lock:
+            return self._db.execute(
+                f"SELECT id, partition, payload FROM updates WHERE done_at IS NULL AND partition IN ({marks}) "
+                "ORDER BY id LIMIT ?",
+                (*partitions, limit),
+            ).fetchall()
+
+    def mark_done(self, update_id):
+        with self._lock:
+            self._db.execute("UPDATE updates SET done_at = ? WHERE id = ?", (time(), update_id))
+
+    def purge(self):
+        with self._lock:
+            self._db.execute("DELETE FROM updates WHERE done_at IS NOT NULL AND done_at < ?", (time() - QUEUE_RETENTION,))
+            self._db.execute("DELETE FROM routes WHERE created_at < ?", (time() - QUEUE_RETENTION * 30,))
+
+    # --- routes for updates without a chat ---
+    def remember_route(self, key, chat_id, thread_id):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO routes (key, chat_id, thread_id, created_at) VALUES (?, ?, ?, ?)",
+                (key, chat_id, thread_id, time()),
+            )
+
+    def lookup_route(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT chat_id, thread_id FROM routes WHERE key = ?", (key,)).fetchone()
+        return tuple(row) if row else None
+
+
+_active_queue = None  # set in worker mode
+
+def set_active_queue(queue):
+    global _active_queue
+    _active_queue = queue
+
+def remember_poll_route(poll_id, chat_id, thread_id):
+    """Sends answers to this poll to the worker that holds the poll's (chat, thread) partition."""
+    if _active_queue is not None:
+        _active_queue.remember_route(f"poll:{poll_id}", chat_id, thread_id)
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import signal
+from collections import defaultdict
+
+from telegram import Update
+from telegram.ext import ApplicationBuilder, ApplicationHandlerStop, TypeHandler
+
+from .config import BOT_TOKEN, COORD_PATH, QUEUE_BATCH_SIZE, QUEUE_POLL_INTERVAL, LEASE_RENEW_INTERVAL
+from .leases import LeaseManager, set_lease_manager
+from .update_queue import UpdateQueue, set_active_queue
+
+# === SCALE-OUT MODE ===
+#   python -m ntucd ingress   # one process: polls Telegram and queues every update
+#   python -m ntucd worker    # N processes on the same machine: handle the queued updates
+# All of them share COORD_PATH (and the local mirror files), so they must share a filesystem.
+
+def run_ingress():
+    queue = UpdateQueue(COORD_PATH)
+
+    async def enqueue(update, context):
+        queue.enqueue(update)
+        raise ApplicationHandlerStop
+
+    async def purge_job(context):
+        await asyncio.to_thread(queue.purge)
+
+    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    app.add_handler(TypeHandler(Update, enqueue))
+    app.job_queue.run_repeating(purge_job, interval=3600, first=60)
+    print(f"[INGRESS] Queueing updates into {COORD_PATH}...")
+    app.run_polling(allowed_updates=Update.ALL_TYPES)
+
+async def _drain_partition(app, queue, leases, partition, items):
+    # Strictly in order within a partition; partitions run concurrently
+    for update_id, payload in items:
+        if not leases.owns(partition):
+            # Lost (or possibly lost) the lease while earlier updates ran: the new owner handles the rest
+            print(f"[WORKER] Partition {partition} moved on; left {update_id} and later updates to its new owner.")
+            return
+        leases.touch(partition)
+        try:
+            update = Update.de_json(json.loads(payload), app.bot)
+            await app.process_update(update)
+        except Exception as e:
+            print(f"[WORKER] Update {update_id} failed: {e}")
+        finally:
+            await asyncio.to_thread(queue.mark_done, update_id)
+
+async def _renew_leases(leases, stop):
+    # Separate from _work so a slow handler can't hold up renewal past LEASE_TTL
+    while not stop.is_set():
+        try:
+            await asyncio.to_thread(leases.tick)
+        except Exception as e:
+            print(f"[LEASE] Renewal failed, will retry: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=LEASE_RENEW_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+async def _work(app, queue, leases, stop):
+    while not stop.is_set():
+        partitions = [p for p in sorted(leases.partitions) if leases.owns(p)]
+        rows = await asyncio.to_thread(queue.fetch, partitions, QUEUE_BATCH_SIZE)
+        if not rows:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=QUEUE_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        by_partition = defaultdict(list)
+        for update_id, partition, payload in rows:
+            by_partition[partition].append((update_id, payload))
+        await asyncio.gather(*(_drain_partition(app, queue, leases, p, items) for p, items in by_partition.items()))
+
+async def _worker_main():
+    from .app import build_application  # the handlers; ingress doesn't need them
+    leases = LeaseManager(COORD_PATH)
+    queue = UpdateQueue(COORD_PATH)
+    set_lease_manager(leases)
+    set_active_queue(queue)
+    # Take leases before the jobs start so only the leader runs them from the first tick
+    await asyncio.to_thread(leases.tick)
+
+    app = build_application()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await app.initialize()
+    if app.post_init:
+        await app.post_init(app)
+    await app.start()
+    print(f"[WORKER] {leases.owner} processing updates from {COORD_PATH}...")
+    renewer = asyncio.create_task(_renew_leases(leases, stop))
+    try:
+        await _work(app, queue, leases, stop)
+    finally:
+        stop.set()
+        await renewer
+        await app.stop()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
+        await app.shutdown()
+        await asyncio.to_thread(leases.release_all)
+        print(f"[WORKER] {leases.owner} stopped.")
+
+def run_worker():
+    asyncio.run(_worker_main())
@@ -0,0 +1,106 @@
+"""
+Cold-start import benchmark for the bot entry point.
+
+Runs `python -X importtime -c "import NTUCDConfig"` in fresh interpreters and reports the
+median total import time plus the slowest top-level imports. Fails (exit code 1) if the
+total exceeds --budget-ms or if a lazily-loaded dependency sneaks into the startup graph.
+
+Usage:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --module ntucd.__main__   # `python -m ntucd` dispatch (ingress/worker)
+    python scripts/bench_startup.py --runs 10 --budget-ms 600 --record bench_output.txt
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_MODULE = "NTUCDConfig"
+# These must only be imported on first Sheets access, never at startup
+LAZY_MODULES = ("gspread", "google.auth", "google.oauth2", "requests", "numpy")
+# Modules that may only be imported once the chosen mode runs, never by importing the entry point
+DEFERRED_BY_ENTRY = {
+    "ntucd.__main__": ("ntucd.app", "ntucd.worker"),
+    "ntucd.worker": ("ntucd.app",),
+}
+
+
+def run_once(module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    total_us = None
+    children = {}  # module -> cumulative us, for the entry point's direct and second-level imports
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:      self [us] | cumulative | imported package", nested imports indented by 2
+        _, cumulative_us, name = line.split("|", 2)
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        imported.add(stripped)
+        if depth == 0 and stripped == module:
+            total_us = int(cumulative_us)
+        elif depth in (1, 2):
+            children[stripped] = int(cumulative_us)
+    return total_us, children, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default=ENTRY_MODULE)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--record", help="append a JSON line with the result to this file")
+    args = parser.parse_args()
+
+    totals = []
+    per_module = {}
+    imported = set()
+    for _ in range(args.runs):
+        total_us, children, seen = run_once(args.module)
+        totals.append(total_us / 1000)
+        imported |= seen
+        for name, us in children.items():
+            per_module.setdefault(name, []).append(us / 1000)
+
+    median_ms = statistics.median(totals)
+    print(f"[BENCH] import {args.module}: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f})")
+    slowest = sorted(per_module.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for name, samples in slowest[:args.top]:
+        print(f"[BENCH]   {statistics.median(samples):>8.1f} ms  {name}")
+
+    deferred = DEFERRED_BY_ENTRY.get(args.module, ())
+    leaked = sorted(m for m in imported if m.startswith(LAZY_MODULES) or m in deferred)
+    if leaked:
+        print(f"[BENCH] ❌ Lazy dependencies imported at startup: {', '.join(leaked[:10])}")
+
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "module": args.module,
+                "median_ms": round(median_ms, 1),
+                "runs": args.runs,
+                "leaked": leaked,
+            }) + "\n")
+
+    over_budget = args.budget_ms is not None and median_ms > args.budget_ms
+    if over_budget:
+        print(f"[BENCH] ❌ Over budget: {median_ms:.1f} ms > {args.budget_ms:.1f} ms")
+    return 1 if (leaked or over_budget) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())